@@ -1,33 +1,78 @@
 """
 The Hubble Python Client
 """
-import asyncio
 import datetime as _datetime
 import os as _os
 import sys as _sys
 from functools import wraps
 from typing import Optional
 
-from importlib_metadata import version
-
-from .client.client import Client  # noqa F401
 from .excepts import AuthenticationRequiredError
-from .utils.auth import Auth  # noqa F401
-from .utils.notebook import is_notebook  # noqa F401
-
-try:
-    __version__ = version("jina-hubble-sdk")
-except Exception:
-    __version__ = "v0.0.0"
-
 
 __windows__ = _sys.platform == 'win32'
 __uptime__ = _datetime.datetime.now().isoformat()
 
+__all__ = [
+    'Auth',
+    'AuthenticationRequiredError',
+    'Client',
+    'get_token',
+    'is_logged_in',
+    'is_notebook',
+    'login',
+    'login_required',
+    'logout',
+    'notebook_login',
+    'show_hint',
+]
+
+# the public API is imported on first access, to keep `import hubble` cheap
+_LAZY_ATTRIBUTES = {
+    'Client': 'hubble.client.client',
+    'Auth': 'hubble.utils.auth',
+    'is_notebook': 'hubble.utils.notebook',
+}
+
+
+def __getattr__(name: str):
+    if name == '__version__':
+        from importlib_metadata import version
+
+        try:
+            value = version("jina-hubble-sdk")
+        except Exception:
+            value = "v0.0.0"
+    elif name in _LAZY_ATTRIBUTES:
+        import importlib
+
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    else:
+        import importlib
+
+        # subpackages such as `hubble.utils` are imported on first access too
+        try:
+            value = importlib.import_module(f'{__name__}.{name}')
+        except ModuleNotFoundError as e:
+            if e.name != f'{__name__}.{name}':
+                raise
+            raise AttributeError(
+                f'module {__name__!r} has no attribute {name!r}'
+            ) from None
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | {'__version__'})
+
 
 def login_required(func):
     """Annotate a function so that it requires login to Jina AI to run.
 
+    The identity of the user is checked once per process and remembered, see
+    :class:`hubble.utils.identity.IdentityCache`.
+
     Example:
 
     .. highlight:: python
@@ -43,12 +88,22 @@ def login_required(func):
 
     @wraps(func)
     def arg_wrapper(*args, **kwargs):
+        from .utils.auth import Auth
+        from .utils.identity import identity_cache
+
+        token = Auth.get_auth_token()
         try:
-            Client(jsonify=True).get_user_info()
+            if not identity_cache.is_logged_in(token):
+                from .client.client import Client
+
+                Client(token=token, jsonify=True).get_user_info()
+                identity_cache.remember(token)
             return func(*args, **kwargs)
         except AuthenticationRequiredError:
             import sys
 
+            identity_cache.clear()
+
             if sys.__stdin__.isatty():
                 from rich import print
                 from rich.prompt import Confirm
@@ -76,6 +131,8 @@ def login_required(func):
 
 def login(interactive: Optional[bool] = None, **kwargs):
     """This function guides user to login."""
+    from .utils.auth import Auth
+    from .utils.notebook import is_notebook
 
     if interactive is None:
         interactive = is_notebook()
@@ -88,16 +145,24 @@ def login(interactive: Optional[bool] = None, **kwargs):
 
 def notebook_login(**kwargs):
     """This function guides user to log-in via P.A.T. or via browser."""
+    from .utils.auth import Auth
+
     Auth.login_notebook(**kwargs)
 
 
 def logout():
     """Logout."""
+    import asyncio
+
+    from .utils.auth import Auth
+
     asyncio.run(Auth.logout())
 
 
 def is_logged_in():
     """Check if user is logged in."""
+    from .client.client import Client
+
     return True if Client(jsonify=True).token else False
 
 
@@ -109,6 +174,8 @@ def get_token(interactive: bool = False) -> Optional[str]:
         token = show_hint(interactive)
         _os.environ['SHOW_HUBBLE_HINT'] = 'NEVER'
     else:
+        from .client.client import Client
+
         token = Client(jsonify=True).token
 
     return token
@@ -121,6 +188,8 @@ def show_hint(interactive: bool = False) -> Optional[str]:  # noqa: E501
     """
     from rich import print
 
+    from .client.client import Client
+
     try:
         c = Client(jsonify=True)
 
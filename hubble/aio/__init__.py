@@ -0,0 +1,4 @@
+"""
+Asynchronous Hubble Python Client
+"""
+from .client import AsyncClient  # noqa F401
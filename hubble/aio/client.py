@@ -0,0 +1,666 @@
+import asyncio
+import io
+import json
+import logging
+import os
+import re
+import uuid
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import aiohttp
+
+from ..client.endpoints import EndpointsV2
+from ..excepts import RequestTimeoutError, errorcodes
+from ..utils.api_utils import get_base_url
+from ..utils.auth import Auth
+from ..utils.jwt_parser import validate_jwt, verified_tokens
+from ..utils.timeout import Deadline, TimeoutType, get_timeout
+
+__all__ = ['AsyncClient']
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+_UNSATISFIED_RANGE_PATTERN = re.compile(r'bytes\s+\*/(\d+)')
+
+
+def _encode_form(data: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Encode form fields the same way as `requests` does."""
+    fields = []
+    for key, value in data.items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        fields.extend((key, str(v)) for v in values if v is not None)
+    return fields
+
+
+def _content_range_total(response: aiohttp.ClientResponse) -> Optional[int]:
+    """Get the total size from the ``Content-Range`` of a 416 response."""
+    match = _UNSATISFIED_RANGE_PATTERN.match(response.headers.get('Content-Range', ''))
+    return int(match.group(1)) if match else None
+
+
+class AsyncClient(object):
+    """Asynchronous Hubble Python API client.
+
+    ``AsyncClient`` has the same methods as :class:`hubble.Client`, as
+    coroutines. All the requests share one pooled `aiohttp.ClientSession`,
+    created on the first request, so that many requests can run concurrently
+    on the event loop without a thread per request.
+
+    Example:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        async with AsyncClient(jsonify=True) as client:
+            user = await client.get_user_info(variant='data')
+
+    :param token: The api token, read from the environment or the config
+        if not given.
+    :param max_retries: Number of allowed maximum retries on connection errors.
+    :param jsonify: Convert `aiohttp.ClientResponse` object to json.
+    :param limit: Maximum number of simultaneous connections of the pool.
+    :param timeout: Optional timeout of the requests in seconds, or
+        ``(connect, read)`` tuple, see :func:`hubble.utils.timeout.get_timeout`.
+    :param deadline: Optional total time of a request in seconds.
+    """
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        max_retries: Optional[int] = None,
+        jsonify: bool = False,
+        limit: int = 100,
+        timeout: TimeoutType = None,
+        deadline: Optional[float] = None,
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._token = token if token else Auth.get_auth_token()
+        self._base_url = get_base_url()
+        self._jsonify = jsonify
+        self._max_retries = max_retries or 0
+        self._limit = limit
+        connect, read = get_timeout(timeout)
+        self._timeout = aiohttp.ClientTimeout(
+            total=deadline or Deadline().seconds, sock_connect=connect, sock_read=read
+        )
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """Close the underlying `aiohttp.ClientSession`."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            headers = {'Accept-Charset': 'utf-8'}
+            if self._token:
+                headers['Authorization'] = f'token {self._token}'
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._limit),
+                headers=headers,
+                timeout=self._timeout,
+                trust_env=True,
+            )
+        return self._session
+
+    async def _handle_error_request(self, resp: aiohttp.ClientResponse):
+        try:
+            resp = await resp.json(content_type=None)
+        except ValueError:
+            resp = {'code': resp.status, 'message': await resp.text()}
+
+        message = resp.get('message', None)
+        code = resp.get('status', -1)
+        data = resp.get('data', {})
+
+        ExceptionCls = errorcodes[code]
+
+        raise ExceptionCls(response=resp, data=data, message=message, code=code)
+
+    async def handle_request(
+        self,
+        url: str,
+        method: str = 'POST',
+        data: Optional[Any] = None,
+        headers: Optional[dict] = None,
+        json: Optional[dict] = None,
+        log_error: Optional[bool] = True,
+    ) -> Union[aiohttp.ClientResponse, dict]:
+        """The basis request handler.
+
+        The body of the response is read before it is returned, so that
+        ``await resp.json()`` can be called on it afterwards.
+
+        :param url: The url of the request.
+        :param method: The request type, for v2 always set to POST.
+        :param data: Optional form fields, or a streaming body.
+        :param headers: Optional headers to be send along with request.
+        :param json: Optional json payload to be send along with request.
+        :returns: `aiohttp.ClientResponse` object as returned value
+            or dict if jsonify.
+        """
+        default_headers = {'jinameta-session-id': str(uuid.uuid1())}
+        if headers:
+            headers.update(default_headers)
+        else:
+            headers = default_headers
+
+        session_id = headers.get('jinameta-session-id')
+        if isinstance(data, dict):
+            data = _encode_form(data) or None
+
+        try:
+            for attempt in range(self._max_retries + 1):
+                try:
+                    resp = await self._get_session().request(
+                        method=method,
+                        url=url,
+                        data=data,
+                        headers=headers,
+                        json=json if json else None,
+                    )
+                    break
+                except aiohttp.ClientConnectionError:
+                    # a streaming body can not be sent twice
+                    if attempt == self._max_retries or not isinstance(
+                        data, (list, type(None))
+                    ):
+                        raise
+
+            async with resp:
+                await resp.read()
+
+            if resp.status >= 400:
+                await self._handle_error_request(resp)
+
+            if self._jsonify:
+                resp = await resp.json(content_type=None)
+        except asyncio.TimeoutError as e:
+            if log_error:
+                self.logger.error(f'Request {session_id} timed out')
+            raise RequestTimeoutError(
+                response={}, message=f'Request {session_id} timed out'
+            ) from e
+        except Exception as e:
+            if log_error:
+                self.logger.error(
+                    f'Please report this session_id: [yellow bold]{session_id}[/] '
+                    'to https://github.com/jina-ai/jina-hubble-sdk/issues'
+                )
+            raise e
+
+        return resp
+
+    async def _to_json(self, resp: Union[aiohttp.ClientResponse, dict]) -> dict:
+        if isinstance(resp, aiohttp.ClientResponse):
+            return await resp.json(content_type=None)
+        return resp
+
+    async def create_personal_access_token(
+        self, name: str, expiration_days: int = 30
+    ) -> Union[aiohttp.ClientResponse, dict]:
+        """Create a personal access token.
+
+        :param name: The name of the personal access token.
+        :param expiration_days: Number of days to be valid, by default 30 days.
+        :returns: `aiohttp.ClientResponse` object as returned value
+            or indented json if jsonify.
+        """
+        return await self.handle_request(
+            url=self._base_url + EndpointsV2.create_pat,
+            data={'name': name, 'expirationDays': expiration_days},
+        )
+
+    async def list_personal_access_tokens(
+        self,
+    ) -> Union[aiohttp.ClientResponse, dict]:
+        """List all created personal access tokens.
+
+        :returns: `aiohttp.ClientResponse` object as returned value
+            or indented json if jsonify.
+        """
+        return await self.handle_request(url=self._base_url + EndpointsV2.list_pats)
+
+    async def delete_personal_access_token(
+        self, name: str
+    ) -> Union[aiohttp.ClientResponse, dict]:
+        """Delete personal access token by name.
+
+        :param name: Name of the personal access token to be deleted.
+        :returns: `aiohttp.ClientResponse` object as returned value
+            or indented json if jsonify.
+        """
+        return await self.handle_request(
+            url=self._base_url + EndpointsV2.delete_pat,
+            data={'name': name},
+        )
+
+    async def get_user_info(
+        self, log_error: bool = True, variant: str = 'response'
+    ) -> Union[aiohttp.ClientResponse, dict]:
+        """Get current logged in user information.
+
+        :param variant: 'response' or 'full' or 'data', defaults to 'response'.
+            The same as :meth:`hubble.Client.get_user_info`.
+        :returns: dict user information.
+        """
+        try:
+            decoded = verified_tokens.get(self._token, None)
+            if decoded is None:
+                # fetching the signing keys blocks, keep it off the event loop
+                decoded = await asyncio.get_running_loop().run_in_executor(
+                    None, validate_jwt, self._token
+                )
+            if isinstance(decoded, dict) and decoded.get('user'):
+                user = decoded.get('user')
+                if (
+                    user.get('status') in ['active', 'deletion-in-progress']
+                    and variant == 'data'
+                ):
+                    return user
+        except Exception:
+            pass
+
+        resp = await self.handle_request(
+            url=self._base_url + EndpointsV2.get_user_info, log_error=log_error
+        )
+        json_resp = await self._to_json(resp)
+
+        if variant == 'full':
+            return json_resp
+        elif variant == 'response':
+            return resp
+
+        return json_resp.get('data', {})
+
+    async def get_raw_session(
+        self, log_error: bool = True
+    ) -> Union[aiohttp.ClientResponse, dict]:
+        """Get raw information of the session.
+
+        :returns: `aiohttp.ClientResponse` object as returned value
+            or indented json if jsonify.
+        """
+        return await self.handle_request(
+            url=self._base_url + EndpointsV2.get_raw_session, log_error=log_error
+        )
+
+    @property
+    async def token(self) -> Optional[str]:
+        """The token if it is valid, to be awaited: ``await client.token``."""
+        try:
+            await self.get_user_info(log_error=False)
+            return self._token
+        except Exception:
+            return None
+
+    @property
+    async def username(self) -> str:
+        """The name of the user, to be awaited: ``await client.username``."""
+        resp = await self.get_user_info(log_error=False, variant='full')
+        user = resp.get('data', {})
+        return user.get('nickname') or user.get('name')
+
+    async def upload_artifact(
+        self,
+        f: Union[str, io.BytesIO],
+        id: Optional[str] = None,
+        name: Optional[str] = None,
+        metadata: Optional[dict] = None,
+        is_public: bool = False,
+        show_progress: bool = False,
+    ) -> Union[aiohttp.ClientResponse, dict]:
+        """Upload artifact to Hubble Artifact Storage.
+
+        The file is streamed in chunks, it is never fully loaded in memory.
+
+        :param f: The full path or the `io.BytesIO` of the file to be uploaded.
+        :param id: Optional value, the id of the artifact.
+        :param name: Optional value, the name of the artifact.
+        :param metadata: Optional value, the metadata of the artifact.
+        :param is_public: Optional value, if this artifact is public or not,
+          default not public.
+        :param show_progress: Optional value, if to show the upload progress bar.
+        :returns: `aiohttp.ClientResponse` object as returned value
+            or indented json if jsonify.
+        """
+        from rich import filesize
+
+        from ..utils.multipart import MultipartEncoder
+        from ..utils.pbar import get_progressbar
+
+        if not isinstance(f, (str, io.BytesIO)):
+            raise TypeError(
+                f'Unexpected type {type(f)}, expect either `str` or `io.BytesIO`.'
+            )
+
+        await self.get_user_info()  # to make sure the user is logged in.
+
+        dict_data = {'public': is_public}
+        if id:
+            dict_data['id'] = id
+        if name:
+            dict_data['name'] = name
+        if metadata:
+            dict_data['metaData'] = json.dumps(metadata)
+
+        pbar = get_progressbar(disable=not show_progress)
+        fp = open(f, 'rb') if isinstance(f, str) else f
+        dict_data['file'] = ('file', fp)
+
+        try:
+            data = MultipartEncoder(
+                dict_data, callback=lambda n: pbar.update(task, advance=n)
+            )
+            task = pbar.add_task(
+                'Uploading',
+                total=len(data),
+                start=True,
+                total_size=str(filesize.decimal(len(data))),
+            )
+
+            async def _stream():
+                loop = asyncio.get_running_loop()
+                while True:
+                    if fp is f:
+                        chunk = data.read(DEFAULT_CHUNK_SIZE)
+                    else:
+                        # do not block the event loop on disk reads
+                        chunk = await loop.run_in_executor(
+                            None, data.read, DEFAULT_CHUNK_SIZE
+                        )
+                    if not chunk:
+                        break
+                    yield chunk
+
+            headers = {
+                'Content-Type': data.content_type,
+                'Content-Length': str(len(data)),
+            }
+
+            with pbar:
+                return await self.handle_request(
+                    url=self._base_url + EndpointsV2.upload_artifact,
+                    data=_stream(),
+                    headers=headers,
+                )
+        finally:
+            if fp is not f:
+                fp.close()
+
+    async def download_artifact(
+        self,
+        id: str,
+        f: Union[str, io.BytesIO],
+        show_progress: bool = False,
+        resume: bool = True,
+    ) -> Union[str, io.BytesIO]:
+        """Download artifact from Hubble Artifact Storage to localhost.
+
+        The artifact is streamed with a single request. A path is first
+        downloaded to ``<f>.part``, which is resumed if it exists, and only
+        moved to ``f`` once the content matches the checksum from
+        :meth:`get_artifact_info`.
+
+        :param id: The id of the artifact to be downloaded.
+        :param f: The full path or the `io.BytesIO` of the file to be downloaded.
+        :param show_progress: If set, show the download progress.
+        :param resume: If set, resume from an existing ``<f>.part`` file.
+        :returns: A str object indicates the download path on localhost or bytes.
+        """
+        import hashlib
+
+        from ..client.download import get_artifact_checksum
+        from ..utils.pbar import get_progressbar
+
+        if not isinstance(f, (str, io.BytesIO)):
+            raise TypeError(
+                f'Unexpected type {type(f)}, expect either `str` or `io.BytesIO`.'
+            )
+
+        info = await self._to_json(await self.get_artifact_info(id=id))
+        checksum = get_artifact_checksum(info)
+        hasher = hashlib.new(checksum[0]) if checksum else None
+
+        resp = await self._to_json(
+            await self.handle_request(
+                url=self._base_url + EndpointsV2.download_artifact,
+                data={'id': id},
+            )
+        )
+        download_url = resp['data']['download']
+
+        target = f'{f}.part' if isinstance(f, str) else f
+        offset = 0
+        if isinstance(f, str) and resume and os.path.exists(target):
+            offset = os.path.getsize(target)
+
+        pbar = get_progressbar(disable=not show_progress)
+
+        # the download url is signed, it must not get the authorization header,
+        # and only the time between two reads is bounded, not the whole download
+        timeout = aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=self._timeout.sock_connect,
+            sock_read=self._timeout.sock_read,
+        )
+        try:
+            async with aiohttp.ClientSession(
+                timeout=timeout, trust_env=True
+            ) as session:
+                while True:
+                    headers = {'Range': f'bytes={offset}-'} if offset else None
+                    response = await session.get(download_url, headers=headers)
+                    if response.status != 416 or not offset:
+                        break
+                    response.release()
+                    if _content_range_total(response) == offset:
+                        # the part file is already complete
+                        break
+                    self.logger.warning(
+                        f'{target} does not match the artifact {id}, '
+                        'downloading it again'
+                    )
+                    os.remove(target)
+                    offset = 0
+
+                async with response:
+                    await self._write_download(
+                        response, f, target, offset, hasher, pbar
+                    )
+        except asyncio.TimeoutError as e:
+            raise RequestTimeoutError(
+                response={}, message=f'Downloading the artifact {id} timed out'
+            ) from e
+
+        if checksum and hasher.hexdigest() != checksum[1]:
+            if isinstance(f, str):
+                os.remove(target)
+            raise RuntimeError(
+                f'{checksum[0].upper()} checksum of artifact {id} failed. '
+                'Might happen when the network is unstable, please retry.'
+            )
+
+        if isinstance(f, str):
+            os.replace(target, f)
+        return f
+
+    async def _write_download(
+        self,
+        response: aiohttp.ClientResponse,
+        f: Union[str, io.BytesIO],
+        target: Union[str, io.BytesIO],
+        offset: int,
+        hasher: Any,
+        pbar: Any,
+    ):
+        from rich import filesize
+
+        if response.status == 416:
+            size = offset
+        else:
+            response.raise_for_status()
+            if response.status != 206:
+                offset = 0
+            size = offset + (response.content_length or 0)
+
+        task = pbar.add_task(
+            'Downloading',
+            total=size,
+            start=True,
+            total_size=str(filesize.decimal(size)),
+        )
+
+        if isinstance(f, str):
+            writer = open(target, 'ab' if offset else 'wb')
+            if offset:
+                pbar.update(task, advance=offset)
+                if hasher is not None:
+                    with open(target, 'rb') as reader:
+                        for chunk in iter(lambda: reader.read(DEFAULT_CHUNK_SIZE), b''):
+                            hasher.update(chunk)
+        else:
+            writer = f
+
+        try:
+            with pbar:
+                if response.status != 416:
+                    async for chunk in response.content.iter_chunked(
+                        DEFAULT_CHUNK_SIZE
+                    ):
+                        writer.write(chunk)
+                        if hasher is not None:
+                            hasher.update(chunk)
+                        pbar.update(task, advance=len(chunk))
+        finally:
+            if writer is not f:
+                writer.close()
+
+    async def delete_artifact(
+        self, id: Optional[str] = None, name: Optional[str] = None
+    ) -> Union[aiohttp.ClientResponse, dict]:
+        """Delete the artifact from Hubble Artifact Storage.
+
+        :param id: The id of the artifact to be deleted.
+        :param name: The name of the artifact to be deleted.
+        :returns: `aiohttp.ClientResponse` object as returned value
+            or indented json if jsonify.
+        """
+        return await self.handle_request(
+            url=self._base_url + EndpointsV2.delete_artifact,
+            data={'id': id} if id else {'name': name},
+        )
+
+    async def delete_multiple_artifacts(
+        self, *, ids: Optional[List[str]] = None, names: Optional[List[str]] = None
+    ) -> Union[aiohttp.ClientResponse, dict]:
+        """Delete multiple artifacts from Hubble Artifact Storage.
+
+        :param ids: A list of the IDs of the artifacts to be deleted.
+        :param names: A list of the names of the artifacts to be deleted.
+        :returns: `aiohttp.ClientResponse` object as returned value
+            or indented json if jsonify.
+        """
+        data = {}
+        if ids:
+            data['ids'] = ids
+        if names:
+            data['names'] = names
+
+        return await self.handle_request(
+            url=self._base_url + EndpointsV2.delete_multiple_artifacts,
+            data=data,
+        )
+
+    async def get_artifact_info(
+        self, id: Optional[str] = None, name: Optional[str] = None
+    ) -> Union[aiohttp.ClientResponse, dict]:
+        """Get the metadata of the artifact.
+
+        :param id: The id of the artifact.
+        :param name: The name of the artifact.
+        :returns: `aiohttp.ClientResponse` object as returned value
+            or indented json if jsonify.
+        """
+        return await self.handle_request(
+            url=self._base_url + EndpointsV2.get_artifact_info,
+            data={'id': id} if id else {'name': name},
+        )
+
+    async def update_artifact(
+        self,
+        id: str,
+        *,
+        name: Optional[str] = None,
+        metadata: Optional[dict] = None,
+        is_public: Optional[bool] = None,
+    ) -> Union[aiohttp.ClientResponse, dict]:
+        """Update artifact.
+
+        :param id: The id of the artifact to be updated.
+        :param name: Optional, a new name.
+        :param metadata: Optional, a new metadata.
+        :param public: Optional, change visibility to public or private.
+        :returns: `aiohttp.ClientResponse` object as returned value
+            or indented json if jsonify.
+        """
+        data = {
+            'id': id,
+            'name': name,
+            'metaData': json.dumps(metadata) if metadata else None,
+            'public': is_public,
+        }
+
+        return await self.handle_request(
+            url=self._base_url + EndpointsV2.update_artifact,
+            json={key: value for (key, value) in data.items() if value is not None},
+        )
+
+    async def list_artifacts(
+        self,
+        *,
+        filter: Optional[dict] = None,
+        sort: Optional[Dict[str, int]] = None,
+        pageIndex: Optional[int] = None,
+        pageSize: Optional[int] = None,
+    ) -> Union[aiohttp.ClientResponse, List[dict]]:
+        """Get list of artifacts.
+
+        :param filter: optional, to filter by fields.
+        :param sort: optional, to sort by fields.
+        :param pageIndex: optional, to specify which page to load.
+        :param pageSize: optional, number of items per page.
+        :returns: `aiohttp.ClientResponse` object as returned value
+            or indented json if jsonify.
+        """
+        data = {
+            'filter': filter,
+            'sort': sort,
+            'pageIndex': pageIndex,
+            'pageSize': pageSize,
+        }
+
+        return await self.handle_request(
+            url=self._base_url + EndpointsV2.list_artifacts,
+            json={key: value for (key, value) in data.items() if value is not None},
+        )
+
+    async def list_internal_docker_registries(
+        self,
+    ) -> Union[aiohttp.ClientResponse, dict]:
+        """List internal docker registries.
+
+        :returns: `aiohttp.ClientResponse` object as returned value
+            or indented json if jsonify.
+        """
+        return await self.handle_request(
+            url=self._base_url + EndpointsV2.list_internal_docker_registries,
+        )
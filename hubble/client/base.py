@@ -7,14 +7,34 @@ import requests
 from ..excepts import errorcodes
 from ..utils.api_utils import get_base_url, get_json_from_response
 from ..utils.auth import Auth
-from .session import HubbleAPISession
+from ..utils.retry import RetryPolicy
+from ..utils.timeout import Deadline, TimeoutType, get_timeout, raise_timeout
+from .session import get_session
+
+# the rpc methods named after these verbs do not modify anything
+_READ_ONLY_PREFIXES = ('get', 'list', 'whoami')
+
+
+def _is_read_only(url: str) -> bool:
+    rpc_method = url.rstrip('/').rsplit('/', 1)[-1].rsplit('.', 1)[-1]
+    return rpc_method.startswith(_READ_ONLY_PREFIXES)
 
 
 class BaseClient(object):
     """Base Hubble Python API client.
 
+    The session is shared by all the clients with the same base url, the token
+    is sent with each request, see :func:`hubble.client.session.get_session`.
+
     :param max_retries: Number of allowed maximum retries.
     :param jsonify: Convert `requests.Response` object to json.
+    :param pool_connections: Optional number of connection pools to cache.
+    :param pool_maxsize: Optional maximum number of connections kept in a pool.
+    :param retry_policy: Optional retry policy, overrides ``max_retries``.
+    :param timeout: Optional default timeout of the requests in seconds, or
+        ``(connect, read)`` tuple, see :func:`hubble.utils.timeout.get_timeout`.
+    :param deadline: Optional default total time of a call in seconds,
+        including its retries.
     """
 
     def __init__(
@@ -22,26 +42,34 @@ class BaseClient(object):
         token: Optional[str] = None,
         max_retries: Optional[int] = None,
         jsonify: bool = False,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: TimeoutType = None,
+        deadline: Optional[float] = None,
     ):
-        self._session = HubbleAPISession()
-
         self.logger = logging.getLogger(self.__class__.__name__)
 
         self._token = token if token else Auth.get_auth_token()
-        if self._token:
-            self._session.init_jwt_auth(token=self._token)
-
         self._base_url = get_base_url()
         self._jsonify = jsonify
-        if max_retries:
-            from requests.adapters import HTTPAdapter
+        self._timeout = timeout
+        self._deadline = deadline
 
-            self._session.mount(
-                prefix=self._base_url, adapter=HTTPAdapter(max_retries=max_retries)
-            )
+        self._retry_policy = retry_policy or RetryPolicy(
+            max_attempts=(max_retries or 0) + 1
+        )
+
+        self._session = get_session(
+            self._base_url,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        )
 
     def _handle_error_request(self, resp: Union[requests.Response, dict]):
+        status_code = None
         if isinstance(resp, requests.Response):
+            status_code = resp.status_code
             resp = get_json_from_response(resp)
 
         message = resp.get('message', None)
@@ -50,7 +78,16 @@ class BaseClient(object):
 
         ExceptionCls = errorcodes[code]
 
-        raise ExceptionCls(response=resp, data=data, message=message, code=code)
+        error = ExceptionCls(response=resp, data=data, message=message, code=code)
+        error.status_code = status_code
+        raise error
+
+    def _log_retry(self, attempt: int, result: Any):
+        status = getattr(result, 'status_code', None) or repr(result)
+        self.logger.warning(
+            f'Request failed ({status}), retry attempt '
+            f'{attempt}/{self._retry_policy.max_attempts - 1}'
+        )
 
     def handle_request(
         self,
@@ -61,6 +98,8 @@ class BaseClient(object):
         headers: Optional[dict] = None,
         json: Optional[dict] = None,
         log_error: Optional[bool] = True,
+        timeout: TimeoutType = None,
+        deadline: Optional[float] = None,
     ) -> Union[requests.Response, dict]:
         """The basis request handler.
 
@@ -68,30 +107,59 @@ class BaseClient(object):
         The method leverages the ``HubbleAPISession`` to send
         POST requests based on parameters.
 
+        Failed requests are retried according to the retry policy of the
+        client. Calls which are not read-only carry an ``Idempotency-Key``
+        header, the same for all their attempts. Streaming bodies can not be
+        sent twice and are never retried.
+
         :param url: The url of the request.
         :param method: The request type, for v2 always set to POST.
         :param data: Optional data payloads to be send along with request.
         :param files: Optional files to be uploaded.
+        :param timeout: Optional timeout of each attempt in seconds, or
+            ``(connect, read)`` tuple, defaults to the timeout of the client.
+        :param deadline: Optional total time in seconds for all the attempts,
+            defaults to the deadline of the client.
         :returns: `requests.Response` object as returned value
             or dict if jsonify.
+        :raises RequestTimeoutError: if a request or the deadline timed out.
         """
         default_headers = {'jinameta-session-id': str(uuid.uuid1())}
+        if self._token:
+            default_headers['Authorization'] = f'token {self._token}'
+        if not _is_read_only(url):
+            default_headers['Idempotency-Key'] = str(uuid.uuid4())
         if headers:
             headers.update(default_headers)
         else:
             headers = default_headers
 
         session_id = headers.get('jinameta-session-id')
+        call_deadline = Deadline(deadline if deadline is not None else self._deadline)
 
-        try:
-            resp = self._session.request(
+        def _send():
+            return self._session.request(
                 method=method,
                 url=url,
                 data=data if data else None,
                 files=files,
                 headers=headers,
                 json=json if json else None,
+                timeout=get_timeout(
+                    timeout if timeout is not None else self._timeout, call_deadline
+                ),
             )
+
+        try:
+            with raise_timeout(f'Request {session_id}'):
+                if files or hasattr(data, 'read'):
+                    resp = _send()
+                else:
+                    resp = self._retry_policy.call(
+                        _send,
+                        deadline=call_deadline.remaining(),
+                        on_retry=self._log_retry,
+                    )
             if resp.status_code >= 400:
                 self._handle_error_request(resp)
 
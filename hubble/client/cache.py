@@ -0,0 +1,175 @@
+import hashlib
+import io
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from .download import get_artifact_checksum
+
+__all__ = ['ArtifactCache', 'get_artifact_cache']
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024 * 1024
+
+
+def get_artifact_cache_dir() -> Path:
+    """Get the folder where downloaded artifacts are cached.
+
+    :return: the path of the artifact cache folder
+    """
+    from ..executor.helper import get_download_cache_dir
+
+    return get_download_cache_dir() / 'artifacts'
+
+
+class ArtifactCache(object):
+    """A content-addressed on-disk cache of downloaded artifacts.
+
+    Entries are keyed by the artifact id and its checksum, or its
+    ``updatedAt`` if the metadata has no checksum, so a modified artifact is
+    never served from the cache. Artifacts are copied in and out of the
+    cache, never linked, so that modifying a downloaded or restored file can
+    not change a cache entry. Once the cache grows over ``max_bytes``, the
+    least recently used entries are evicted.
+
+    The cache can be shared by several processes, every change of the cache
+    folder happens under a ``filelock.FileLock``.
+
+    :param root: The cache folder, defaults to ``~/.cache/jina/artifacts``.
+    :param max_bytes: The size budget of the cache in bytes, defaults to the
+        ``JINA_ARTIFACT_CACHE_MAX_BYTES`` environment variable or 10 GiB.
+    """
+
+    def __init__(
+        self,
+        root: Optional[Union[str, Path]] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        import filelock
+
+        self.root = Path(root) if root else get_artifact_cache_dir()
+        self.root.mkdir(parents=True, exist_ok=True)
+        if max_bytes is None:
+            max_bytes = int(
+                os.environ.get('JINA_ARTIFACT_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+            )
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self._counter_lock = threading.Lock()
+        self._file_lock = filelock.FileLock(str(self.root / '.lock'), timeout=-1)
+
+    @staticmethod
+    def get_key(id: str, info: Dict[str, Any]) -> Optional[str]:
+        """Get the cache key of an artifact.
+
+        :param id: The id of the artifact.
+        :param info: The json returned by :meth:`Client.get_artifact_info`.
+        :returns: The key, or ``None`` if the artifact has neither a checksum
+            nor an ``updatedAt`` in its metadata.
+        """
+        checksum = get_artifact_checksum(info)
+        if checksum:
+            version = ':'.join(checksum)
+        else:
+            version = (info.get('data') or {}).get('updatedAt')
+            if not version:
+                return None
+        return hashlib.sha256(f'{id}:{version}'.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _count(self, hit: bool):
+        with self._counter_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str, f: Union[str, io.BytesIO]) -> bool:
+        """Restore a cached artifact.
+
+        :param key: The cache key from :meth:`get_key`.
+        :param f: The full path or the `io.BytesIO` to restore to.
+        :returns: Whether the artifact was in the cache.
+        """
+        entry = self._entry_path(key)
+        with self._file_lock:
+            if not entry.exists():
+                self._count(hit=False)
+                return False
+
+            # the modification time orders the entries for eviction
+            os.utime(entry)
+            if isinstance(f, str):
+                self._copy(entry, Path(f))
+            else:
+                with open(entry, 'rb') as fp:
+                    shutil.copyfileobj(fp, f)
+
+        self._count(hit=True)
+        return True
+
+    def put(self, key: str, f: Union[str, io.BytesIO]):
+        """Add a downloaded artifact to the cache and evict old entries.
+
+        :param key: The cache key from :meth:`get_key`.
+        :param f: The full path or the `io.BytesIO` of the downloaded artifact.
+        """
+        entry = self._entry_path(key)
+        with self._file_lock:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            if isinstance(f, str):
+                self._copy(Path(f), entry)
+            else:
+                tmp_path = entry.with_name(f'.{uuid.uuid4().hex}.tmp')
+                with open(tmp_path, 'wb') as fp:
+                    fp.write(f.getbuffer())
+                os.replace(tmp_path, entry)
+            self._evict()
+
+    @staticmethod
+    def _copy(src: Path, dst: Path):
+        # the cache owns the inodes of its entries, they are never shared
+        tmp_path = dst.with_name(f'.{dst.name}.{uuid.uuid4().hex}.tmp')
+        shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dst)
+
+    def _evict(self):
+        entries = []
+        for path in self.root.glob('??/*'):
+            if path.name.startswith('.'):
+                continue
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda x: x[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink()
+            total -= size
+
+    def clear(self):
+        """Remove all the entries of the cache."""
+        with self._file_lock:
+            for path in self.root.glob('??'):
+                shutil.rmtree(path, ignore_errors=True)
+
+
+_artifact_cache: Optional[ArtifactCache] = None
+
+
+def get_artifact_cache() -> ArtifactCache:
+    """Get the process-wide default :class:`ArtifactCache`.
+
+    :return: the default artifact cache
+    """
+    global _artifact_cache
+    if _artifact_cache is None:
+        _artifact_cache = ArtifactCache()
+    return _artifact_cache
@@ -1,6 +1,7 @@
 import io
 import json
-from typing import Dict, List, Optional, Union
+import os
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Union
 
 import requests
 
@@ -8,6 +9,10 @@ from ..utils.api_utils import get_json_from_response
 from ..utils.jwt_parser import validate_jwt
 from .base import BaseClient
 from .endpoints import EndpointsV2
+from .upload import DEFAULT_PART_SIZE, ChunkedUploader
+
+if TYPE_CHECKING:
+    from .cache import ArtifactCache
 
 
 class Client(BaseClient):
@@ -127,6 +132,9 @@ class Client(BaseClient):
         metadata: Optional[dict] = None,
         is_public: bool = False,
         show_progress: bool = False,
+        chunked: bool = False,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_workers: int = 4,
     ) -> Union[requests.Response, dict]:
         """Upload artifact to Hubble Artifact Storage.
 
@@ -136,48 +144,34 @@ class Client(BaseClient):
         :param metadata: Optional value, the metadata of the artifact.
         :param is_public: Optional value, if this artifact is public or not,
           default not public.
+        :param show_progress: Optional value, if to show the upload progress bar.
+        :param chunked: Optional value, if set, the file is split in parts which are
+          uploaded concurrently. An interrupted chunked upload of a file given by
+          path is resumed from the parts already uploaded.
+        :param part_size: Optional value, size of each part in bytes when chunked.
+        :param max_workers: Optional value, number of parts uploaded concurrently
+          when chunked.
         :returns: `requests.Response` object as returned value
             or indented json if jsonify.
+
+        .. note::
+            The file is streamed in chunks, it is never fully loaded in memory.
         """
         from rich import filesize
 
+        from ..utils.multipart import MultipartEncoder
         from ..utils.pbar import get_progressbar
 
         self.get_user_info()  # to make sure the user is logged in.
 
         pbar = get_progressbar(disable=not show_progress)
 
-        class BufferReader(io.BytesIO):
-            def __init__(self, buf=b''):
-                super().__init__(buf)
-                self._len = len(buf)
-
-                self.task = pbar.add_task(
-                    'Uploading',
-                    total=self._len,
-                    start=True,
-                    total_size=str(filesize.decimal(self._len)),
-                )
-
-            def __len__(self):
-                return self._len
-
-            def read(self, n=-1):
-                chunk = io.BytesIO.read(self, n)
-                pbar.update(self.task, advance=len(chunk))
-                return chunk
-
-        if isinstance(f, str):
-            f = open(f, 'rb')
-        elif not isinstance(f, io.BytesIO):
+        if not isinstance(f, (str, io.BytesIO)):
             raise TypeError(
                 f'Unexpected type {type(f)}, expect either `str` or `io.BytesIO`.'
             )
 
-        dict_data = {
-            'public': is_public,
-            'file': ('file', f.read()),
-        }
+        dict_data = {'public': is_public}
 
         if id:
             dict_data['id'] = id
@@ -186,31 +180,102 @@ class Client(BaseClient):
         if metadata:
             dict_data['metaData'] = json.dumps(metadata)
 
-        (data, ctype) = requests.packages.urllib3.filepost.encode_multipart_formdata(
-            dict_data
-        )
+        def _advance(n: int):
+            pbar.update(task, advance=n)
 
-        headers = {'Content-Type': ctype}
+        if chunked:
+            size = os.path.getsize(f) if isinstance(f, str) else len(f.getbuffer())
+            task = pbar.add_task(
+                'Uploading',
+                total=size,
+                start=True,
+                total_size=str(filesize.decimal(size)),
+            )
 
-        with pbar:
-            return self.handle_request(
-                url=self._base_url + EndpointsV2.upload_artifact,
-                data=BufferReader(data),
-                headers=headers,
+            uploader = ChunkedUploader(
+                self, part_size=part_size, max_workers=max_workers
+            )
+            with pbar:
+                return uploader.upload(f, dict_data, callback=_advance)
+
+        fp = open(f, 'rb') if isinstance(f, str) else f
+        dict_data['file'] = ('file', fp)
+
+        try:
+            data = MultipartEncoder(dict_data, callback=_advance)
+            task = pbar.add_task(
+                'Uploading',
+                total=len(data),
+                start=True,
+                total_size=str(filesize.decimal(len(data))),
             )
 
+            headers = {'Content-Type': data.content_type}
+
+            with pbar:
+                return self.handle_request(
+                    url=self._base_url + EndpointsV2.upload_artifact,
+                    data=data,
+                    headers=headers,
+                )
+        finally:
+            if fp is not f:
+                fp.close()
+
     def download_artifact(
-        self, id: str, f: Union[str, io.BytesIO], show_progress: bool = False
+        self,
+        id: str,
+        f: Union[str, io.BytesIO],
+        show_progress: bool = False,
+        max_workers: int = 4,
+        resume: bool = True,
+        cache: Union[bool, 'ArtifactCache'] = False,
     ) -> str:
         """Download artifact from Hubble Artifact Storage to localhost.
 
+        If the storage supports byte ranges and ``f`` is a path, the artifact
+        is downloaded in up to ``max_workers`` concurrent ranges, otherwise it
+        is downloaded with a single stream.
+
+        A path is first downloaded to ``<f>.part``, which is resumed if it
+        exists, and only moved to ``f`` once the content matches the checksum
+        from :meth:`get_artifact_info`.
+
         :param id: The id of the artifact to be downloaded.
         :param f: The full path or the `io.BytesIO` of the file to be downloaded.
+        :param show_progress: If set, show the download progress.
+        :param max_workers: Maximum number of concurrent range requests.
+        :param resume: If set, resume from an existing ``<f>.part`` file.
+        :param cache: If set, restore the artifact from the local artifact cache
+            when possible, and add it to the cache after the download. Either
+            ``True`` for the default cache under ``~/.cache/jina/artifacts``,
+            or an :class:`ArtifactCache`.
         :returns: A str object indicates the download path on localhost or bytes.
         """
+        import hashlib
+
         from rich import filesize
 
         from ..utils.pbar import get_progressbar
+        from .cache import get_artifact_cache
+        from .download import RangedDownloader, get_artifact_checksum
+
+        if not isinstance(f, (str, io.BytesIO)):
+            raise TypeError(
+                f'Unexpected type {type(f)}, expect either `str` or `io.BytesIO`.'
+            )
+
+        info = self.get_artifact_info(id=id)
+        if isinstance(info, requests.Response):
+            info = get_json_from_response(info)
+        checksum = get_artifact_checksum(info)
+        hasher = hashlib.new(checksum[0]) if checksum else None
+
+        if cache is True:
+            cache = get_artifact_cache()
+        cache_key = cache.get_key(id, info) if cache else None
+        if cache_key and cache.get(cache_key, f):
+            return f
 
         # first get download uri.
         resp = self.handle_request(
@@ -223,32 +288,41 @@ class Client(BaseClient):
             resp = get_json_from_response(resp)
         download_url = resp['data']['download']
 
+        downloader = RangedDownloader(max_workers=max_workers, timeout=self._timeout)
+        size, accept_ranges = downloader.probe(download_url)
+        target = f'{f}.part' if isinstance(f, str) else f
+
         pbar = get_progressbar(disable=not show_progress)
 
         with pbar:
-            with requests.get(download_url, stream=True) as response:
-                total = int(response.headers.get('content-length'))
-                task = pbar.add_task(
-                    'Downloading',
-                    total=total,
-                    start=True,
-                    total_size=str(filesize.decimal(total)),
-                )
+            task = pbar.add_task(
+                'Downloading',
+                total=size,
+                start=True,
+                total_size=str(filesize.decimal(size or 0)),
+            )
+            downloader.download(
+                download_url,
+                target,
+                callback=lambda n: pbar.update(task, advance=n),
+                size=size,
+                accept_ranges=accept_ranges,
+                hasher=hasher,
+                resume=resume,
+            )
+
+        if checksum and hasher.hexdigest() != checksum[1]:
+            if isinstance(f, str):
+                os.remove(target)
+            raise RuntimeError(
+                f'{checksum[0].upper()} checksum of artifact {id} failed. '
+                'Might happen when the network is unstable, please retry.'
+            )
 
-                if isinstance(f, str):
-                    with open(f, 'wb') as writer:
-                        for data in response.iter_content(chunk_size=1024 * 1024):
-                            writer.write(data)
-                            pbar.update(task, advance=len(data))
-                elif isinstance(f, io.BytesIO):
-                    for data in response.iter_content(chunk_size=1024 * 1024):
-                        f.write(data)
-                        pbar.update(task, advance=len(data))
-                else:
-                    raise TypeError(
-                        f'Unexpected type {type(f)}, expect either'
-                        '`str` or `io.BytesIO`.'
-                    )
+        if isinstance(f, str):
+            os.replace(target, f)
+        if cache_key:
+            cache.put(cache_key, f)
         return f
 
     def delete_artifact(
@@ -362,6 +436,60 @@ class Client(BaseClient):
             json={key: value for (key, value) in data.items() if value is not None},
         )
 
+    def iter_artifacts(
+        self,
+        *,
+        filter: Optional[dict] = None,
+        sort: Optional[Dict[str, int]] = None,
+        page_size: int = 100,
+        max_items: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """Iterate over artifacts, page by page.
+
+        The next page is fetched in the background while the current one is
+        consumed, and only these two pages are held in memory.
+
+        :param filter: optional, to filter by fields.
+        :param sort: optional, to sort by fields.
+        :param page_size: number of items fetched per request.
+        :param max_items: optional, maximum number of items to yield.
+        :yields: the artifact dicts.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        if page_size <= 0:
+            raise ValueError(f'`page_size` must be positive, got {page_size}.')
+
+        def _fetch(page_index: int) -> List[dict]:
+            resp = self.list_artifacts(
+                filter=filter, sort=sort, pageIndex=page_index, pageSize=page_size
+            )
+            if isinstance(resp, requests.Response):
+                resp = get_json_from_response(resp)
+            return resp.get('data') or []
+
+        remaining = max_items
+        pool = ThreadPoolExecutor(max_workers=1)
+        try:
+            page_index = 1
+            future = pool.submit(_fetch, page_index)
+            while future is not None and (remaining is None or remaining > 0):
+                items = future.result()
+                future = None
+                # a partial page is the last one
+                if len(items) >= page_size and (
+                    remaining is None or remaining > len(items)
+                ):
+                    page_index += 1
+                    future = pool.submit(_fetch, page_index)
+
+                for item in items[:remaining]:
+                    yield item
+                if remaining is not None:
+                    remaining -= min(remaining, len(items))
+        finally:
+            pool.shutdown(wait=False)
+
     def list_internal_docker_registries(
         self,
     ) -> Union[requests.Response, dict]:
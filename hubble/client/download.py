@@ -0,0 +1,435 @@
+import io
+import json
+import math
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import requests
+
+from ..utils.retry import RetryPolicy
+from ..utils.timeout import TimeoutType, get_timeout, raise_timeout
+
+__all__ = ['RangedDownloader', 'IncompleteRangeError', 'get_artifact_checksum']
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_MIN_PART_SIZE = 8 * 1024 * 1024
+# the resume state is saved once this many bytes or seconds passed since the last save
+STATE_SAVE_BYTES = 8 * 1024 * 1024
+STATE_SAVE_INTERVAL = 1.0
+
+_CONTENT_RANGE_PATTERN = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+
+# preferred first
+_CHECKSUM_ALGORITHMS = ('sha256', 'md5')
+
+
+class IncompleteRangeError(IOError):
+    """A byte range which was not fully received, worth another attempt."""
+
+
+def get_artifact_checksum(info: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """Get the checksum of an artifact from its metadata.
+
+    :param info: The json returned by :meth:`Client.get_artifact_info`.
+    :returns: A tuple of the hash algorithm and the hex digest,
+        or ``None`` if the metadata has no checksum.
+    """
+    data = info.get('data') or {}
+    for source in (data, data.get('metaData') or {}):
+        for algorithm in _CHECKSUM_ALGORITHMS:
+            if isinstance(source.get(algorithm), str):
+                return algorithm, source[algorithm].lower()
+    return None
+
+
+class RangedDownloader(object):
+    """Download a URL with concurrent byte-range requests.
+
+    The server is probed for ``Range`` support first. If ranges are supported
+    and the target is a file path, the file is preallocated and split in up to
+    ``max_workers`` parts, each fetched by its own request and written in
+    place with positional writes. Otherwise the content is fetched with a
+    single streaming request.
+
+    With ``resume=True``, a partially downloaded file is completed instead of
+    being downloaded again. The progress of ranged downloads is kept in a
+    ``<path>.json`` file next to it, removed once the download is complete.
+    It is saved every ``STATE_SAVE_BYTES`` or ``STATE_SAVE_INTERVAL`` seconds
+    and when the download fails, so at worst the last bytes of each range
+    are downloaded again.
+
+    :param max_workers: Maximum number of concurrent range requests.
+    :param chunk_size: Number of bytes read from a response at once.
+    :param min_part_size: Files smaller than ``2 * min_part_size`` are not split.
+    :param max_retries: Number of attempts for each part, an attempt resumes
+        from the last byte written by the previous one.
+    :param retry_policy: Optional retry policy of the parts, overrides
+        ``max_retries``. Its backoff and ``Retry-After`` are honored, and
+        besides its retryable errors, a part cut short is retried as well.
+        Local errors, such as a full disk, are never retried.
+    :param session: Optional `requests.Session` used for the requests.
+    :param timeout: Optional timeout of each request in seconds, or
+        ``(connect, read)`` tuple, see :func:`hubble.utils.timeout.get_timeout`.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        min_part_size: int = DEFAULT_MIN_PART_SIZE,
+        max_retries: int = 3,
+        retry_policy: Optional[RetryPolicy] = None,
+        session: Optional[requests.Session] = None,
+        timeout: TimeoutType = None,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.chunk_size = chunk_size
+        self.min_part_size = min_part_size
+        self.max_retries = max_retries
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=max_retries)
+        self.timeout = get_timeout(timeout)
+
+        if session is None:
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=self.max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self._session = session
+        self._write_lock = threading.Lock()
+
+    def probe(self, url: str) -> Tuple[Optional[int], bool]:
+        """Get the size of the content and whether ranges are supported.
+
+        A one-byte ``GET`` is used instead of ``HEAD``, since signed storage
+        URLs are usually only valid for ``GET``.
+
+        :param url: The url to probe.
+        :returns: A tuple of the content size (``None`` if unknown)
+            and whether byte ranges are supported.
+        """
+        with raise_timeout('Probing the download'), self._session.get(
+            url, headers={'Range': 'bytes=0-0'}, stream=True, timeout=self.timeout
+        ) as response:
+            if response.status_code == 206:
+                match = _CONTENT_RANGE_PATTERN.match(
+                    response.headers.get('Content-Range', '')
+                )
+                if match and match.group(3) != '*':
+                    return int(match.group(3)), True
+                return None, False
+            elif response.status_code == 416:
+                # an empty content can not satisfy any range
+                return 0, False
+
+            response.raise_for_status()
+            length = response.headers.get('Content-Length')
+            return (int(length) if length is not None else None), False
+
+    def split(self, size: int) -> List[Tuple[int, int]]:
+        """Split ``size`` bytes in inclusive ``(start, end)`` ranges.
+
+        :param size: The size of the content.
+        :returns: The list of byte ranges.
+        """
+        if size <= 0:
+            return []
+        num_parts = min(self.max_workers, size // max(1, self.min_part_size))
+        num_parts = max(1, num_parts)
+        part_size = math.ceil(size / num_parts)
+        return [
+            (start, min(start + part_size, size) - 1)
+            for start in range(0, size, part_size)
+        ]
+
+    def download(
+        self,
+        url: str,
+        f: Union[str, io.BytesIO],
+        callback: Optional[Callable[[int], Any]] = None,
+        size: Optional[int] = None,
+        accept_ranges: Optional[bool] = None,
+        hasher: Optional[Any] = None,
+        resume: bool = False,
+    ) -> Union[str, io.BytesIO]:
+        """Download the content of ``url`` to ``f``.
+
+        :param url: The url to download.
+        :param f: The full path or the `io.BytesIO` to write to.
+        :param callback: Optional callable receiving the number of bytes
+            every time a chunk is written.
+        :param size: Optional content size, probed if not given.
+        :param accept_ranges: Optional range support, probed if not given.
+        :param hasher: Optional ``hashlib`` object updated with the content.
+        :param resume: If set and ``f`` is a path, complete the existing file.
+        :returns: ``f``
+        """
+        if not isinstance(f, (str, io.BytesIO)):
+            raise TypeError(
+                f'Unexpected type {type(f)}, expect either `str` or `io.BytesIO`.'
+            )
+
+        if size is None or accept_ranges is None:
+            size, accept_ranges = self.probe(url)
+
+        with raise_timeout('The download'):
+            if isinstance(f, str):
+                ranged = accept_ranges and size
+                if ranged and not os.path.exists(self._state_path(f)):
+                    # the rest of a plain partial file can be split in ranges too
+                    offset = self._get_resume_offset(f, size) if resume else 0
+                    ranged = len(self.split(size - offset)) > 1
+
+                if ranged:
+                    self._download_ranges(url, f, size, callback, resume)
+                    if hasher is not None:
+                        self._hash_file(f, hasher)
+                else:
+                    self._download_file(
+                        url, f, size, accept_ranges, callback, hasher, resume
+                    )
+            else:
+                self._download_stream(url, f, callback, hasher)
+        return f
+
+    @staticmethod
+    def _state_path(path: str) -> str:
+        return f'{path}.json'
+
+    @staticmethod
+    def _get_resume_offset(path: str, size: Optional[int]) -> int:
+        try:
+            offset = os.path.getsize(path)
+        except OSError:
+            return 0
+        return offset if size is not None and offset <= size else 0
+
+    def _hash_file(self, path: str, hasher: Any, length: Optional[int] = None):
+        with open(path, 'rb') as fp:
+            while length is None or length > 0:
+                data = fp.read(
+                    self.chunk_size if length is None else min(self.chunk_size, length)
+                )
+                if not data:
+                    break
+                hasher.update(data)
+                if length is not None:
+                    length -= len(data)
+
+    def _download_file(
+        self,
+        url: str,
+        path: str,
+        size: Optional[int],
+        accept_ranges: bool,
+        callback: Optional[Callable[[int], Any]],
+        hasher: Optional[Any],
+        resume: bool,
+    ):
+        offset = self._get_resume_offset(path, size) if resume and accept_ranges else 0
+        if offset and offset == size:
+            if hasher is not None:
+                self._hash_file(path, hasher)
+            if callback:
+                callback(offset)
+            return
+
+        headers = {'Range': f'bytes={offset}-'} if offset else None
+        with self._session.get(
+            url, headers=headers, stream=True, timeout=self.timeout
+        ) as response:
+            response.raise_for_status()
+            if offset and response.status_code == 206:
+                if hasher is not None:
+                    self._hash_file(path, hasher, offset)
+                if callback:
+                    callback(offset)
+                mode = 'ab'
+            else:
+                mode = 'wb'
+
+            with open(path, mode) as fp:
+                self._write_response(response, fp, callback, hasher)
+
+    def _download_stream(
+        self,
+        url: str,
+        fp: io.RawIOBase,
+        callback: Optional[Callable[[int], Any]],
+        hasher: Optional[Any],
+    ):
+        with self._session.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            self._write_response(response, fp, callback, hasher)
+
+    def _write_response(
+        self,
+        response: requests.Response,
+        fp: io.RawIOBase,
+        callback: Optional[Callable[[int], Any]],
+        hasher: Optional[Any],
+    ):
+        for data in response.iter_content(chunk_size=self.chunk_size):
+            fp.write(data)
+            if hasher is not None:
+                hasher.update(data)
+            if callback:
+                callback(len(data))
+
+    def _pwrite(self, fd: int, data: bytes, offset: int):
+        if hasattr(os, 'pwrite'):
+            os.pwrite(fd, data, offset)
+        else:  # pragma: no cover
+            with self._write_lock:
+                os.lseek(fd, offset, os.SEEK_SET)
+                os.write(fd, data)
+
+    def _download_ranges(
+        self,
+        url: str,
+        path: str,
+        size: int,
+        callback: Optional[Callable[[int], Any]],
+        resume: bool,
+    ):
+        state_path = self._state_path(path)
+        state = None
+        if resume:
+            try:
+                with open(state_path) as fp:
+                    state = json.load(fp)
+            except (OSError, ValueError):
+                pass
+            if (
+                not state
+                or state.get('size') != size
+                or self._get_resume_offset(path, size) != size
+            ):
+                state = None
+
+        if state is None:
+            offset = (
+                self._get_resume_offset(path, size)
+                if resume and not os.path.exists(state_path)
+                else 0
+            )
+            state = {
+                'size': size,
+                'ranges': [
+                    [offset + start, offset + end]
+                    for start, end in self.split(size - offset)
+                ],
+            }
+            self._save_state(state_path, state)
+            with open(path, 'ab' if offset else 'wb') as fp:
+                fp.truncate(size)
+
+        if callback:
+            done = size - sum(end + 1 - start for start, end in state['ranges'])
+            if done:
+                callback(done)
+
+        # bytes downloaded since the last save, and its time
+        unsaved = [0, time.monotonic()]
+
+        def _progress(index: int, offset: int):
+            with self._write_lock:
+                unsaved[0] += offset - state['ranges'][index][0]
+                state['ranges'][index][0] = offset
+                if (
+                    unsaved[0] >= STATE_SAVE_BYTES
+                    or time.monotonic() - unsaved[1] >= STATE_SAVE_INTERVAL
+                ):
+                    self._save_state(state_path, state)
+                    unsaved[:] = [0, time.monotonic()]
+
+        fd = os.open(path, os.O_RDWR | getattr(os, 'O_BINARY', 0))
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, len(state['ranges']))) as pool:
+                futures = [
+                    pool.submit(
+                        self._fetch_range,
+                        url,
+                        fd,
+                        start,
+                        end,
+                        callback,
+                        lambda offset, index=index: _progress(index, offset),
+                    )
+                    for index, (start, end) in enumerate(state['ranges'])
+                    if start <= end
+                ]
+                for future in futures:
+                    future.result()
+        except BaseException:
+            with self._write_lock:
+                self._save_state(state_path, state)
+            raise
+        finally:
+            os.close(fd)
+
+        os.remove(state_path)
+
+    @staticmethod
+    def _save_state(state_path: str, state: dict):
+        tmp_path = f'{state_path}.tmp'
+        with open(tmp_path, 'w') as fp:
+            json.dump(state, fp)
+        os.replace(tmp_path, state_path)
+
+    def _fetch_range(
+        self,
+        url: str,
+        fd: int,
+        start: int,
+        end: int,
+        callback: Optional[Callable[[int], Any]],
+        on_progress: Optional[Callable[[int], Any]] = None,
+    ) -> int:
+        offset = start
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                with self._session.get(
+                    url,
+                    headers={'Range': f'bytes={offset}-{end}'},
+                    stream=True,
+                    timeout=self.timeout,
+                ) as response:
+                    if response.status_code != 206:
+                        response.raise_for_status()
+                        raise IncompleteRangeError(
+                            f'Expected a partial response for bytes {offset}-{end}, '
+                            f'got status code {response.status_code}.'
+                        )
+                    for data in response.iter_content(chunk_size=self.chunk_size):
+                        data = data[: end + 1 - offset]
+                        self._pwrite(fd, data, offset)
+                        offset += len(data)
+                        if on_progress:
+                            on_progress(offset)
+                        if callback:
+                            callback(len(data))
+                        if offset > end:
+                            break
+
+                if offset > end:
+                    return offset - start
+                raise IncompleteRangeError(
+                    f'Connection closed after {offset - start} bytes '
+                    f'of the range {start}-{end}.'
+                )
+            except (requests.exceptions.RequestException, IncompleteRangeError) as e:
+                # the local errors, e.g. a full disk, are not retried
+                if attempt >= self.retry_policy.max_attempts or (
+                    isinstance(e, requests.exceptions.HTTPError)
+                    and not self.retry_policy.is_retryable(e)
+                ):
+                    raise
+                time.sleep(self.retry_policy.get_delay(attempt, e))
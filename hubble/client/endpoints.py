@@ -17,6 +17,9 @@ class EndpointsV2(object):
     delete_pat: str = 'user.pat.delete'
 
     upload_artifact: str = 'artifact.upload'
+    create_artifact_upload: str = 'artifact.multipartUpload.create'
+    upload_artifact_part: str = 'artifact.multipartUpload.uploadPart'
+    complete_artifact_upload: str = 'artifact.multipartUpload.complete'
     download_artifact: str = 'artifact.getDownloadUrl'
     delete_artifact: str = 'artifact.delete'
     delete_multiple_artifacts: str = 'artifact.deleteMany'
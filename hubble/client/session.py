@@ -1,9 +1,16 @@
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Optional
+
 import requests
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 
 from ..utils import get_base_url
+from ..utils.timeout import TimeoutType, get_timeout, raise_timeout
 from .endpoints import EndpointsV2
 
-__all__ = ['HubbleAPISession']
+__all__ = ['HubbleAPISession', 'get_session', 'clear_sessions']
 
 
 class HubbleAPISession(requests.Session):
@@ -32,16 +39,116 @@ class HubbleAPISession(requests.Session):
         """
         self.headers.update({'Authorization': f'token {token}'})
 
-    def validate_token(self) -> requests.Response:
+    def validate_token(self, timeout: TimeoutType = None) -> requests.Response:
         """Validate API token.
 
         This function will call the whoami endpoint from Hubble API
         to get user info.
 
+        :param timeout: Optional timeout in seconds, or ``(connect, read)`` tuple.
         :return: a `requests.Response` object from Hubble API server.
         """
         url = get_base_url() + EndpointsV2.get_user_info
-        resp = requests.post(url, headers=self.headers)
+        with raise_timeout('Validating the token'):
+            resp = requests.post(
+                url, headers=self.headers, timeout=get_timeout(timeout)
+            )
         resp.raise_for_status()
 
         return resp
+
+
+class _PooledHTTPAdapter(HTTPAdapter):
+    """An ``HTTPAdapter`` enabling TCP keep-alive on its pooled connections."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        import socket
+
+        from urllib3.connection import HTTPConnection
+
+        kwargs.setdefault(
+            'socket_options',
+            HTTPConnection.default_socket_options
+            + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)],
+        )
+        super().init_poolmanager(*args, **kwargs)
+
+
+_sessions: Dict[str, HubbleAPISession] = {}
+_sessions_lock = threading.Lock()
+
+
+def _prewarm(session: HubbleAPISession, base_url: str):
+    try:
+        session.head(base_url, timeout=10)
+    except requests.exceptions.RequestException:
+        # only an optimization, the first request connects instead
+        pass
+
+
+def get_session(
+    base_url: str,
+    pool_connections: Optional[int] = None,
+    pool_maxsize: Optional[int] = None,
+    prewarm: Optional[bool] = None,
+) -> HubbleAPISession:
+    """Get the process-wide ``HubbleAPISession`` of a base url.
+
+    Sessions are created once per base url and reused by every client, so
+    that their pooled keep-alive connections are shared instead of opening a
+    new connection for each client. The session is shared by all the tokens,
+    the clients send their ``Authorization`` header with each request, and
+    it keeps no cookies.
+
+    The pool options only apply when the session is created. They default to
+    the ``JINA_HUBBLE_POOL_CONNECTIONS``, ``JINA_HUBBLE_POOL_MAXSIZE`` and
+    ``JINA_HUBBLE_POOL_PREWARM`` environment variables.
+
+    :param base_url: The base url of the Hubble API.
+    :param pool_connections: Number of connection pools to cache.
+    :param pool_maxsize: Maximum number of connections kept in a pool.
+    :param prewarm: If set, open a connection to ``base_url`` in the background.
+    :return: the shared session
+    """
+    with _sessions_lock:
+        session = _sessions.get(base_url)
+        if session is not None:
+            return session
+
+        if pool_connections is None:
+            pool_connections = int(
+                os.environ.get('JINA_HUBBLE_POOL_CONNECTIONS', DEFAULT_POOLSIZE)
+            )
+        if pool_maxsize is None:
+            pool_maxsize = int(
+                os.environ.get('JINA_HUBBLE_POOL_MAXSIZE', DEFAULT_POOLSIZE)
+            )
+        if prewarm is None:
+            prewarm = os.environ.get('JINA_HUBBLE_POOL_PREWARM', '').lower() in (
+                '1',
+                'true',
+                'yes',
+            )
+
+        session = HubbleAPISession()
+        # the cookies set for a token must not be sent with the other tokens
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = _PooledHTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _sessions[base_url] = session
+
+    if prewarm:
+        threading.Thread(target=_prewarm, args=(session, base_url), daemon=True).start()
+    return session
+
+
+def clear_sessions():
+    """Close and forget all the shared sessions."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
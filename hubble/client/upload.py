@@ -0,0 +1,293 @@
+import hashlib
+import io
+import json
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Union
+
+import requests
+
+from ..utils.api_utils import get_json_from_response
+from ..utils.multipart import MultipartEncoder
+from .endpoints import EndpointsV2
+
+if TYPE_CHECKING:
+    from .base import BaseClient
+
+__all__ = ['ChunkedUploader']
+
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+
+
+def get_upload_journal_dir() -> Path:
+    """Get the folder where the journals of resumable uploads are stored.
+
+    :return: the path of the upload journal folder
+    """
+    from ..executor.helper import get_download_cache_dir
+
+    journal_dir = get_download_cache_dir() / 'upload-journal'
+    journal_dir.mkdir(parents=True, exist_ok=True)
+    return journal_dir
+
+
+class UploadJournal(object):
+    """A small JSON file keeping the state of one resumable upload.
+
+    The journal stores the upload id returned by Hubble and the parts which
+    have already been uploaded, so that an interrupted upload only sends the
+    missing parts when it is started again.
+
+    :param path: The path of the journal file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self) -> Optional[dict]:
+        try:
+            with open(self.path) as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, state: dict):
+        with self._lock:
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as fp:
+                json.dump(state, fp)
+            os.replace(tmp_path, self.path)
+
+    def discard(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ChunkedUploader(object):
+    """Upload a file to Hubble Artifact Storage in parallel parts.
+
+    The file is split in ``part_size`` parts, which are uploaded concurrently
+    on a thread pool. At most ``max_inflight_bytes`` are read in memory at
+    once, failed parts are retried on their own, and the upload is finished
+    with a single commit call listing all the parts.
+
+    When the file is given as a path, the progress is kept in an
+    :class:`UploadJournal` so that an interrupted upload can be resumed.
+
+    :param client: The client used to send the requests.
+    :param part_size: Size of each part in bytes.
+    :param max_workers: Number of parts uploaded concurrently.
+    :param max_inflight_bytes: Maximum number of bytes held in memory,
+        defaults to ``part_size * max_workers``.
+    :param max_part_retries: Number of attempts for each part.
+    :param journal_dir: Folder of the upload journals,
+        defaults to ``~/.cache/jina/upload-journal``.
+    """
+
+    def __init__(
+        self,
+        client: 'BaseClient',
+        part_size: int = DEFAULT_PART_SIZE,
+        max_workers: int = 4,
+        max_inflight_bytes: Optional[int] = None,
+        max_part_retries: int = 3,
+        journal_dir: Optional[Union[str, Path]] = None,
+    ):
+        if part_size <= 0:
+            raise ValueError(f'`part_size` must be positive, got {part_size}.')
+
+        self._client = client
+        self.part_size = part_size
+        self.max_workers = max_workers
+        self.max_inflight_bytes = max_inflight_bytes or part_size * max_workers
+        self.max_part_retries = max_part_retries
+        self._journal_dir = Path(journal_dir) if journal_dir else None
+        self._lock = threading.Lock()
+
+    def _request(self, url: str, **kwargs) -> dict:
+        resp = self._client.handle_request(url=self._client._base_url + url, **kwargs)
+        if isinstance(resp, requests.Response):
+            resp = get_json_from_response(resp)
+        return resp
+
+    def _get_journal(self, path: str, size: int, fields: Dict[str, Any]):
+        stat = os.stat(path)
+        key = json.dumps(
+            [
+                os.path.abspath(path),
+                size,
+                stat.st_mtime_ns,
+                self.part_size,
+                {k: str(v) for k, v in fields.items()},
+            ],
+            sort_keys=True,
+        )
+        journal_dir = self._journal_dir or get_upload_journal_dir()
+        journal_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return UploadJournal(journal_dir / f'{digest}.json')
+
+    def _create_upload(self, fields: Dict[str, Any], size: int, num_parts: int) -> str:
+        resp = self._request(
+            EndpointsV2.create_artifact_upload,
+            data={
+                **fields,
+                'size': size,
+                'partSize': self.part_size,
+                'parts': num_parts,
+            },
+        )
+        return resp['data']['uploadId']
+
+    def _upload_part(
+        self,
+        upload_id: str,
+        part_number: int,
+        read_part: Callable[[int, int], bytes],
+        part_length: int,
+    ) -> str:
+        from ..executor.helper import retry
+
+        offset = (part_number - 1) * self.part_size
+
+        @retry(num_retry=self.max_part_retries)
+        def _send():
+            chunk = read_part(offset, part_length)
+            data = MultipartEncoder(
+                {
+                    'uploadId': upload_id,
+                    'partNumber': part_number,
+                    'md5': hashlib.md5(chunk).hexdigest(),
+                    'file': ('file', chunk),
+                }
+            )
+            resp = self._request(
+                EndpointsV2.upload_artifact_part,
+                data=data,
+                headers={'Content-Type': data.content_type},
+            )
+            return resp['data']['etag']
+
+        return _send()
+
+    def upload(
+        self,
+        f: Union[str, io.BytesIO],
+        fields: Dict[str, Any],
+        callback: Optional[Callable[[int], Any]] = None,
+    ) -> Union[requests.Response, dict]:
+        """Upload the file and commit the artifact.
+
+        :param f: The full path or the `io.BytesIO` of the file to be uploaded.
+        :param fields: The form fields of the artifact, e.g. ``name`` or ``public``.
+        :param callback: Optional callable receiving the number of bytes
+            every time a part is uploaded.
+        :returns: The response of the commit call, the same as
+            :meth:`Client.upload_artifact`.
+        """
+        buffer = None
+        if isinstance(f, str):
+            size = os.path.getsize(f)
+            journal = self._get_journal(f, size, fields)
+
+            def read_part(offset: int, length: int) -> bytes:
+                with open(f, 'rb') as fp:
+                    fp.seek(offset)
+                    return fp.read(length)
+
+        elif isinstance(f, io.BytesIO):
+            buffer = f.getbuffer()
+            size = len(buffer)
+            journal = None
+
+            def read_part(offset: int, length: int) -> bytes:
+                end = offset + length
+                return bytes(buffer[offset:end])
+
+        else:
+            raise TypeError(
+                f'Unexpected type {type(f)}, expect either `str` or `io.BytesIO`.'
+            )
+
+        try:
+            return self._upload(size, read_part, journal, fields, callback)
+        finally:
+            if buffer is not None:
+                buffer.release()
+
+    def _upload(
+        self,
+        size: int,
+        read_part: Callable[[int, int], bytes],
+        journal: Optional[UploadJournal],
+        fields: Dict[str, Any],
+        callback: Optional[Callable[[int], Any]],
+    ) -> Union[requests.Response, dict]:
+        num_parts = max(1, math.ceil(size / self.part_size))
+
+        state = journal.load() if journal else None
+        if not state or state.get('size') != size:
+            state = {
+                'uploadId': self._create_upload(fields, size, num_parts),
+                'size': size,
+                'parts': {},
+            }
+            if journal:
+                journal.save(state)
+
+        def part_length(part_number: int) -> int:
+            return min(self.part_size, size - (part_number - 1) * self.part_size)
+
+        if callback:
+            done = sum(part_length(int(n)) for n in state['parts'])
+            if done:
+                callback(done)
+
+        slots = threading.BoundedSemaphore(
+            max(1, self.max_inflight_bytes // self.part_size)
+        )
+
+        def _run(part_number: int):
+            try:
+                etag = self._upload_part(
+                    state['uploadId'], part_number, read_part, part_length(part_number)
+                )
+            finally:
+                slots.release()
+
+            with self._lock:
+                state['parts'][str(part_number)] = etag
+                if journal:
+                    journal.save(state)
+            if callback:
+                callback(part_length(part_number))
+
+        pending = [n for n in range(1, num_parts + 1) if str(n) not in state['parts']]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = []
+            for part_number in pending:
+                slots.acquire()
+                futures.append(pool.submit(_run, part_number))
+            wait(futures)
+
+        for future in futures:
+            # keep the journal so that the next call only uploads the failed parts
+            future.result()
+
+        parts = [
+            {'partNumber': int(n), 'etag': etag}
+            for n, etag in sorted(state['parts'].items(), key=lambda x: int(x[0]))
+        ]
+        resp = self._client.handle_request(
+            url=self._client._base_url + EndpointsV2.complete_artifact_upload,
+            json={'uploadId': state['uploadId'], 'parts': parts},
+        )
+        if journal:
+            journal.discard()
+        return resp
@@ -6,6 +6,8 @@ class BaseError(Exception):
     response = None
     data = {}
     code = -1
+    # the HTTP status code of the response, if any
+    status_code = None
     message = "An unknown error occurred"
 
     def __init__(
@@ -133,6 +135,13 @@ class ResponseStreamClosedError(BaseError):
     ...
 
 
+class RequestTimeoutError(BaseError, TimeoutError):
+    """Raised when a request, or the deadline of a call, times out."""
+
+    code = None
+    message = "The request timed out"
+
+
 errorcodes = {
     -1: BaseError,
     40001: ParamValidationError,
@@ -0,0 +1,452 @@
+"""Module writing and reading the zip archives of executor packages."""
+
+import collections
+import os
+import shutil
+import struct
+import tempfile
+import zipfile
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+
+# the timestamp of all the files of an archive, the earliest one zip supports
+ARCHIVE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+ARCHIVE_COMPRESS_LEVEL = 6
+ZSTD_COMPRESS_LEVEL = 3
+
+# the compression method id of Zstandard in the zip specification
+ZIP_ZSTANDARD = 93
+
+CODECS = ('deflate', 'zstd')
+
+# the files of a folder listing the paths under it to leave out of its archive
+IGNORE_FILES = ('.gitignore', '.jinaignore')
+
+# already compressed files are stored as they are
+STORED_EXTENSIONS = frozenset(
+    [
+        '.7z',
+        '.bz2',
+        '.flac',
+        '.gif',
+        '.gz',
+        '.jar',
+        '.jpeg',
+        '.jpg',
+        '.mkv',
+        '.mov',
+        '.mp3',
+        '.mp4',
+        '.npz',
+        '.ogg',
+        '.png',
+        '.rar',
+        '.tgz',
+        '.webp',
+        '.whl',
+        '.woff2',
+        '.xz',
+        '.zip',
+        '.zst',
+    ]
+)
+
+_READ_SIZE = 1024 * 1024
+# compressed members larger than this wait on disk for their turn
+_SPOOL_SIZE = 4 * 1024 * 1024
+
+_ZIP64_LIMIT = 0xFFFFFFFF
+_ZIP_FILECOUNT_LIMIT = 0xFFFF
+
+_LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+_CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+_END_RECORD = struct.Struct('<IHHHHIIH')
+_END_RECORD_64 = struct.Struct('<IQHHIIQQQQ')
+_END_LOCATOR_64 = struct.Struct('<IIQI')
+
+
+def _dos_date_time(date_time: Tuple[int, ...]) -> Tuple[int, int]:
+    year, month, day, hour, minute, second = date_time
+    return (
+        (year - 1980) << 9 | month << 5 | day,
+        hour << 11 | minute << 5 | second // 2,
+    )
+
+
+def _get_compressor(method: int) -> Any:
+    if method == zipfile.ZIP_DEFLATED:
+        return zlib.compressobj(ARCHIVE_COMPRESS_LEVEL, zlib.DEFLATED, -15)
+    elif method == ZIP_ZSTANDARD:
+        return (
+            _import_zstandard().ZstdCompressor(level=ZSTD_COMPRESS_LEVEL).compressobj()
+        )
+    return None
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            'Zstandard compressed archives require the `zstandard` package, '
+            'please run `pip install "jina-hubble-sdk[zstd]"`'
+        ) from None
+    return zstandard
+
+
+class _Member:
+    """A file compressed for an archive, waiting to be written."""
+
+    __slots__ = ('name', 'mode', 'method', 'crc', 'file_size', 'compress_size', 'data')
+
+    def __init__(self, name: str, mode: int, method: int):
+        self.name = name
+        self.mode = mode
+        self.method = method
+        self.crc = 0
+        self.file_size = 0
+        self.compress_size = 0
+        self.data = tempfile.SpooledTemporaryFile(max_size=_SPOOL_SIZE)
+
+    def compress(self, path: Path) -> '_Member':
+        compressor = _get_compressor(self.method)
+        with path.open('rb') as src:
+            for block in iter(lambda: src.read(_READ_SIZE), b''):
+                self.crc = zlib.crc32(block, self.crc)
+                self.file_size += len(block)
+                if compressor is not None:
+                    block = compressor.compress(block)
+                self.data.write(block)
+            if compressor is not None:
+                self.data.write(compressor.flush())
+        self.compress_size = self.data.tell()
+        self.data.seek(0)
+        return self
+
+
+def _get_method(path: Path, codec: str) -> int:
+    if path.suffix.lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    if codec == 'zstd':
+        return ZIP_ZSTANDARD
+    return zipfile.ZIP_DEFLATED
+
+
+def _compile_patterns(lines: Iterable[str]) -> List[Any]:
+    import pathspec
+
+    lines = [line.strip() for line in lines]
+    spec = pathspec.PathSpec.from_lines(
+        'gitwildmatch', [line for line in lines if line and not line.startswith('#')]
+    )
+    return [pattern for pattern in spec.patterns if pattern.include is not None]
+
+
+def _is_ignored(rules: List[Tuple[str, List[Any]]], rel_path: str) -> bool:
+    """Apply the rules from the root to the deepest folder, the last match wins.
+
+    :param rules: the prefix of the folder of each ignore file and its patterns
+    :param rel_path: the path from the root, ending with `/` for a folder
+    :return: whether the path is ignored
+    """
+    ignored = False
+    for prefix, patterns in rules:
+        start = len(prefix)
+        path = rel_path[start:]
+        for pattern in patterns:
+            if pattern.regex.match(path):
+                ignored = pattern.include
+    return ignored
+
+
+def walk_package(
+    root: Path,
+    ignore_files: Iterable[str] = IGNORE_FILES,
+    default_ignore: Iterable[str] = (),
+    always_ignore: Iterable[str] = (),
+) -> Iterator[Tuple[str, Path, os.stat_result]]:
+    """Walk the files of a package in a stable order, skipping the ignored ones.
+
+    The ignore files of each folder apply to the paths under it, with the
+    `.gitignore` semantics: the rules of deeper folders win, and an ignored
+    folder is not walked at all, so its files can not be included again.
+
+    :param root: the folder of the package
+    :param ignore_files: the names of the ignore files, read in this order
+    :param default_ignore: the patterns used when the root has no
+        `.gitignore`
+    :param always_ignore: the patterns which no rule can include again
+    :yield: the path from the root, the path and the stat of each file, in
+        the order of the names, a folder being walked at its place
+    """
+    ignore_files = list(ignore_files)
+    forced_rules = [('', _compile_patterns(always_ignore))]
+
+    def _walk(path: Path, prefix: str, rules: List[Tuple[str, List[Any]]]):
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+
+        names = {entry.name: entry for entry in entries}
+        patterns = []
+        for name in ignore_files:
+            entry = names.get(name)
+            if entry is not None and entry.is_file():
+                with open(entry.path) as fp:
+                    patterns.extend(_compile_patterns(fp))
+            elif not prefix and name == '.gitignore':
+                patterns.extend(_compile_patterns(default_ignore))
+        if patterns:
+            rules = rules + [(prefix, patterns)]
+
+        for entry in entries:
+            is_dir = entry.is_dir()
+            rel_path = prefix + entry.name + ('/' if is_dir else '')
+            if _is_ignored(forced_rules, rel_path) or _is_ignored(rules, rel_path):
+                continue
+            if is_dir:
+                yield from _walk(Path(entry.path), rel_path, rules)
+            else:
+                yield rel_path, Path(entry.path), entry.stat()
+
+    yield from _walk(root, '', [])
+
+
+def write_zip(
+    files: Iterable[Tuple],
+    write: Callable[[bytes], Any],
+    codec: str = 'deflate',
+    workers: Optional[int] = None,
+):
+    """Write a zip archive of files, compressing them concurrently.
+
+    The members are compressed on a thread pool and written in the order of
+    ``files``. The archive only depends on the names, contents and executable
+    bits of the files, the timestamps and the permissions being fixed, so the
+    same files always give the same bytes.
+
+    :param files: the names in the archive and the paths of the files, and
+        optionally their `os.stat_result`, as given by :func:`walk_package`
+    :param write: called with the successive bytes of the archive
+    :param codec: `deflate`, or `zstd` which requires the `zstandard` package,
+        files with an extension in ``STORED_EXTENSIONS`` are not compressed
+    :param workers: the number of compressing threads, up to 8 by default
+    """
+    if codec not in CODECS:
+        raise ValueError(f'Unknown archive codec `{codec}`, use one of {CODECS}.')
+    if codec == 'zstd':
+        _import_zstandard()
+
+    workers = workers or min(8, os.cpu_count() or 1)
+    date, time = _dos_date_time(ARCHIVE_DATE_TIME)
+    offset = 0
+    central_directory: List[bytes] = []
+
+    def _write(data: bytes):
+        nonlocal offset
+        write(data)
+        offset += len(data)
+
+    def _write_member(member: _Member):
+        name = member.name.encode('utf-8')
+        flags = 0 if member.name.isascii() else 0x800
+        header_offset = offset
+
+        zip64 = max(member.file_size, member.compress_size) >= _ZIP64_LIMIT
+        extract_version = 45 if zip64 else 20
+        if member.method == ZIP_ZSTANDARD:
+            extract_version = 63
+
+        local_extra = b''
+        if zip64:
+            local_extra = struct.pack(
+                '<HHQQ', 1, 16, member.file_size, member.compress_size
+            )
+        _write(
+            _LOCAL_HEADER.pack(
+                0x04034B50,
+                extract_version,
+                flags,
+                member.method,
+                time,
+                date,
+                member.crc,
+                _ZIP64_LIMIT if zip64 else member.compress_size,
+                _ZIP64_LIMIT if zip64 else member.file_size,
+                len(name),
+                len(local_extra),
+            )
+            + name
+            + local_extra
+        )
+        with member.data:
+            for block in iter(lambda: member.data.read(_READ_SIZE), b''):
+                _write(block)
+
+        zip64_fields = []
+        sizes = []
+        for value in (member.file_size, member.compress_size):
+            if value >= _ZIP64_LIMIT:
+                zip64_fields.append(value)
+                value = _ZIP64_LIMIT
+            sizes.append(value)
+        if header_offset >= _ZIP64_LIMIT:
+            zip64_fields.append(header_offset)
+        extra = b''
+        if zip64_fields:
+            extract_version = max(extract_version, 45)
+            extra = struct.pack(
+                f'<HH{len(zip64_fields)}Q',
+                1,
+                8 * len(zip64_fields),
+                *zip64_fields,
+            )
+        central_directory.append(
+            _CENTRAL_HEADER.pack(
+                0x02014B50,
+                3 << 8 | extract_version,  # made on unix
+                extract_version,
+                flags,
+                member.method,
+                time,
+                date,
+                member.crc,
+                sizes[1],
+                sizes[0],
+                len(name),
+                len(extra),
+                0,
+                0,
+                0,
+                member.mode << 16,
+                min(header_offset, _ZIP64_LIMIT),
+            )
+            + name
+            + extra
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = collections.deque()
+        try:
+            for name, path, *stat in files:
+                st_mode = stat[0].st_mode if stat else path.stat().st_mode
+                mode = 0o100755 if st_mode & 0o100 else 0o100644
+                member = _Member(name, mode, _get_method(path, codec))
+                pending.append(pool.submit(member.compress, path))
+                # bounds the compressed members waiting to be written
+                if len(pending) >= 2 * workers:
+                    _write_member(pending.popleft().result())
+            while pending:
+                _write_member(pending.popleft().result())
+        finally:
+            for future in pending:
+                if not future.cancel() and not future.exception():
+                    future.result().data.close()
+
+    directory_offset = offset
+    for header in central_directory:
+        _write(header)
+    directory_size = offset - directory_offset
+
+    count = len(central_directory)
+    if (
+        count >= _ZIP_FILECOUNT_LIMIT
+        or directory_offset >= _ZIP64_LIMIT
+        or directory_size >= _ZIP64_LIMIT
+    ):
+        _write(
+            _END_RECORD_64.pack(
+                0x06064B50,
+                44,
+                3 << 8 | 45,
+                45,
+                0,
+                0,
+                count,
+                count,
+                directory_size,
+                directory_offset,
+            )
+            + _END_LOCATOR_64.pack(0x07064B50, 0, offset, 1)
+        )
+        count = min(count, _ZIP_FILECOUNT_LIMIT)
+        directory_offset = min(directory_offset, _ZIP64_LIMIT)
+        directory_size = min(directory_size, _ZIP64_LIMIT)
+
+    _write(
+        _END_RECORD.pack(
+            0x06054B50,
+            0,
+            0,
+            count,
+            count,
+            directory_size,
+            directory_offset,
+            0,
+        )
+    )
+
+
+def _open_zstd_member(filepath: Path, info: zipfile.ZipInfo) -> IO[bytes]:
+    """Open a Zstandard member, which ``zipfile`` does not support."""
+    with open(filepath, 'rb') as fp:
+        return _read_zstd_member(fp, info)
+
+
+def _read_zstd_member(fp: IO[bytes], info: zipfile.ZipInfo) -> IO[bytes]:
+    fp.seek(info.header_offset)
+    header = fp.read(_LOCAL_HEADER.size)
+    if len(header) != _LOCAL_HEADER.size or header[:4] != b'PK\x03\x04':
+        raise zipfile.BadZipFile(f'Bad local header of {info.filename}')
+    *_, name_length, extra_length = _LOCAL_HEADER.unpack(header)
+    fp.seek(name_length + extra_length, os.SEEK_CUR)
+
+    data = tempfile.SpooledTemporaryFile(max_size=_SPOOL_SIZE)
+    decompressor = _import_zstandard().ZstdDecompressor().decompressobj()
+    crc = 0
+    remaining = info.compress_size
+    while remaining:
+        block = fp.read(min(remaining, _READ_SIZE))
+        if not block:
+            raise zipfile.BadZipFile(f'Truncated member {info.filename}')
+        remaining -= len(block)
+        block = decompressor.decompress(block)
+        crc = zlib.crc32(block, crc)
+        data.write(block)
+    if crc != info.CRC:
+        raise zipfile.BadZipFile(f'Bad CRC-32 for file {info.filename}')
+    data.seek(0)
+    return data
+
+
+def extract_zip(filepath: Path, target_dir: Path):
+    """Extract a zip archive, including the members compressed by Zstandard.
+
+    :param filepath: the path of the archive
+    :param target_dir: the path of the target folder
+    """
+    with zipfile.ZipFile(filepath, 'r') as archive:
+        infos = archive.infolist()
+        if all(info.compress_type != ZIP_ZSTANDARD for info in infos):
+            archive.extractall(target_dir)
+            return
+
+        root = Path(target_dir).resolve()
+        for info in infos:
+            target = (root / info.filename).resolve()
+            if target != root and root not in target.parents:
+                raise zipfile.BadZipFile(
+                    f'Member {info.filename} is out of the archive'
+                )
+            if info.is_dir():
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if info.compress_type == ZIP_ZSTANDARD:
+                src = _open_zstd_member(filepath, info)
+            else:
+                src = archive.open(info)
+            with src, target.open('wb') as dst:
+                shutil.copyfileobj(src, dst)
@@ -0,0 +1,168 @@
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, NamedTuple, Optional, Union
+
+__all__ = ['MetaCache', 'CacheEntry']
+
+DEFAULT_TTL = 3600
+DEFAULT_STALE_TTL = 7 * 24 * 3600
+
+_SQLITE_HEADER = b'SQLite format 3\x00'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    fresh_until REAL NOT NULL,
+    stale_until REAL NOT NULL
+)
+'''
+
+
+class CacheEntry(NamedTuple):
+    """A cached value and the times until which it can be served."""
+
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.fresh_until
+
+    @property
+    def is_stale(self) -> bool:
+        """Whether the value is expired, but can be served while refreshed."""
+        return self.fresh_until <= time.time() < self.stale_until
+
+
+class MetaCache(object):
+    """An on-disk cache of metadata, in a SQLite database shared by processes.
+
+    The database is in WAL mode, so readers never wait for each other nor
+    for a writer, and each write is a single short transaction. No global
+    lock is taken, except to replace a file which is not a SQLite database,
+    e.g. the ``shelve`` file of an older version.
+
+    Each entry is fresh for ``ttl`` seconds, then stale for ``stale_ttl``
+    more seconds, during which it can still be served while it is refreshed.
+    Expired entries are kept to be served when Hubble can not be reached.
+
+    :param path: The path of the database file.
+    :param ttl: Seconds an entry is fresh, defaults to the
+        ``JINA_HUBBLE_META_CACHE_TTL`` environment variable or one hour.
+    :param stale_ttl: Seconds an entry is stale after ``ttl``, defaults to the
+        ``JINA_HUBBLE_META_CACHE_STALE_TTL`` environment variable or a week.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.path = str(path)
+        if ttl is None:
+            ttl = float(os.environ.get('JINA_HUBBLE_META_CACHE_TTL', DEFAULT_TTL))
+        if stale_ttl is None:
+            stale_ttl = float(
+                os.environ.get('JINA_HUBBLE_META_CACHE_STALE_TTL', DEFAULT_STALE_TTL)
+            )
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+        self._local = threading.local()
+
+    def _reset_if_invalid(self):
+        """Remove the database file if it is in another format."""
+        import filelock
+
+        with filelock.FileLock(f'{self.path}.lock', timeout=-1):
+            try:
+                with open(self.path, 'rb') as fp:
+                    header = fp.read(len(_SQLITE_HEADER))
+            except FileNotFoundError:
+                return
+            if header and header != _SQLITE_HEADER:
+                self.logger.debug(f'Resetting the cache {self.path} in another format')
+                for suffix in ('', '-wal', '-shm'):
+                    try:
+                        os.remove(self.path + suffix)
+                    except FileNotFoundError:
+                        pass
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(_SCHEMA)
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        # one connection per thread, and per process after a fork
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            try:
+                connection = self._connect()
+            except sqlite3.DatabaseError:
+                self._reset_if_invalid()
+                connection = self._connect()
+            self._local.connection = connection
+            self._local.pid = pid
+        return self._local.connection
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry, even expired.
+
+        :param key: The key of the entry.
+        :returns: The entry, or ``None`` if it is not in the cache.
+        """
+        row = self._connection.execute(
+            'SELECT value, fresh_until, stale_until FROM cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, fresh_until, stale_until = row
+        return CacheEntry(pickle.loads(value), fresh_until, stale_until)
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Add or replace an entry.
+
+        :param key: The key of the entry.
+        :param value: The value to cache, it must be picklable.
+        :param ttl: Optional seconds the entry is fresh, instead of ``ttl``.
+        """
+        now = time.time()
+        fresh_until = now + (self.ttl if ttl is None else ttl)
+        self._connection.execute(
+            'INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)',
+            (
+                key,
+                pickle.dumps(value, protocol=4),
+                fresh_until,
+                fresh_until + self.stale_ttl,
+            ),
+        )
+
+    def delete(self, key: str):
+        """Remove an entry.
+
+        :param key: The key of the entry.
+        """
+        self._connection.execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def clear(self):
+        """Remove all the entries of the cache."""
+        self._connection.execute('DELETE FROM cache')
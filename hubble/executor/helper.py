@@ -6,19 +6,17 @@ import io
 import json
 import logging
 import os
-import shelve
 import subprocess
 import sys
 import tarfile
+import threading
 import urllib
 import uuid
 import warnings
-import zipfile
-from contextlib import nullcontext
 from enum import IntEnum
 from functools import lru_cache, wraps
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Optional, Tuple, Union
 from urllib.parse import urljoin, urlparse
 
 from hubble import get_token
@@ -31,6 +29,10 @@ from hubble.executor.requirements import (
 from hubble.utils.api_utils import get_base_url
 from rich.console import Console
 
+if TYPE_CHECKING:
+    from hubble.utils.retry import RetryPolicy
+    from hubble.utils.timeout import TimeoutType
+
 default_logger = logging.getLogger(__name__)
 
 __resources_path__ = os.path.join(
@@ -66,7 +68,8 @@ def get_cache_db() -> Path:
     :return: the path of cache db of hub Executors
     """
     root = Path(__cache_path__)
-    cache_db = root.joinpath('disk_cache.db')
+    # not `disk_cache.db`, the `shelve` file of older versions
+    cache_db = root.joinpath('disk_cache.sqlite')
 
     return cache_db
 
@@ -99,32 +102,38 @@ def get_rich_console():
 def retry(
     num_retry: int = 3,
     message: str = 'Calling {func_name} failed, retry attempt {attempt}/{num_retry}. Error: {error!r}',
+    policy: Optional['RetryPolicy'] = None,
 ):
     """
-    Retry calling a function again in case of an error.
+    Retry calling a function again in case of a retryable error.
+
+    Only connection errors, timeouts and errors with a retryable HTTP status
+    code are retried, with an exponential backoff, see
+    :class:`hubble.utils.retry.RetryPolicy`.
 
     :param num_retry: number of times to retry
     :param message: message to log when error happened
+    :param policy: optional retry policy, overrides ``num_retry``
     :return: wrapper
     """
+    from ..utils.retry import RetryPolicy
+
+    policy = policy or RetryPolicy(max_attempts=num_retry)
 
     def decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            for i in range(num_retry):
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    default_logger.warning(
-                        message.format(
-                            func_name=func.__name__,
-                            attempt=i + 1,
-                            num_retry=num_retry,
-                            error=e,
-                        )
+            def _on_retry(attempt, error):
+                default_logger.warning(
+                    message.format(
+                        func_name=func.__name__,
+                        attempt=attempt,
+                        num_retry=policy.max_attempts,
+                        error=error,
                     )
-                    if i + 1 == num_retry:
-                        raise
+                )
+
+            return policy.call(func, *args, on_retry=_on_retry, **kwargs)
 
         return wrapper
 
@@ -141,27 +150,31 @@ def random_uuid(use_uuid1: bool = False) -> uuid.UUID:
     return uuid.uuid1() if use_uuid1 else uuid.uuid4()
 
 
-def get_ci_vendor() -> Optional[str]:
+@lru_cache()
+def _get_ci_vendors() -> list:
     with open(os.path.join(__resources_path__, 'ci-vendors.json')) as fp:
-        all_cis = json.load(fp)
-        for c in all_cis:
-            if isinstance(c['env'], str) and c['env'] in os.environ:
-                return c['constant']
-            elif isinstance(c['env'], dict):
-                for k, v in c['env'].items():
-                    if os.environ.get(k, None) == v:
-                        return c['constant']
-            elif isinstance(c['env'], list):
-                for k in c['env']:
-                    if k in os.environ:
-                        return c['constant']
+        return json.load(fp)
 
 
-def get_full_version() -> Optional[Tuple[Dict, Dict]]:
-    """
-    Get the version of libraries used in Jina and environment variables.
+def get_ci_vendor() -> Optional[str]:
+    for c in _get_ci_vendors():
+        if isinstance(c['env'], str) and c['env'] in os.environ:
+            return c['constant']
+        elif isinstance(c['env'], dict):
+            for k, v in c['env'].items():
+                if os.environ.get(k, None) == v:
+                    return c['constant']
+        elif isinstance(c['env'], list):
+            for k in c['env']:
+                if k in os.environ:
+                    return c['constant']
 
-    :return: Version information and environment variables
+
+@lru_cache()
+def _get_environment_info() -> Optional[Tuple[Dict, Dict]]:
+    """Get the version information which does not change during the process.
+
+    ``session-id`` is left unset, it is generated for each call.
     """
     import os
     import platform
@@ -196,33 +209,58 @@ def get_full_version() -> Optional[Tuple[Dict, Dict]]:
             'architecture': platform.machine(),
             'processor': platform.processor(),
             'uid': getnode(),
-            'session-id': str(random_uuid(use_uuid1=True)),
+            'session-id': None,
             'uptime': __uptime__,
             'ci-vendor': get_ci_vendor() or __unset_msg__,
             'internal': 'jina-ai'
             in os.getenv('GITHUB_ACTION_REPOSITORY', __unset_msg__),
         }
 
-        full_version = info, env_info
+        return info, env_info
     except Exception as e:
         default_logger.error(str(e))
-        full_version = None
+        return None
 
-    return full_version
 
+def get_full_version() -> Optional[Tuple[Dict, Dict]]:
+    """
+    Get the version of libraries used in Jina and environment variables.
 
-def get_request_header() -> Dict:
-    """Return the header of request with an authorization token.
+    Everything but the session id is computed once per process.
 
-    :return: request header
+    :return: Version information and environment variables
     """
-    metas, envs = get_full_version()
+    full_version = _get_environment_info()
+    if full_version is None:
+        return None
+
+    info, env_info = full_version
+    info = dict(info)
+    info['session-id'] = str(random_uuid(use_uuid1=True))
+    return info, dict(env_info)
 
-    headers = {
+
+@lru_cache()
+def _get_static_request_header() -> Dict:
+    metas, envs = _get_environment_info()
+
+    return {
         **{f'jinameta-{k}': str(v) for k, v in metas.items()},
         **envs,
     }
 
+
+def get_request_header() -> Dict:
+    """Return the header of request with an authorization token.
+
+    The header is built once per process, only the session id and the token
+    are set for each request.
+
+    :return: request header
+    """
+    headers = dict(_get_static_request_header())
+    headers['jinameta-session-id'] = str(random_uuid(use_uuid1=True))
+
     auth_token = get_token()
     if auth_token:
         headers['Authorization'] = f'token {auth_token}'
@@ -368,8 +406,9 @@ def unpack_package(filepath: 'Path', target_dir: 'Path'):
     :param target_dir: the path of target folder
     """
     if filepath.suffix == '.zip':
-        with zipfile.ZipFile(filepath, 'r') as zip:
-            zip.extractall(target_dir)
+        from hubble.executor.archive import extract_zip
+
+        extract_zip(filepath, target_dir)
     elif filepath.suffix in ['.tar', '.gz']:
         with tarfile.open(filepath) as tar:
             tar.extractall(target_dir)
@@ -377,51 +416,169 @@ def unpack_package(filepath: 'Path', target_dir: 'Path'):
         raise ValueError('File format is not supported for unpacking.')
 
 
-def archive_package(package_folder: 'Path') -> 'io.BytesIO':
+def _write_package(
+    package_folder: 'Path',
+    write: Callable[[bytes], Any],
+    codec: str = 'deflate',
+    workers: Optional[int] = None,
+):
+    """Archive the given folder in zip format.
+
+    See :func:`walk_package` for the files left out, and :func:`write_zip`
+    for the archive.
+
+    :param package_folder: the folder path of the package
+    :param write: called with the successive bytes of the archive
+    :param codec: the compression of the files, `deflate` or `zstd`
+    :param workers: the number of compressing threads
+    """
+    from hubble.executor.archive import walk_package, write_zip
+
+    with open(Path(__resources_path__) / 'Python.gitignore') as fp:
+        default_ignore = fp.read().splitlines()
+
+    files = walk_package(
+        package_folder.resolve(),
+        default_ignore=default_ignore,
+        always_ignore=['.git', '.jina'],
+    )
+    write_zip(files, write, codec=codec, workers=workers)
+
+
+def archive_package(
+    package_folder: 'Path', codec: str = 'deflate', workers: Optional[int] = None
+) -> 'io.BytesIO':
     """
     Archives the given folder in zip format and return a data stream.
     :param package_folder: the folder path of the package
+    :param codec: the compression of the files, `deflate` or `zstd`
+    :param workers: the number of compressing threads
     :return: the data stream of zip content
     """
+    zip_stream = io.BytesIO()
+    _write_package(package_folder, zip_stream.write, codec=codec, workers=workers)
+    zip_stream.seek(0)
 
-    import pathspec
+    return zip_stream
 
-    root_path = package_folder.resolve()
 
-    gitignore = root_path / '.gitignore'
-    if not gitignore.exists():
-        gitignore = Path(__resources_path__) / 'Python.gitignore'
+def package_md5(package_folder: 'Path') -> str:
+    """Get the MD5 checksum of the archive of a folder, without keeping it.
 
-    with gitignore.open() as fp:
-        ignore_lines = [
-            line.strip() for line in fp if line.strip() and (not line.startswith('#'))
-        ]
-        ignore_lines += ['.git', '.jina']
-        ignored_spec = pathspec.PathSpec.from_lines('gitwildmatch', ignore_lines)
+    :param package_folder: the folder path of the package
+    :return: the MD5 checksum, as sent when the package is pushed
+    """
+    md5_hash = hashlib.md5()
+    _write_package(package_folder, md5_hash.update)
+    return md5_hash.hexdigest()
 
-    zip_stream = io.BytesIO()
-    try:
-        zfile = zipfile.ZipFile(zip_stream, 'w', compression=zipfile.ZIP_DEFLATED)
-    except EnvironmentError as e:
-        raise e
 
-    def _zip(base_path, path, archive):
+class PackageStream:
+    """Archive a folder in zip format while the archive is being read.
+
+    The zip file is written by a background thread into a bounded queue of
+    chunks, so that the first chunks can be uploaded while the later files
+    are still being compressed, and the archive is never held in memory as a
+    whole. The MD5 checksum is computed on the fly.
+
+    .. highlight:: python
+    .. code-block:: python
 
-        for p in path.iterdir():
-            rel_path = p.relative_to(base_path)
-            if ignored_spec.match_file(str(rel_path)):
+        package = PackageStream(Path('my_executor'))
+        for chunk in package:
+            ...
+        md5sum = package.hexdigest()
+
+    :param package_folder: the folder path of the package
+    :param chunk_size: the size of the chunks
+    :param max_chunks: the maximum number of chunks waiting to be read
+    :param codec: the compression of the files, `deflate` or `zstd`
+    :param workers: the number of compressing threads
+    """
+
+    def __init__(
+        self,
+        package_folder: 'Path',
+        chunk_size: int = 64 * 1024,
+        max_chunks: int = 16,
+        codec: str = 'deflate',
+        workers: Optional[int] = None,
+    ):
+        import queue
+
+        self.package_folder = package_folder
+        self.codec = codec
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.size = 0
+
+        self._md5 = hashlib.md5()
+        self._buffer = bytearray()
+        self._chunks = queue.Queue(maxsize=max_chunks)
+        self._error = None
+        self._closed = False
+        self._done = False
+
+    def _write(self, data: bytes):
+        if self._closed:
+            raise IOError('The package stream was closed by its reader.')
+
+        self._md5.update(data)
+        self.size += len(data)
+        self._buffer += data
+        if len(self._buffer) >= self.chunk_size:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+
+    def _put(self, chunk: Optional[bytes]):
+        import queue
+
+        while not self._closed:
+            try:
+                self._chunks.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
                 continue
-            if p.is_dir():
-                _zip(base_path, p, archive)
-            else:
-                archive.write(p, rel_path)
 
-    _zip(root_path, root_path, zfile)
+    def _run(self):
+        try:
+            _write_package(
+                self.package_folder,
+                self._write,
+                codec=self.codec,
+                workers=self.workers,
+            )
+            if self._buffer:
+                self._put(bytes(self._buffer))
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._put(None)
+
+    def __iter__(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        try:
+            while True:
+                chunk = self._chunks.get()
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            # unblock the writer if the reader stops early
+            self._closed = True
 
-    zfile.close()
-    zip_stream.seek(0)
+        if self._error is not None:
+            raise self._error
+        self._done = True
 
-    return zip_stream
+    def hexdigest(self) -> str:
+        """Get the MD5 checksum of the archive, once it is fully read.
+
+        :return: the MD5 checksum
+        """
+        if not self._done:
+            raise RuntimeError('The package stream is not fully read yet.')
+        return self._md5.hexdigest()
 
 
 def download_with_resume(
@@ -429,6 +586,8 @@ def download_with_resume(
     target_dir: 'Path',
     filename: Optional[str] = None,
     md5sum: Optional[str] = None,
+    timeout: 'TimeoutType' = None,
+    deadline: Optional[float] = None,
 ) -> 'Path':
     """
     Download file from url to target_dir, and check md5sum.
@@ -439,10 +598,15 @@ def download_with_resume(
     :param target_dir: the target path for the file
     :param filename: the filename of the downloaded file
     :param md5sum: the MD5 checksum to match
+    :param timeout: the timeout of each request in seconds, or a `(connect, read)` tuple
+    :param deadline: the total time in seconds of the download
 
     :return: the filepath of the downloaded file
     """
     import requests
+    from hubble.utils.timeout import Deadline, get_timeout, raise_timeout
+
+    call_deadline = Deadline(deadline)
 
     def _download(url, target, resume_byte_pos: int = None):
         resume_header = (
@@ -450,7 +614,12 @@ def download_with_resume(
         )
 
         try:
-            r = requests.get(url, stream=True, headers=resume_header)
+            r = requests.get(
+                url,
+                stream=True,
+                headers=resume_header,
+                timeout=get_timeout(timeout, call_deadline),
+            )
         except requests.exceptions.RequestException as e:
             raise e
 
@@ -460,12 +629,15 @@ def download_with_resume(
         with target.open(mode=mode) as f:
             for chunk in r.iter_content(32 * block_size):
                 f.write(chunk)
+                # raises once the deadline is exceeded, the download can be resumed
+                call_deadline.remaining()
 
     if filename is None:
         filename = url.split('/')[-1]
     filepath = target_dir / filename
 
-    head_info = requests.head(url)
+    with raise_timeout(f'Downloading {url}'):
+        head_info = requests.head(url, timeout=get_timeout(timeout, call_deadline))
     file_size_online = int(head_info.headers.get('content-length', 0))
 
     _resume_byte_pos = None
@@ -477,7 +649,8 @@ def download_with_resume(
         if file_size_online > file_size_offline:
             _resume_byte_pos = file_size_offline
 
-    _download(url, filepath, _resume_byte_pos)
+    with raise_timeout(f'Downloading {url}'):
+        _download(url, filepath, _resume_byte_pos)
 
     if md5sum and not md5file(filepath) == md5sum:
         raise RuntimeError(
@@ -493,34 +666,51 @@ def download_with_resume(
 def upload_file(
     url: str,
     file_name: str,
-    buffer_data: bytes,
+    buffer_data: Union[bytes, Iterable[bytes]],
     dict_data: Dict,
     headers: Dict,
     stream: bool = False,
     method: str = 'post',
+    timeout: 'TimeoutType' = None,
 ):
     """Upload file to target url
 
     :param url: target url
     :param file_name: the file name
-    :param buffer_data: the data to upload
-    :param dict_data: the dict-style data to upload
+    :param buffer_data: the data to upload, `bytes` or an iterable of `bytes`
+    :param dict_data: the dict-style data to upload, callable values are
+        called and sent after the data, e.g. to send its checksum
     :param headers: the request header
     :param stream: receive stream response
     :param method: the request method
+    :param timeout: the timeout in seconds, or a `(connect, read)` tuple
     :return: the response of request
     """
     import requests
+    from hubble.utils.timeout import get_timeout, raise_timeout
 
     dict_data.update({'file': (file_name, buffer_data)})
 
-    (data, ctype) = requests.packages.urllib3.filepost.encode_multipart_formdata(
-        dict_data
-    )
+    if isinstance(buffer_data, bytes) and not any(map(callable, dict_data.values())):
+        (data, ctype) = requests.packages.urllib3.filepost.encode_multipart_formdata(
+            dict_data
+        )
+    else:
+        from hubble.utils.multipart import iter_multipart_formdata
+
+        # streamed with chunked transfer encoding, while the data is produced
+        (data, ctype) = iter_multipart_formdata(dict_data)
 
     headers.update({'Content-Type': ctype})
 
-    response = getattr(requests, method)(url, data=data, headers=headers, stream=stream)
+    with raise_timeout(f'Uploading {file_name}'):
+        response = getattr(requests, method)(
+            url,
+            data=data,
+            headers=headers,
+            stream=stream,
+            timeout=get_timeout(timeout, stream=stream),
+        )
 
     return response
 
@@ -532,6 +722,7 @@ def status_task(
     headers: Dict,
     stream: bool = False,
     method: str = 'post',
+    timeout: 'TimeoutType' = None,
 ):
     """Query building status progress of the executor
 
@@ -541,10 +732,12 @@ def status_task(
     :param headers: the request header
     :param stream: receive stream response
     :param method: the request method
+    :param timeout: the timeout in seconds, or a `(connect, read)` tuple
     :return: the response of request
     """
 
     import requests
+    from hubble.utils.timeout import get_timeout, raise_timeout
 
     dict_data['id'] = id
     (data, ctype) = requests.packages.urllib3.filepost.encode_multipart_formdata(
@@ -553,7 +746,14 @@ def status_task(
 
     headers.update({'Content-Type': ctype})
     # asyncTask.getDetail
-    response = getattr(requests, method)(url, data=data, headers=headers, stream=stream)
+    with raise_timeout(f'Getting the status of task {id}'):
+        response = getattr(requests, method)(
+            url,
+            data=data,
+            headers=headers,
+            stream=stream,
+            timeout=get_timeout(timeout, stream=stream),
+        )
     return response
 
 
@@ -605,66 +805,102 @@ def get_async_tasks(
 
 
 def disk_cache_offline(
-    cache_file: str = 'disk_cache.db',
+    cache_file: str = 'disk_cache.sqlite',
     message: str = 'Calling {func_name} failed, using cached results',
+    ttl: Optional[float] = None,
+    stale_ttl: Optional[float] = None,
+    ignore_kwargs: Tuple[str, ...] = ('force', 'timeout', 'deadline'),
 ):
     """
     Decorator which caches a function in disk and uses cache when a urllib.error.URLError exception is raised
     If the function was called with a kwarg force=True, then this decorator will always attempt to call it, otherwise,
-    will always default to local cache.
+    will use the local cache while it is fresh, see :class:`hubble.executor.cache.MetaCache`.
+
+    A stale result is returned right away and refreshed in a background thread. The cache key is made of all the
+    arguments of the function, defaults included, except the ones in ``ignore_kwargs``.
 
     :param cache_file: the cache file
     :param message: the warning message shown when defaulting to cache. Use "{func_name}" if you want to print
         the function name
+    :param ttl: the seconds a cached result is fresh
+    :param stale_ttl: the seconds a cached result is served while it is refreshed, after `ttl`
+    :param ignore_kwargs: the arguments which do not change the result of the function
 
     :return: function decorator
     """
 
     def decorator(func):
+        import inspect
+
+        from hubble.executor.cache import MetaCache
+
+        cache = MetaCache(cache_file, ttl=ttl, stale_ttl=stale_ttl)
+        signature = inspect.signature(func)
+        refreshing = set()
+        refreshing_lock = threading.Lock()
+
+        def _get_key(args, kwargs) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {}
+            for name, value in bound.arguments.items():
+                if signature.parameters[name].kind == inspect.Parameter.VAR_KEYWORD:
+                    value = {k: v for k, v in value.items() if k not in ignore_kwargs}
+                elif name in ignore_kwargs:
+                    continue
+                arguments[name] = value
+            arguments = json.dumps(arguments, sort_keys=True, default=repr)
+            return (
+                f'{func.__qualname__}:{hashlib.sha256(arguments.encode()).hexdigest()}'
+            )
+
+        def _call(key, args, kwargs):
+            result = func(*args, **kwargs)
+            try:
+                cache.put(key, result)
+            except Exception as e:
+                default_logger.debug(f'Failed to cache the result of {key}: {e!r}')
+            return result
+
+        def _refresh(key, args, kwargs):
+            try:
+                _call(key, args, kwargs)
+            except Exception as e:
+                default_logger.debug(f'Failed to refresh the result of {key}: {e!r}')
+            finally:
+                with refreshing_lock:
+                    refreshing.discard(key)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            import filelock
-
-            call_hash = f'{func.__name__}({", ".join(map(str, args))})'
-            pickle_protocol = 4
-            file_lock = nullcontext()
-
-            file_lock = filelock.FileLock(f'{cache_file}.lock', timeout=-1)
-
-            cache_db = None
-            with file_lock:
-                try:
-                    cache_db = shelve.open(
-                        cache_file, protocol=pickle_protocol, writeback=True
-                    )
-                except Exception:
-                    if os.path.exists(cache_file):
-                        # cache is in an unsupported format, reset the cache
-                        os.remove(cache_file)
-                        cache_db = shelve.open(
-                            cache_file, protocol=pickle_protocol, writeback=True
-                        )
-
-            if cache_db is None:
+            key = _get_key(args, kwargs)
+            try:
+                entry = cache.get(key)
+            except Exception as e:
                 # if we failed to load cache, do not raise, it is only an optimization thing
+                default_logger.debug(f'Failed to read the cache {cache_file}: {e!r}')
                 return func(*args, **kwargs), False
-            else:
-                with cache_db as dict_db:
-                    try:
-                        if call_hash in dict_db and not kwargs.get('force', False):
-                            return dict_db[call_hash], True
-
-                        result = func(*args, **kwargs)
-                        dict_db[call_hash] = result
-                    except urllib.error.URLError:
-                        if call_hash in dict_db:
-                            default_logger.warning(
-                                message.format(func_name=func.__name__)
-                            )
-                            return dict_db[call_hash], True
-                        else:
-                            raise
-                return result, False
+
+            if entry is not None and not kwargs.get('force', False):
+                if entry.is_fresh:
+                    return entry.value, True
+                if entry.is_stale:
+                    with refreshing_lock:
+                        start = key not in refreshing
+                        refreshing.add(key)
+                    if start:
+                        threading.Thread(
+                            target=_refresh, args=(key, args, kwargs), daemon=True
+                        ).start()
+                    return entry.value, True
+
+            try:
+                return _call(key, args, kwargs), False
+            except urllib.error.URLError:
+                if entry is not None:
+                    default_logger.warning(message.format(func_name=func.__name__))
+                    return entry.value, True
+                raise
 
         return wrapper
 
@@ -2,7 +2,6 @@
 
 import argparse
 import copy
-import hashlib
 import json
 import logging
 import os
@@ -14,9 +13,9 @@ from urllib.parse import urljoin
 import hubble
 from hubble.executor import HubExecutor
 from hubble.executor.helper import (
+    PackageStream,
     __resources_path__,
     __unset_msg__,
-    archive_package,
     check_requirements_env_variable,
     disk_cache_offline,
     download_with_resume,
@@ -29,6 +28,7 @@ from hubble.executor.helper import (
     get_requirements_env_variables,
     get_rich_console,
     get_tag_from_dist_info_path,
+    package_md5,
     parse_hub_uri,
     retry,
     status_task,
@@ -44,6 +44,8 @@ from hubble.executor.hubapi import (
     load_config,
 )
 from hubble.utils.api_utils import get_json_from_response
+from hubble.utils.retry import HTTPStatusError, RetryPolicy
+from hubble.utils.timeout import Deadline, TimeoutType, get_timeout, raise_timeout
 
 
 class HubIO:
@@ -528,12 +530,20 @@ metas:
         with console.status(f'Pushing `{self.args.path}` ...') as st:
             req_header = get_request_header()
             try:
+                if getattr(self.args, 'skip_unchanged', False):
+                    st.update(f'Comparing {self.args.path} with Jina Hub ...')
+                    name = self.args.force_update or executor_name
+                    if self._is_unchanged(work_path, name):
+                        console.print(
+                            f':white_check_mark: [green]`{self.args.path}` is '
+                            f'unchanged since the last push of `{name}`, '
+                            'skipped.[/green]'
+                        )
+                        return None
+
                 st.update(f'Packaging {self.args.path} ...')
-                md5_hash = hashlib.md5()
-                bytesio = archive_package(work_path)
-                content = bytesio.getvalue()
-                md5_hash.update(content)
-                md5_digest = md5_hash.hexdigest()
+                # archived while it is uploaded, the checksum is sent last
+                content = PackageStream(work_path)
 
                 # upload the archived package
                 form_data = {
@@ -541,7 +551,7 @@ metas:
                     'private': 'True'
                     if getattr(self.args, 'private', None)
                     else 'False',
-                    'md5sum': md5_digest,
+                    'md5sum': content.hexdigest,
                 }
 
                 if self.args.verbose:
@@ -597,6 +607,33 @@ metas:
 
         return image
 
+    def _is_unchanged(self, work_path: Path, name: str) -> bool:
+        """Whether the package was already pushed to all the target tags.
+
+        :param work_path: the folder of the Executor
+        :param name: the UUID/name of the Executor
+        :return: True if the archive of the folder has the checksum of the
+            package of each tag, or of the latest package without tags
+        """
+        md5_digest = package_md5(work_path)
+        for tag in self.args.tag or [None]:
+            try:
+                executor, _ = HubIO.fetch_meta(
+                    name,
+                    tag,
+                    image_required=False,
+                    rebuild_image=False,
+                    secret=self.args.secret,
+                    force=True,
+                )
+            except Exception as e:
+                # e.g. the first push of the Executor or of the tag
+                self.logger.debug(f'Can not fetch `{name}:{tag}`, pushing it: {e!r}')
+                return False
+            if executor.md5sum != md5_digest:
+                return False
+        return True
+
     def _prettyprint_result(
         self, console, image, *, warnings: Optional[List[str]] = None
     ):
@@ -1011,6 +1048,8 @@ metas:
         prefer_platform: Optional[str] = None,
         secret: Optional[str] = None,
         force: bool = False,
+        timeout: TimeoutType = None,
+        deadline: Optional[float] = None,
     ) -> HubExecutor:
         """Fetch Executor metadata from Jina Hub.
         :param name: the UUID/name of the Executor
@@ -1020,6 +1059,8 @@ metas:
         :param rebuild_image: indicates whether Jina Hub needs to rebuild image or not
         :param force: if set to True, access to fetch_meta will always pull latest Executor metas, otherwise, default
             to local cache
+        :param timeout: the timeout of each request in seconds, or a `(connect, read)` tuple
+        :param deadline: the total time in seconds for all the attempts
         :return: meta of Executor
 
         .. note::
@@ -1029,11 +1070,15 @@ metas:
         import requests
 
         req_header = get_request_header()
+        call_deadline = Deadline(deadline)
 
-        @retry(num_retry=3)
+        @retry(policy=RetryPolicy(max_attempts=3, deadline=call_deadline.remaining()))
         def _send_request_with_retry(url, **kwargs):
-            resp = requests.post(url, **kwargs)
-            if resp.status_code != 200:
+            resp = requests.post(
+                url, timeout=get_timeout(timeout, call_deadline), **kwargs
+            )
+            status_code = resp.status_code
+            if status_code != 200:
                 if resp.json():
                     hubble_err = resp.json()
                     overridden_msg = ''
@@ -1046,12 +1091,13 @@ metas:
                         if not msg:
                             msg = detail_msg
 
-                    raise Exception(
+                    raise HTTPStatusError(
                         f'{overridden_msg or msg or "Unknown Error"} '
-                        f'session_id: {req_header.get("jinameta-session-id")}'
+                        f'session_id: {req_header.get("jinameta-session-id")}',
+                        status_code=status_code,
                     )
                 elif resp.text:
-                    raise Exception(resp.text)
+                    raise HTTPStatusError(resp.text, status_code=status_code)
 
                 resp.raise_for_status()
 
@@ -1069,7 +1115,8 @@ metas:
         if prefer_platform:
             payload['preferPlatform'] = prefer_platform
 
-        resp = _send_request_with_retry(pull_url, json=payload, headers=req_header)
+        with raise_timeout(f'Fetching the metadata of Executor "{name}"'):
+            resp = _send_request_with_retry(pull_url, json=payload, headers=req_header)
         resp = get_json_from_response(resp)['data']
 
         images = resp['package'].get('containers', [])
@@ -1128,11 +1175,13 @@ metas:
         port = None
 
         headers = get_request_header()
-        response = requests.post(
-            url=urljoin(hubble.utils.get_base_url(), 'sandbox.get'),
-            json=payload,
-            headers=headers,
-        )
+        with raise_timeout(f'Getting the sandbox of Executor "{name}"'):
+            response = requests.post(
+                url=urljoin(hubble.utils.get_base_url(), 'sandbox.get'),
+                json=payload,
+                headers=headers,
+                timeout=get_timeout(),
+            )
         json_response = get_json_from_response(response)
         if json_response.get('code') == 200:
             host = json_response.get('data', {}).get('host', None)
@@ -1146,11 +1195,14 @@ metas:
             f'[bold green]🚧 Deploying sandbox for [bold white]{name}[/bold white] since none exists...'
         ):
             try:
-                response = requests.post(
-                    url=urljoin(hubble.utils.get_base_url(), 'sandbox.create'),
-                    json=payload,
-                    headers=headers,
-                )
+                # creating a sandbox waits for its deployment
+                with raise_timeout(f'Deploying the sandbox of Executor "{name}"'):
+                    response = requests.post(
+                        url=urljoin(hubble.utils.get_base_url(), 'sandbox.create'),
+                        json=payload,
+                        headers=headers,
+                        timeout=get_timeout(stream=True),
+                    )
                 json_response = get_json_from_response(response)
 
                 data = json_response.get('data') or {}
@@ -86,6 +86,14 @@ One can later fetch a tagged Executor via `jinaai[+docker]://<username>/MyExecut
         help='If set, "--no-cache" option will be added to the Docker build.',
     )
 
+    gp.add_argument(
+        '--skip-unchanged',
+        action='store_true',
+        default=False,
+        help='If set, the Executor is not uploaded nor built when its files are the '
+        'same as in the package of each given tag (or of the latest package) on Jina Hub.',
+    )
+
     gp = add_arg_group(parser, title='Visibility')
 
     mutually_exclusive_group = gp.add_mutually_exclusive_group()
@@ -0,0 +1,234 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
+
+from ..utils.retry import RetryPolicy
+from .reporter import UsageReporter
+
+if TYPE_CHECKING:
+    from .client import PaymentClient
+
+__all__ = ['UsageAggregator', 'merge_meta_update', 'merge_meta_first']
+
+MetaMergePolicy = Callable[[dict, dict], dict]
+
+
+def merge_meta_update(merged: dict, meta: dict) -> dict:
+    """Merge the metadata of the events, the latest value of a key wins."""
+    return {**merged, **meta}
+
+
+def merge_meta_first(merged: dict, meta: dict) -> dict:
+    """Merge the metadata of the events, the first value of a key wins."""
+    return {**meta, **merged}
+
+
+class _Bucket(object):
+    __slots__ = ('id', 'units', 'meta', 'count', 'opened_at')
+
+    def __init__(self):
+        # the idempotency key of the report, kept across its attempts
+        self.id = str(uuid.uuid4())
+        self.units = 0
+        self.meta: dict = {}
+        self.count = 0
+        self.opened_at = time.monotonic()
+
+
+class UsageAggregator(object):
+    """Sum the usage of many events into one report per window.
+
+    The units of the events with the same ``(token, app_id, unit)`` are added
+    up, and a single report is sent per key once its window is over: after
+    ``window`` seconds, or ``max_count`` events, whichever comes first. The
+    metadata of the events is merged by ``merge_meta``.
+
+    The reports are sent through a :class:`UsageReporter`, or directly with
+    :meth:`PaymentClient.report_app_usage`. A report which fails with a
+    transient error is sent again after a window with the same ID, so that
+    Hubble never counts it twice, while the new events of its key go to a new
+    report. A report rejected by Hubble, e.g. for an invalid token, is dropped
+    at once. The reports dropped, past ``max_unsent`` or still not sent by
+    :meth:`close`, are logged as errors and counted in :attr:`dropped`, use a
+    :class:`UsageReporter` with a spool to keep them.
+
+    Example:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        with UsageAggregator(UsageReporter(client), window=10) as aggregator:
+            aggregator.add(token, app_id='app', unit='requests', units=1)
+
+    :param sink: The reporter or payment client sending the reports.
+    :param window: Maximum seconds the events of a key are aggregated.
+    :param max_count: Maximum number of events aggregated per report.
+    :param merge_meta: How the metadata of two events are merged, the
+        latest value of a key wins by default.
+    :param max_unsent: Maximum number of failed reports kept to be sent
+        again, the oldest are dropped first.
+    """
+
+    def __init__(
+        self,
+        sink: Union[UsageReporter, 'PaymentClient'],
+        window: float = 10.0,
+        max_count: Optional[int] = None,
+        merge_meta: MetaMergePolicy = merge_meta_update,
+        max_unsent: int = 1000,
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._sink = sink
+        self._window = window
+        self._max_count = max_count
+        self._merge_meta = merge_meta
+        self._max_unsent = max_unsent
+        self._dropped = 0
+
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, str, str], _Bucket] = {}
+        self._unsent: List[Tuple[Tuple[str, str, str], _Bucket]] = []
+        self._stopped = threading.Event()
+        self._timer = threading.Thread(target=self._run, daemon=True)
+        self._timer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add(
+        self,
+        token: str,
+        app_id: str,
+        unit: str,
+        units: int = 0,
+        meta: Optional[dict] = None,
+    ):
+        """Add the usage of an event.
+
+        :param token: User token.
+        :param app_id: ID of the application.
+        :param unit: ID of the unit to report.
+        :param units: Number of units used by the event.
+        :param meta: Dictionary of metadata info of the event.
+        """
+        key = (token, app_id, unit)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket()
+            bucket.units += units
+            bucket.meta = self._merge_meta(bucket.meta, meta or {})
+            bucket.count += 1
+            if self._max_count is None or bucket.count < self._max_count:
+                return
+            del self._buckets[key]
+
+        self._emit(key, bucket)
+
+    def _emit(self, key: Tuple[str, str, str], bucket: _Bucket):
+        token, app_id, unit = key
+        try:
+            if isinstance(self._sink, UsageReporter):
+                self._sink.report(
+                    token,
+                    app_id=app_id,
+                    unit=unit,
+                    units=bucket.units,
+                    meta=bucket.meta,
+                    id=bucket.id,
+                )
+            else:
+                self._sink.report_app_usage(
+                    token=token,
+                    id=bucket.id,
+                    app_id=app_id,
+                    unit=unit,
+                    units=bucket.units,
+                    meta=bucket.meta,
+                )
+        except Exception as e:
+            if not self._is_transient(e):
+                self._drop(key, bucket, f'it was rejected: {e!r}')
+                return
+
+            self.logger.warning(
+                f'Failed to report the usage of {app_id}/{unit}, '
+                f'sent again in the next window: {e!r}'
+            )
+            bucket.opened_at = time.monotonic()
+            with self._lock:
+                self._unsent.append((key, bucket))
+                excess = max(0, len(self._unsent) - self._max_unsent)
+                overflow = self._unsent[:excess]
+                del self._unsent[:excess]
+            for item in overflow:
+                self._drop(*item, 'too many reports are waiting to be sent')
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """Whether a failed report is worth sending again."""
+        return isinstance(
+            error, (queue.Full, TimeoutError)
+        ) or RetryPolicy().is_retryable(error)
+
+    def _drop(self, key: Tuple[str, str, str], bucket: _Bucket, reason: str):
+        _, app_id, unit = key
+        self.logger.error(
+            f'Usage report {bucket.id} of {bucket.units} {unit} of {app_id} '
+            f'is lost, {reason}'
+        )
+        with self._lock:
+            self._dropped += 1
+
+    @property
+    def dropped(self) -> int:
+        """The number of reports which were dropped without being sent."""
+        return self._dropped
+
+    def flush(self, expired_only: bool = False):
+        """Send the aggregated reports, and the reports which failed before.
+
+        :param expired_only: If set, only send the keys whose window is over.
+        """
+        now = time.monotonic()
+        with self._lock:
+            keys: List[Tuple[str, str, str]] = [
+                key
+                for key, bucket in self._buckets.items()
+                if not expired_only or now - bucket.opened_at >= self._window
+            ]
+            buckets = [
+                (key, bucket)
+                for key, bucket in self._unsent
+                if not expired_only or now - bucket.opened_at >= self._window
+            ]
+            self._unsent = [item for item in self._unsent if item not in buckets]
+            buckets.extend((key, self._buckets.pop(key)) for key in keys)
+
+        for key, bucket in buckets:
+            self._emit(key, bucket)
+
+    def _run(self):
+        # checking several times per window keeps the windows close to it
+        while not self._stopped.wait(self._window / 4):
+            self.flush(expired_only=True)
+
+    def close(self):
+        """Stop the timer and send all the aggregated reports.
+
+        The reports which still fail are dropped, see :attr:`dropped`.
+        """
+        self._stopped.set()
+        self._timer.join()
+        self.flush()
+
+        with self._lock:
+            unsent, self._unsent = self._unsent, []
+        for key, bucket in unsent:
+            self._drop(key, bucket, 'it could not be sent')
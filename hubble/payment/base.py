@@ -7,21 +7,37 @@ import requests
 # TODO: add payment specific errorcodes
 from ..excepts import errorcodes
 from ..utils.api_utils import get_base_url, get_json_from_response
+from ..utils.timeout import Deadline, TimeoutType, get_timeout, raise_timeout
 from .session import HubblePaymentAPISession
 
 
 class PaymentBaseClient(object):
-    """Hubble Payment Python API client."""
+    """Hubble Payment Python API client.
 
-    def __init__(self, m2m_token: str):
+    :param m2m_token: The token of the application.
+    :param timeout: Optional default timeout of the requests in seconds, or
+        ``(connect, read)`` tuple, see :func:`hubble.utils.timeout.get_timeout`.
+    :param deadline: Optional default total time of a request in seconds.
+    """
+
+    def __init__(
+        self,
+        m2m_token: str,
+        timeout: TimeoutType = None,
+        deadline: Optional[float] = None,
+    ):
         self._base_url = get_base_url()
+        self._timeout = timeout
+        self._deadline = deadline
         # initalize session using app token
         self._session = HubblePaymentAPISession()
         self._session.init_app_auth(m2m_token=m2m_token)
         self.logger = logging.getLogger(self.__class__.__name__)
 
     def _handle_error_request(self, resp: dict):
+        status_code = None
         if isinstance(resp, requests.Response):
+            status_code = resp.status_code
             resp = get_json_from_response(resp)
 
         message = resp.get('message', None)
@@ -30,7 +46,9 @@ class PaymentBaseClient(object):
 
         ExceptionCls = errorcodes[code]
 
-        raise ExceptionCls(response=resp, data=data, message=message, code=code)
+        error = ExceptionCls(response=resp, data=data, message=message, code=code)
+        error.status_code = status_code
+        raise error
 
     def handle_request(
         self,
@@ -40,6 +58,8 @@ class PaymentBaseClient(object):
         headers: Optional[dict] = None,
         json: Optional[dict] = None,
         log_error: Optional[bool] = True,
+        timeout: TimeoutType = None,
+        deadline: Optional[float] = None,
     ) -> dict:
         """The basis request handler.
 
@@ -50,7 +70,12 @@ class PaymentBaseClient(object):
         :param url: The url of the request.
         :param method: The request type, for v2 always set to POST.
         :param data: Optional data payloads to be send along with request.
+        :param timeout: Optional timeout in seconds, or ``(connect, read)``
+            tuple, defaults to the timeout of the client.
+        :param deadline: Optional total time in seconds, defaults to the
+            deadline of the client.
         :returns: dict.
+        :raises RequestTimeoutError: if the request or the deadline timed out.
         """
 
         default_headers = {'jinameta-session-id': str(uuid.uuid1())}
@@ -60,16 +85,22 @@ class PaymentBaseClient(object):
             headers = default_headers
 
         session_id = headers.get('jinameta-session-id')
+        call_deadline = Deadline(deadline if deadline is not None else self._deadline)
 
         try:
             # making request to hubble
-            resp = self._session.request(
-                method=method,
-                url=url,
-                data=data if data else None,
-                headers=headers,
-                json=json if json else None,
-            )
+            with raise_timeout(f'Request {session_id}'):
+                resp = self._session.request(
+                    method=method,
+                    url=url,
+                    data=data if data else None,
+                    headers=headers,
+                    json=json if json else None,
+                    timeout=get_timeout(
+                        timeout if timeout is not None else self._timeout,
+                        call_deadline,
+                    ),
+                )
 
             if resp.status_code >= 400:
                 self._handle_error_request(resp)
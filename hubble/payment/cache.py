@@ -0,0 +1,224 @@
+import copy
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..excepts import BaseError
+from ..utils.retry import RetryPolicy
+
+__all__ = ['AccessCache']
+
+_CacheKey = Tuple[str, str, str]
+
+
+class _Entry(object):
+    __slots__ = ('value', 'error', 'fetched_at')
+
+    def __init__(self, value: Any = None, error: Optional[Exception] = None):
+        self.value = value
+        self.error = error
+        self.fetched_at = time.monotonic()
+
+
+class _Flight(object):
+    """A request to Hubble shared by the threads missing the same key."""
+
+    __slots__ = ('done', 'entry', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry: Optional[_Entry] = None
+        self.error: Optional[Exception] = None
+
+
+class AccessCache(object):
+    """An in-memory cache of the access checks of :class:`PaymentClient`.
+
+    Results are cached per method, user token and app id, the token being
+    only kept as a hash. Successful results are fresh for ``ttl`` seconds,
+    then served for ``stale_ttl`` more seconds while they are refreshed in
+    the background. Errors which are not worth a retry, such as a missing
+    entitlement, are cached for ``negative_ttl`` seconds. Concurrent misses
+    of the same key share a single request to Hubble.
+
+    At most ``maxsize`` results are kept, the least recently used are evicted
+    first. Expired results are dropped once they are read, or once they are
+    the least recently used when a result is added.
+
+    :param ttl: Seconds a successful result is fresh.
+    :param negative_ttl: Seconds an error is cached.
+    :param stale_ttl: Seconds a successful result is still served after
+        ``ttl``, while it is refreshed.
+    :param maxsize: Maximum number of cached results, ``None`` for no limit.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60,
+        negative_ttl: float = 10,
+        stale_ttl: float = 300,
+        maxsize: Optional[int] = 10000,
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[_CacheKey, _Entry]' = OrderedDict()
+        self._loading: Dict[_CacheKey, _Flight] = {}
+        # bumped by invalidate, so that a request sent before is not cached
+        self._generation = 0
+
+    @staticmethod
+    def get_key(method: str, token: str, app_id: str) -> _CacheKey:
+        return method, hashlib.sha256(token.encode('utf-8')).hexdigest(), app_id
+
+    @staticmethod
+    def _result(entry: _Entry) -> Any:
+        if entry.error is not None:
+            raise entry.error
+        return copy.deepcopy(entry.value)
+
+    @staticmethod
+    def _is_negative(error: Exception) -> bool:
+        """Whether an error is an answer of Hubble, rather than a failure."""
+        status_code = getattr(error, 'status_code', None)
+        return (
+            isinstance(error, BaseError)
+            and status_code is not None
+            and 400 <= status_code < 500
+            and not RetryPolicy().is_retryable(error)
+        )
+
+    def _is_expired(self, entry: _Entry, now: float) -> bool:
+        age = now - entry.fetched_at
+        if entry.error is not None:
+            return age >= self.negative_ttl
+        return age >= self.ttl + self.stale_ttl
+
+    def _put(self, key: _CacheKey, entry: _Entry):
+        """Add an entry, the lock must be held."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        now = time.monotonic()
+        while self._entries:
+            oldest_key, oldest = next(iter(self._entries.items()))
+            if (
+                self.maxsize is not None and len(self._entries) > self.maxsize
+            ) or self._is_expired(oldest, now):
+                del self._entries[oldest_key]
+            else:
+                break
+
+    def _fetch(
+        self,
+        key: _CacheKey,
+        loader: Callable[[], Any],
+        flight: _Flight,
+        generation: int,
+    ) -> _Entry:
+        """Call ``loader`` for the registered ``flight`` of ``key``."""
+        try:
+            try:
+                entry = _Entry(value=loader())
+            except Exception as e:
+                if not self._is_negative(e):
+                    # a transient error is never cached
+                    flight.error = e
+                    raise
+                entry = _Entry(error=e)
+            flight.entry = entry
+            with self._lock:
+                if generation == self._generation:
+                    self._put(key, entry)
+            return entry
+        finally:
+            with self._lock:
+                del self._loading[key]
+            flight.done.set()
+
+    def _load(self, key: _CacheKey, loader: Callable[[], Any]) -> _Entry:
+        """Call ``loader`` once for all the threads missing ``key``."""
+        with self._lock:
+            flight = self._loading.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._loading[key] = _Flight()
+            generation = self._generation
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.entry
+
+        return self._fetch(key, loader, flight, generation)
+
+    def _refresh(self, *args):
+        try:
+            self._fetch(*args)
+        except Exception as e:
+            key = args[0]
+            self.logger.warning(f'Failed to refresh {key[0]} of {key[2]}: {e!r}')
+
+    def get(
+        self, method: str, token: str, app_id: str, loader: Callable[[], Any]
+    ) -> Any:
+        """Get a cached result, or load it.
+
+        :param method: The name of the cached method.
+        :param token: User token.
+        :param app_id: ID of the application.
+        :param loader: Called without arguments to get the result from Hubble.
+        :returns: The result of ``loader``.
+        """
+        key = self.get_key(method, token, app_id)
+        refresh = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                now = time.monotonic()
+                age = now - entry.fetched_at
+                if self._is_expired(entry, now):
+                    del self._entries[key]
+                    entry = None
+                else:
+                    self._entries.move_to_end(key)
+                    if (
+                        entry.error is None
+                        and age >= self.ttl
+                        and key not in self._loading
+                    ):
+                        # stale, refreshed by a single background request
+                        flight = self._loading[key] = _Flight()
+                        refresh = (key, loader, flight, self._generation)
+
+        if refresh is not None:
+            threading.Thread(target=self._refresh, args=refresh, daemon=True).start()
+        if entry is not None:
+            return self._result(entry)
+        return self._result(self._load(key, loader))
+
+    def invalidate(self, token: Optional[str] = None, app_id: Optional[str] = None):
+        """Forget the cached results.
+
+        :param token: Optional user token, only forget its results.
+        :param app_id: Optional ID of the application, only forget its results.
+        """
+        token_hash = (
+            hashlib.sha256(token.encode('utf-8')).hexdigest() if token else None
+        )
+        with self._lock:
+            self._generation += 1
+            for key in list(self._entries):
+                _, key_token_hash, key_app_id = key
+                if (token_hash is None or key_token_hash == token_hash) and (
+                    app_id is None or key_app_id == app_id
+                ):
+                    del self._entries[key]
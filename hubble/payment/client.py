@@ -1,12 +1,49 @@
 import uuid
+from typing import Optional, Union
 
 from hubble.utils.jwt_parser import validate_jwt
+from hubble.utils.timeout import TimeoutType
 
 from .base import PaymentBaseClient
+from .cache import AccessCache
 from .endpoints import PaymentEndpoints
 
 
 class PaymentClient(PaymentBaseClient):
+    """Hubble Payment Python API client.
+
+    :param m2m_token: The token of the application.
+    :param timeout: Optional default timeout of the requests in seconds, or
+        ``(connect, read)`` tuple, see :func:`hubble.utils.timeout.get_timeout`.
+    :param deadline: Optional default total time of a request in seconds.
+    :param cache: Optional, if set, cache the results of
+        :meth:`verify_app_access` and :meth:`get_summary` in memory. Either
+        ``True`` for the default :class:`AccessCache`, or a custom one.
+    """
+
+    def __init__(
+        self,
+        m2m_token: str,
+        cache: Union[bool, AccessCache] = False,
+        timeout: TimeoutType = None,
+        deadline: Optional[float] = None,
+    ):
+        super().__init__(m2m_token=m2m_token, timeout=timeout, deadline=deadline)
+        self._cache: Optional[AccessCache] = (
+            (AccessCache() if cache is True else cache) if cache else None
+        )
+
+    def invalidate_cache(
+        self, token: Optional[str] = None, app_id: Optional[str] = None
+    ):
+        """Forget the cached access checks.
+
+        :param token: Optional user token, only forget its results.
+        :param app_id: Optional ID of the application, only forget its results.
+        """
+        if self._cache is not None:
+            self._cache.invalidate(token=token, app_id=app_id)
+
     def get_user_token(self, user_id) -> dict:
         return self.handle_request(
             url=self._base_url + PaymentEndpoints.get_user_token,
@@ -49,10 +86,15 @@ class PaymentClient(PaymentBaseClient):
         :returns: Object
         """
 
-        return self.handle_request(
-            url=self._base_url + PaymentEndpoints.get_summary,
-            data={'token': token, 'internalAppId': app_id},
-        )
+        def _get_summary():
+            return self.handle_request(
+                url=self._base_url + PaymentEndpoints.get_summary,
+                data={'token': token, 'internalAppId': app_id},
+            )
+
+        if self._cache is not None:
+            return self._cache.get('get_summary', token, app_id, _get_summary)
+        return _get_summary()
 
     def report_usage(
         self,
@@ -92,10 +134,17 @@ class PaymentClient(PaymentBaseClient):
         :returns: Object
         """
 
-        return self.handle_request(
-            url=self._base_url + PaymentEndpoints.verify,
-            data={'token': token, 'internalAppId': app_id},
-        )
+        def _verify_app_access():
+            return self.handle_request(
+                url=self._base_url + PaymentEndpoints.verify,
+                data={'token': token, 'internalAppId': app_id},
+            )
+
+        if self._cache is not None:
+            return self._cache.get(
+                'verify_app_access', token, app_id, _verify_app_access
+            )
+        return _verify_app_access()
 
     def report_app_usage(
         self,
@@ -0,0 +1,388 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
+
+from ..utils.retry import RetryPolicy
+
+if TYPE_CHECKING:
+    from .client import PaymentClient
+
+__all__ = ['UsageReporter']
+
+# the spool is rewritten once all its reports are sent and it grew past this
+SPOOL_COMPACT_BYTES = 1024 * 1024
+# the default seconds :meth:`UsageReporter.close` waits for the queued reports
+DEFAULT_CLOSE_TIMEOUT = 10.0
+# the maximum seconds the worker waits while Hubble can not be reached
+MAX_REQUEUE_BACKOFF = 60.0
+
+_STOP = object()
+
+
+class UsageReporter(object):
+    """Report app usage to Hubble in the background.
+
+    :meth:`report` puts a report in a bounded in-process queue and returns
+    right away. A worker thread sends the queued reports in batches with
+    :meth:`PaymentClient.report_app_usage`. Every report keeps its UUID as
+    idempotency key across all its attempts, so Hubble never counts it twice.
+
+    With a ``spool_path``, the reports are first appended to a file and marked
+    as done once sent, so that the reports not sent before a crash or a
+    restart are sent by the next ``UsageReporter`` of the same spool.
+
+    Example:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        with UsageReporter(client, spool_path='/var/lib/app/usage.jsonl') as reporter:
+            reporter.report(token, app_id='app', unit='requests', units=1)
+
+    :param client: The payment client sending the reports.
+    :param spool_path: Optional path of the spool file, defaults to the
+        ``JINA_HUBBLE_USAGE_SPOOL`` environment variable. Without any, the
+        queued reports are lost if the process dies.
+    :param max_queue_size: Maximum number of reports waiting to be sent.
+    :param batch_size: Maximum number of reports sent per batch.
+    :param flush_interval: Seconds the worker waits for more reports before
+        sending an incomplete batch.
+    :param retry_policy: How each report is retried, reports which still fail
+        with a retryable error are queued again.
+    :param max_requeues: Maximum number of times a report is queued again,
+        after which it is given up: it is left in the spool if any, to be sent
+        by the next ``UsageReporter``, otherwise it is counted as failed.
+        ``None`` for no limit.
+    :param fsync: If set, the spool is synced to disk after every write.
+    """
+
+    def __init__(
+        self,
+        client: 'PaymentClient',
+        spool_path: Optional[Union[str, Path]] = None,
+        max_queue_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        retry_policy: Optional[RetryPolicy] = None,
+        max_requeues: Optional[int] = 10,
+        fsync: bool = False,
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._client = client
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._retry_policy = retry_policy or RetryPolicy(max_attempts=3)
+        self._max_requeues = max_requeues
+        self._fsync = fsync
+        self._requeues: Dict[str, int] = {}
+        self._stopped = threading.Event()
+
+        self._queue: 'queue.Queue' = queue.Queue()
+        # bounds the queue, released once a report is sent or given up
+        self._slots = threading.BoundedSemaphore(max_queue_size)
+        self._max_queue_size = max_queue_size
+        self._pending = 0
+        self._pending_changed = threading.Condition()
+
+        self._metrics_lock = threading.Lock()
+        self._reported = 0
+        self._failed = 0
+        self._requeued = 0
+        self._flushes = 0
+        self._last_flush_latency = 0.0
+        self._max_flush_latency = 0.0
+
+        spool_path = spool_path or os.environ.get('JINA_HUBBLE_USAGE_SPOOL')
+        self._spool_path = Path(spool_path) if spool_path else None
+        self._spool_lock = threading.Lock()
+        self._spool = None
+        self._unslotted = set()
+        if self._spool_path:
+            self._open_spool()
+
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _write_spool(self, record: dict):
+        with self._spool_lock:
+            self._spool.write(json.dumps(record) + '\n')
+            self._spool.flush()
+            if self._fsync:
+                os.fsync(self._spool.fileno())
+
+    def _open_spool(self):
+        """Load the reports left in the spool and rewrite it with them only."""
+        reports: Dict[str, dict] = {}
+        if self._spool_path.exists():
+            with open(self._spool_path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # the last line of a crashed process may be cut
+                        continue
+                    if record.get('op') == 'add':
+                        reports[record['report']['id']] = record['report']
+                    elif record.get('op') == 'done':
+                        reports.pop(record['id'], None)
+
+        self._spool_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._spool_path.with_name(self._spool_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            for report in reports.values():
+                f.write(json.dumps({'op': 'add', 'report': report}) + '\n')
+        os.replace(tmp_path, self._spool_path)
+        self._spool = open(self._spool_path, 'a')
+
+        if reports:
+            self.logger.info(f'Sending {len(reports)} usage reports from the spool')
+        for report in reports.values():
+            # the spool may hold more than the queue, it is not blocked then
+            if not self._slots.acquire(blocking=False):
+                self._unslotted.add(report['id'])
+            self._enqueue(report)
+
+    def _compact_spool(self):
+        with self._spool_lock:
+            if self._pending == 0 and self._spool.tell() > SPOOL_COMPACT_BYTES:
+                self._spool.seek(0)
+                self._spool.truncate()
+
+    def _enqueue(self, report: dict):
+        with self._pending_changed:
+            self._pending += 1
+        self._queue.put(report)
+
+    def _done(self, report: dict):
+        if self._spool is not None:
+            self._write_spool({'op': 'done', 'id': report['id']})
+        self._release(report)
+
+    def _give_up(self, report: dict, reason: str):
+        """Stop sending a report, it is kept in the spool if any."""
+        if self._spool is None:
+            self.logger.error(f'Usage report {report["id"]} is lost, {reason}')
+            with self._metrics_lock:
+                self._failed += 1
+        else:
+            self.logger.warning(
+                f'Usage report {report["id"]} is left in the spool, {reason}'
+            )
+        self._release(report)
+
+    def _release(self, report: dict):
+        self._requeues.pop(report['id'], None)
+        if report['id'] in self._unslotted:
+            self._unslotted.discard(report['id'])
+        else:
+            self._slots.release()
+        with self._pending_changed:
+            self._pending -= 1
+            self._pending_changed.notify_all()
+
+    def report(
+        self,
+        token: str,
+        app_id: str,
+        unit: str,
+        units: int = 0,
+        meta: Optional[dict] = None,
+        id: Optional[str] = None,
+        block: bool = True,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """Queue a usage report.
+
+        :param token: User token.
+        :param app_id: ID of the application.
+        :param unit: ID of the unit to report.
+        :param units: Number of units to report.
+        :param meta: Dictionary of metadata info attached to the report.
+        :param id: Optional unique ID of the report, a UUIDv4 by default.
+        :param block: If set, wait for room in the queue when it is full.
+        :param timeout: Maximum seconds to wait for room in the queue.
+        :returns: The ID of the report.
+        :raises queue.Full: if there is no room in the queue.
+        """
+        if not self._worker.is_alive():
+            raise RuntimeError('The usage reporter is closed')
+        if not self._slots.acquire(blocking=block, timeout=timeout):
+            raise queue.Full(f'{self._max_queue_size} usage reports are queued')
+
+        report = {
+            'token': token,
+            'id': id or str(uuid.uuid4()),
+            'app_id': app_id,
+            'unit': unit,
+            'units': units,
+            'meta': dict(meta or {}),
+        }
+        # counted before it is spooled, so that the spool is not compacted
+        with self._pending_changed:
+            self._pending += 1
+        try:
+            if self._spool is not None:
+                self._write_spool({'op': 'add', 'report': report})
+        except Exception:
+            with self._pending_changed:
+                self._pending -= 1
+                self._pending_changed.notify_all()
+            self._slots.release()
+            raise
+        self._queue.put(report)
+        return report['id']
+
+    def _send(self, report: dict) -> bool:
+        """Send a report, return False if it should be sent again later."""
+        try:
+            self._retry_policy.call(self._client.report_app_usage, **report)
+        except Exception as e:
+            if self._retry_policy.is_retryable(e):
+                self.logger.warning(
+                    f'Failed to send usage report {report["id"]}, queued again: {e!r}'
+                )
+                return False
+
+            self.logger.error(f'Failed to send usage report {report["id"]}: {e!r}')
+            with self._metrics_lock:
+                self._failed += 1
+            return True
+
+        with self._metrics_lock:
+            self._reported += 1
+        return True
+
+    def _get_batch(self) -> List:
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=self._flush_interval))
+            while len(batch) < self._batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _requeue(self, report: dict) -> bool:
+        """Queue a report again, return False if it is given up."""
+        requeues = self._requeues.get(report['id'], 0) + 1
+        if self._max_requeues is not None and requeues > self._max_requeues:
+            self._give_up(report, f'not sent after {requeues} tries')
+            return False
+        self._requeues[report['id']] = requeues
+        self._queue.put(report)
+        return True
+
+    def _drain(self, batch: List):
+        """Give up the reports of the batch and of the queue once stopped."""
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for report in batch:
+            if report is not _STOP:
+                self._give_up(report, 'the reporter is closed')
+
+    def _run(self):
+        stopping = False
+        backoff = self._flush_interval
+        while not stopping:
+            batch = self._get_batch()
+            if _STOP in batch:
+                stopping = True
+                batch = [report for report in batch if report is not _STOP]
+            if self._stopped.is_set():
+                self._drain(batch)
+                return
+            if not batch:
+                continue
+
+            start = time.monotonic()
+            requeued = 0
+            for index, report in enumerate(batch):
+                if self._stopped.is_set():
+                    self._drain(batch[index:])
+                    return
+                if self._send(report):
+                    self._done(report)
+                elif self._requeue(report):
+                    requeued += 1
+            latency = time.monotonic() - start
+
+            with self._metrics_lock:
+                self._flushes += 1
+                self._requeued += requeued
+                self._last_flush_latency = latency
+                self._max_flush_latency = max(self._max_flush_latency, latency)
+
+            if self._spool is not None:
+                self._compact_spool()
+            if requeued == len(batch) and not stopping:
+                # Hubble is unreachable, do not spin on the same reports
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, MAX_REQUEUE_BACKOFF)
+            else:
+                backoff = self._flush_interval
+
+    @property
+    def metrics(self) -> dict:
+        """The counters of the reporter.
+
+        :returns: A dict with ``queue_depth``, the reports waiting to be sent,
+            ``reported``, ``failed`` and ``requeued`` reports, ``flushes``,
+            and ``last_flush_latency`` and ``max_flush_latency`` in seconds.
+        """
+        with self._metrics_lock:
+            return {
+                'queue_depth': self._pending,
+                'reported': self._reported,
+                'failed': self._failed,
+                'requeued': self._requeued,
+                'flushes': self._flushes,
+                'last_flush_latency': self._last_flush_latency,
+                'max_flush_latency': self._max_flush_latency,
+            }
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all the queued reports are sent or given up.
+
+        :param timeout: Maximum seconds to wait.
+        :returns: True if no report is left in the queue.
+        """
+        with self._pending_changed:
+            return self._pending_changed.wait_for(
+                lambda: self._pending == 0, timeout=timeout
+            )
+
+    def close(self, timeout: Optional[float] = DEFAULT_CLOSE_TIMEOUT):
+        """Send the queued reports, then stop the worker.
+
+        The reports still not sent after ``timeout`` are given up: they stay
+        in the spool if any, otherwise they are counted as failed.
+
+        :param timeout: Maximum seconds to wait for the queued reports,
+            ``None`` to wait until they are all sent or given up.
+        """
+        if not self.flush(timeout):
+            self.logger.warning(
+                f'{self._pending} usage reports are not sent after {timeout}s'
+            )
+        self._stopped.set()
+        if self._worker.is_alive():
+            self._queue.put(_STOP)
+            self._worker.join(timeout)
+        if self._spool is not None and not self._worker.is_alive():
+            with self._spool_lock:
+                self._spool.close()
@@ -4,13 +4,29 @@ import webbrowser
 from typing import Optional
 from urllib.parse import urlencode, urljoin
 
-import aiohttp
 import requests
 from hubble.client.session import HubbleAPISession
 from hubble.excepts import AuthenticationFailedError
 from hubble.utils.api_utils import get_base_url, get_json_from_response
 from hubble.utils.config import config
-from rich import print as rich_print
+from hubble.utils.identity import identity_cache
+from hubble.utils.timeout import TimeoutType, get_timeout, raise_timeout
+
+
+def rich_print(*args, **kwargs):
+    """Print with ``rich``, imported on the first call."""
+    from rich import print
+
+    print(*args, **kwargs)
+
+
+def _get_aiohttp_timeout(stream: bool = False):
+    """Get the timeouts of an `aiohttp.ClientSession`, see :func:`get_timeout`."""
+    import aiohttp
+
+    connect, read = get_timeout(stream=stream)
+    return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+
 
 JINA_LOGO = (
     'https://d2vchdhjlcm3i6.cloudfront.net/Company+Logo/Light/Company+logo_light.svg'
@@ -172,11 +188,11 @@ class Auth:
         return token_from_env if token_from_env else token_from_config
 
     @staticmethod
-    def validate_token(token):
+    def validate_token(token, timeout: TimeoutType = None):
         try:
             session = HubbleAPISession()
             session.init_jwt_auth(token)
-            resp = session.validate_token()
+            resp = session.validate_token(timeout=timeout)
             resp.raise_for_status()
         except requests.exceptions.HTTPError:
             raise AuthenticationFailedError("Could not validate token")
@@ -316,6 +332,7 @@ The function also requires `ipywidgets`.
                 try:
                     Auth.validate_token(token)
                     config.set('auth_token', token)
+                    identity_cache.clear()
                     _success_callback()
 
                     post_success = kwargs.get('post_success')
@@ -396,7 +413,9 @@ The function also requires `ipywidgets`.
             'user.identity.proxiedAuthorize?{}'.format(urlencode(kwargs)),
         )
 
-        response = requests.get(url, stream=True)
+        # the stream waits for the user to log in, with the longer read timeout
+        with raise_timeout('Logging in'):
+            response = requests.get(url, stream=True, timeout=get_timeout(stream=True))
 
         # iterate through response
         for line in response.iter_lines():
@@ -444,11 +463,13 @@ The function also requires `ipywidgets`.
 
         # retrieving and saving token
         url = urljoin(api_host, 'user.identity.grant.auto')
-        response = requests.post(url, json=auth_info)
+        with raise_timeout('Logging in'):
+            response = requests.post(url, json=auth_info, timeout=get_timeout())
         response.raise_for_status()
         json_response = get_json_from_response(response)
         token = json_response['data']['token']
         config.set('auth_token', token)
+        identity_cache.clear()
 
         user = json_response['data'].get('user', {})
         username = user.get('name')
@@ -484,7 +505,11 @@ The function also requires `ipywidgets`.
 
         api_host = get_base_url()
         auth_info = None
-        async with aiohttp.ClientSession(trust_env=True) as session:
+        import aiohttp
+
+        async with aiohttp.ClientSession(
+            timeout=_get_aiohttp_timeout(stream=True), trust_env=True
+        ) as session:
 
             async with session.get(
                 url=urljoin(
@@ -522,7 +547,9 @@ The function also requires `ipywidgets`.
         if auth_info is None:
             return
 
-        async with aiohttp.ClientSession(trust_env=True) as session:
+        async with aiohttp.ClientSession(
+            timeout=_get_aiohttp_timeout(), trust_env=True
+        ) as session:
             async with session.post(
                 url=urljoin(api_host, 'user.identity.grant.auto'),
                 data=auth_info,
@@ -535,6 +562,7 @@ The function also requires `ipywidgets`.
                 username = user.get('nickname') or user.get('name')
 
                 config.set('auth_token', token)
+                identity_cache.clear()
 
                 from hubble.dockerauth import (
                     auto_deploy_hubble_docker_credential_helper,
@@ -555,7 +583,11 @@ The function also requires `ipywidgets`.
         if token != token_from_config:
             rich_print(':warning: The token from environment variable is ignored.')
 
-        async with aiohttp.ClientSession(trust_env=True) as session:
+        import aiohttp
+
+        async with aiohttp.ClientSession(
+            timeout=_get_aiohttp_timeout(), trust_env=True
+        ) as session:
             session.headers.update({'Authorization': f'token {token_from_config}'})
 
             async with session.post(
@@ -578,6 +610,7 @@ The function also requires `ipywidgets`.
 
                     remove_all_hubble_docker_credential_helper()
                     config.delete('auth_token')
+                    identity_cache.clear()
                     rich_print(':unlock: You have successfully logged out.')
                 else:
                     rich_print(
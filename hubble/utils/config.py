@@ -1,6 +1,10 @@
+import copy
 import json
 import os
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Optional, Tuple
 
 CONFIG_FILE_NAME = 'config.json'
 ROOT_ENV_NAME = 'JINA_HUB_ROOT'
@@ -9,6 +13,11 @@ ROOT_ENV_NAME = 'JINA_HUB_ROOT'
 class Config:
     """
     This class is used to store the configuration of the application.
+
+    The config is kept in memory and only read again from the file when its
+    mtime or size changed. Writes go to a temporary file which replaces the
+    config file, under a ``filelock.FileLock``, so that concurrent processes
+    never see a truncated file nor lose each other's updates.
     """
 
     def __init__(
@@ -22,21 +31,90 @@ class Config:
         if not self.root.exists():
             self.root.mkdir(parents=True, exist_ok=True)
 
+        # (stat of the file, parsed config) of the last read or write
+        self._cache: Tuple[Optional[tuple], Optional[dict]] = (None, None)
+        self._lock = None
+
+    @property
+    def _file_lock(self):
+        if self._lock is None:
+            import filelock
+
+            self._lock = filelock.FileLock(f'{self.config_file}.lock', timeout=-1)
+        return self._lock
+
+    def _stat(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.config_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _read(self) -> Optional[dict]:
+        stat = self._stat()
+        cached_stat, config = self._cache
+        if stat is None:
+            return None
+        if stat == cached_stat:
+            return config
+
+        with open(self.config_file) as f:
+            config = json.load(f)
+        self._cache = (stat, config)
+        return config
+
+    def _write(self, config: dict):
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.root, prefix=f'.{self.config_file.name}.', suffix='.tmp'
+        )
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(config, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._cache = (self._stat(), config)
+
     def get(self, key: str = None, default=None):
         """
         Get the value of the key from the config.
 
         :param key: The key of the config. If it's None, then return the whole config.
         """
-        if not self.config_file.exists():
+        config = self._read()
+        if config is None:
             return default
 
-        with open(self.config_file) as f:
-            config = json.load(f)
-            if key is None:
-                return config
-            else:
-                return config.get(key, default)
+        if key is None:
+            return copy.deepcopy(config)
+        else:
+            return copy.deepcopy(config.get(key, default))
+
+    @contextmanager
+    def transaction(self):
+        """
+        Update several keys of the config at once.
+
+        The config is locked for the whole block, and the yielded dict is
+        written back when the block exits without an error.
+
+        .. highlight:: python
+        .. code-block:: python
+
+            with config.transaction() as c:
+                c['auth_token'] = token
+                c.pop('jwks', None)
+
+        :yields: A copy of the whole config.
+        """
+        with self._file_lock:
+            config = copy.deepcopy(self._read() or {})
+            yield config
+            self._write(config)
 
     def set(self, key: str, value: str):
         """
@@ -47,15 +125,10 @@ class Config:
 
         :return: Whole config.
         """
-        config = self.get()
-        if config is None:
-            config = {}
-
-        config[key] = value
-        with open(self.config_file, 'w') as f:
-            json.dump(config, f)
+        with self.transaction() as config:
+            config[key] = value
 
-        return config
+        return copy.deepcopy(config)
 
     def delete(self, key: str):
         """
@@ -65,23 +138,26 @@ class Config:
 
         :return: Whole config.
         """
-        config = self.get()
-        if config is None:
-            return None
+        with self._file_lock:
+            config = self._read()
+            if config is None:
+                return None
 
-        if key in config:
-            del config[key]
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f)
+            if key in config:
+                config = copy.deepcopy(config)
+                del config[key]
+                self._write(config)
 
-        return config
+        return copy.deepcopy(config)
 
     def purge(self):
         """
         Purge the config.
         """
-        if self.config_file.exists():
-            self.config_file.unlink()
+        with self._file_lock:
+            if self.config_file.exists():
+                self.config_file.unlink()
+            self._cache = (None, None)
 
 
 config = Config()
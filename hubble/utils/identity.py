@@ -0,0 +1,90 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+__all__ = ['IdentityCache', 'identity_cache']
+
+# the user statuses for which a token is accepted without asking Hubble
+_ACTIVE_STATUSES = ('active', 'deletion-in-progress')
+
+
+class IdentityCache(object):
+    """A per-process record of the tokens known to be logged in.
+
+    A token is remembered after Hubble accepted it, for ``ttl`` seconds. A
+    JWT verified locally against the keys of Hubble is remembered until its
+    ``exp``, without asking Hubble at all. The cache is cleared on login and
+    logout.
+
+    :param ttl: Seconds a token accepted by Hubble is remembered, defaults to
+        the ``JINA_HUBBLE_IDENTITY_TTL`` environment variable, or 300.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = (
+            ttl
+            if ttl is not None
+            else float(os.environ.get('JINA_HUBBLE_IDENTITY_TTL', 300))
+        )
+        self._lock = threading.Lock()
+        self._entries: Dict[str, float] = {}
+
+    @staticmethod
+    def _get_key(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _get_jwt_expiry(token: str) -> Optional[float]:
+        from .jwt_parser import validate_jwt
+
+        try:
+            decoded = validate_jwt(token)
+        except Exception:
+            return None
+
+        user = decoded.get('user')
+        if isinstance(user, dict) and user.get('status') not in _ACTIVE_STATUSES:
+            return None
+        exp = decoded.get('exp')
+        return exp if isinstance(exp, (int, float)) else None
+
+    def is_logged_in(self, token: Optional[str]) -> bool:
+        """Whether a token is known to be logged in, without a network call.
+
+        :param token: The api token.
+        :return: True if the token was accepted recently, or is a valid JWT.
+        """
+        if not token:
+            return False
+
+        key = self._get_key(token)
+        now = time.time()
+        with self._lock:
+            expires_at = self._entries.get(key)
+        if expires_at is not None and expires_at > now:
+            return True
+
+        expires_at = self._get_jwt_expiry(token)
+        if expires_at is not None and expires_at > now:
+            with self._lock:
+                self._entries[key] = expires_at
+            return True
+        return False
+
+    def remember(self, token: str):
+        """Remember that Hubble accepted a token.
+
+        :param token: The api token.
+        """
+        with self._lock:
+            self._entries[self._get_key(token)] = time.time() + self.ttl
+
+    def clear(self):
+        """Forget all the tokens."""
+        with self._lock:
+            self._entries.clear()
+
+
+identity_cache = IdentityCache()
@@ -1,19 +1,22 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
 import requests
 
 from .api_utils import get_domain_url, get_json_from_response
 from .config import config
+from .timeout import TimeoutType, get_timeout, raise_timeout
+
+logger = logging.getLogger(__name__)
 
 
 class JSONWebKeySet:
     @staticmethod
     def get_keys(kid: str):
-        cached_jwks = JSONWebKeySet.get_keys_from_config()
-        matching_jwks = [key for key in cached_jwks if key['kid'] == kid]
-        if len(matching_jwks) > 0:
-            return matching_jwks
-        hubble_jwks = JSONWebKeySet.get_keys_from_hubble()
-        matching_jwks = [key for key in hubble_jwks if key['kid'] == kid]
-        return matching_jwks
+        return jwks_store.get_keys(kid)
 
     @staticmethod
     def get_keys_from_config():
@@ -22,12 +25,155 @@ class JSONWebKeySet:
         return jwks
 
     @staticmethod
-    def get_keys_from_hubble():
+    def get_keys_from_hubble(timeout: TimeoutType = None):
         """Get JWK list from hubble API and cache."""
         url = get_domain_url() + 'v2/.well-known/jwks.json'
-        response = requests.get(url)
+        with raise_timeout('Fetching the JSON Web Key Set'):
+            response = requests.get(url, timeout=get_timeout(timeout))
         response.raise_for_status()
         json_response = get_json_from_response(response)
         keys = json_response.get('keys', [])
         config.set('jwks', keys)
         return keys
+
+
+class JSONWebKeyStore(object):
+    """A process-wide index of the JSON Web Keys of Hubble by ``kid``.
+
+    The keys are loaded from the config file once, then kept in memory, so
+    that looking up a known key never touches the disk or the network. Once
+    older than ``ttl``, the keys are still served while they are refreshed in
+    the background.
+
+    An unknown ``kid`` fetches the keys right away the first time, then at
+    most once per ``min_refresh_interval``, and is then remembered as unknown for
+    ``negative_ttl``. Concurrent refreshes share a single request.
+
+    :param ttl: Seconds before the keys are refreshed, defaults to the
+        ``JINA_HUBBLE_JWKS_TTL`` environment variable, or one hour.
+    :param negative_ttl: Seconds an unknown ``kid`` is remembered, defaults to
+        the ``JINA_HUBBLE_JWKS_NEGATIVE_TTL`` environment variable, or 60.
+    :param min_refresh_interval: Minimum seconds between two refreshes caused
+        by unknown keys.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+        min_refresh_interval: float = 10,
+    ):
+        self.ttl = (
+            ttl
+            if ttl is not None
+            else float(os.environ.get('JINA_HUBBLE_JWKS_TTL', 3600))
+        )
+        self.negative_ttl = (
+            negative_ttl
+            if negative_ttl is not None
+            else float(os.environ.get('JINA_HUBBLE_JWKS_NEGATIVE_TTL', 60))
+        )
+        self.min_refresh_interval = min_refresh_interval
+
+        self._lock = threading.Lock()
+        self._keys: Optional[Dict[str, List[dict]]] = None
+        self._unknown: Dict[str, float] = {}
+        self._refreshed_at = 0.0
+        self._fetched_at: Optional[float] = None
+        self._refreshing: Optional[threading.Event] = None
+
+    def _set_keys(self, keys: List[dict]):
+        index = {}
+        for key in keys:
+            index.setdefault(key.get('kid'), []).append(key)
+        self._keys = index
+
+    def _load(self):
+        with self._lock:
+            if self._keys is None:
+                self._set_keys(JSONWebKeySet.get_keys_from_config())
+                self._refreshed_at = time.monotonic()
+
+    def refresh(self, timeout: TimeoutType = None):
+        """Fetch the keys from Hubble.
+
+        If a refresh is already running, wait for it instead of sending
+        another request. Errors are logged and the current keys are kept.
+
+        :param timeout: Optional timeout in seconds, or ``(connect, read)`` tuple.
+        """
+        with self._lock:
+            event = self._refreshing
+            if event is None:
+                event = self._refreshing = threading.Event()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            event.wait()
+            return
+
+        try:
+            keys = JSONWebKeySet.get_keys_from_hubble(timeout=timeout)
+            with self._lock:
+                self._set_keys(keys)
+                self._unknown.clear()
+        except Exception as e:
+            logger.warning(f'Failed to refresh the JSON Web Key Set: {e!r}')
+        finally:
+            with self._lock:
+                # a failed refresh is not retried before the interval either
+                self._refreshed_at = self._fetched_at = time.monotonic()
+                self._refreshing = None
+            event.set()
+
+    def _refresh_in_background(self):
+        if self._refreshing is None:
+            threading.Thread(target=self.refresh, daemon=True).start()
+
+    def get_keys(self, kid: str) -> List[dict]:
+        """Get the keys with the given ``kid``.
+
+        :param kid: The key id, from the header of a JWT.
+        :return: The matching keys, empty if the key is unknown.
+        """
+        if self._keys is None:
+            self._load()
+
+        now = time.monotonic()
+        keys = self._keys.get(kid)
+        if keys:
+            if now - self._refreshed_at > self.ttl:
+                self._refresh_in_background()
+            return keys
+
+        unknown_until = self._unknown.get(kid)
+        if unknown_until is not None and unknown_until > now:
+            return []
+
+        if (
+            self._fetched_at is None
+            or now - self._fetched_at >= self.min_refresh_interval
+        ):
+            self.refresh()
+        keys = self._keys.get(kid)
+        if keys:
+            return keys
+
+        with self._lock:
+            now = time.monotonic()
+            self._unknown = {k: t for k, t in self._unknown.items() if t > now}
+            self._unknown[kid] = now + self.negative_ttl
+        return []
+
+    def clear(self):
+        """Forget the keys, they are loaded again on the next lookup."""
+        with self._lock:
+            self._keys = None
+            self._unknown.clear()
+            self._refreshed_at = 0.0
+            self._fetched_at = None
+
+
+jwks_store = JSONWebKeyStore()
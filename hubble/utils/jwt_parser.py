@@ -1,7 +1,12 @@
 import base64
+import copy
+import hashlib
 import json
-
-from jose import jwt
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from .jwks import JSONWebKeySet
 
@@ -25,47 +30,237 @@ def decode_jwt_fragment(token: str):
         return decoded
 
 
-def validate_jwt(token: str, aud: str = None):
+SUPPORTED_ALGORITHMS = ['RS256', 'ES256']
+
+
+def _get_header(token: str) -> dict:
+    header = decode_jwt_fragment(token.split('.')[0])
+
+    if header['alg'] not in SUPPORTED_ALGORITHMS:
+        raise JWTValidationException(f"Algorithm not supported {header['alg']}")
+    return header
+
+
+def _decode(token: str, key: str, aud: Optional[str]) -> dict:
+    from jose import jwt
+
+    return jwt.decode(
+        token,
+        key,
+        algorithms=SUPPORTED_ALGORITHMS,
+        audience=aud,
+        options={
+            "verify_signature": True,
+            "verify_aud": True if aud else False,
+            "exp": True,
+        },
+    )
+
+
+class VerifiedTokenCache(object):
+    """A bounded LRU cache of the claims of verified JWTs.
+
+    The entries are keyed by a hash of the token and the audience, and kept
+    until the ``exp`` of the token. Tokens without ``exp`` are not cached.
+
+    :param maxsize: Maximum number of tokens, defaults to the
+        ``JINA_HUBBLE_JWT_CACHE_SIZE`` environment variable, or 1024.
+        ``0`` disables the cache.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self.maxsize = (
+            maxsize
+            if maxsize is not None
+            else int(os.environ.get('JINA_HUBBLE_JWT_CACHE_SIZE', 1024))
+        )
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+
+    @staticmethod
+    def get_key(token: str, aud: Optional[str] = None) -> str:
+        return hashlib.sha256(f'{token}\0{aud or ""}'.encode('utf-8')).hexdigest()
+
+    def get(self, token: str, aud: Optional[str] = None) -> Optional[dict]:
+        """Get the claims of a verified token.
+
+        :param token: jwt string
+        :param aud: the audience it was verified against
+        :return: a copy of the claims, or None if the token is not cached
+        """
+        key = self.get_key(token, aud)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            claims, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(claims)
+
+    def put(self, token: str, aud: Optional[str], claims: dict):
+        """Cache the claims of a verified token until its ``exp``.
+
+        :param token: jwt string
+        :param aud: the audience it was verified against
+        :param claims: the decoded claims
+        """
+        expires_at = claims.get('exp')
+        if self.maxsize <= 0 or not isinstance(expires_at, (int, float)):
+            return
+
+        key = self.get_key(token, aud)
+        with self._lock:
+            self._entries[key] = (copy.deepcopy(claims), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: str, aud: Optional[str] = None):
+        """Forget a token."""
+        with self._lock:
+            self._entries.pop(self.get_key(token, aud), None)
+
+    def invalidate_subject(self, sub: Optional[str] = None, sid: Optional[str] = None):
+        """Forget all the tokens of a user, or of a session.
+
+        :param sub: the subject of the tokens
+        :param sid: the session id of the tokens
+        """
+        with self._lock:
+            for key, (claims, _) in list(self._entries.items()):
+                if (sub is not None and claims.get('sub') == sub) or (
+                    sid is not None and claims.get('sid') == sid
+                ):
+                    del self._entries[key]
+
+    def clear(self):
+        """Forget all the tokens."""
+        with self._lock:
+            self._entries.clear()
+
+
+verified_tokens = VerifiedTokenCache()
+
+
+def validate_jwt(token: str, aud: str = None, use_cache: bool = True):
     """Decode and validate JWT signature against Hubble public key
 
+    Tokens which were verified before are served from ``verified_tokens``
+    until they expire, without verifying their signature again.
+
     :param token: jwt string (as received from Hubble)
+    :param aud: the expected audience
+    :param use_cache: if set, look up and store the token in ``verified_tokens``
     """
-    supported_algorithms = ['RS256', 'ES256']
-    components = token.split('.')
-    header = decode_jwt_fragment(components[0])
+    if use_cache:
+        decoded = verified_tokens.get(token, aud)
+        if decoded is not None:
+            return decoded
 
-    if header['alg'] not in supported_algorithms:
-        raise JWTValidationException(f"Algorithm not supported {header['alg']}")
+    header = _get_header(token)
 
     keys = JSONWebKeySet.get_keys(header['kid'])
     if len(keys) <= 0:
         raise JWTValidationException(f"Signing key not found {header['kid']}")
 
     try:
-        decoded = jwt.decode(
-            token,
-            json.dumps(keys[0]),
-            algorithms=supported_algorithms,
-            audience=aud,
-            options={
-                "verify_signature": True,
-                "verify_aud": True if aud else False,
-                "exp": True,
-            },
-        )
+        decoded = _decode(token, json.dumps(keys[0]), aud)
     except Exception as e:
         raise JWTValidationException("JWT validation failed") from e
 
+    if use_cache:
+        verified_tokens.put(token, aud, decoded)
     return decoded
 
 
+def _validate_chunk(
+    chunk: List[Tuple[str, str]], aud: Optional[str]
+) -> List[Union[dict, JWTValidationException]]:
+    results = []
+    for token, key in chunk:
+        try:
+            results.append(_decode(token, key, aud))
+        except Exception as e:
+            # the cause is lost when sent back from a worker process
+            results.append(JWTValidationException(f'JWT validation failed: {e}'))
+    return results
+
+
+def validate_jwts(
+    tokens: Iterable[str], aud: str = None, workers: Optional[int] = None
+) -> List[Union[dict, JWTValidationException]]:
+    """Decode and validate many JWTs against Hubble public keys
+
+    The signing key of each ``kid`` is looked up once, then the signatures
+    are verified in chunks on a pool of ``workers`` processes. The cache of
+    ``validate_jwt`` is not used.
+
+    :param tokens: jwt strings (as received from Hubble)
+    :param aud: the expected audience
+    :param workers: number of processes, by default the number of CPUs.
+        With one worker, the tokens are validated in this process.
+    :return: for each token, in the same order, the decoded claims or the
+        ``JWTValidationException`` explaining why it is invalid
+    """
+    tokens = list(tokens)
+    results: List[Union[dict, JWTValidationException, None]] = [None] * len(tokens)
+    workers = workers or os.cpu_count() or 1
+
+    keys: Dict[str, Optional[str]] = {}
+    pending: List[Tuple[int, str, str]] = []
+    for index, token in enumerate(tokens):
+        try:
+            kid = _get_header(token)['kid']
+        except JWTValidationException as e:
+            results[index] = e
+            continue
+        except Exception as e:
+            results[index] = JWTValidationException(f'Invalid JWT header: {e!r}')
+            continue
+
+        if kid not in keys:
+            matching_keys = JSONWebKeySet.get_keys(kid)
+            keys[kid] = json.dumps(matching_keys[0]) if matching_keys else None
+        if keys[kid] is None:
+            results[index] = JWTValidationException(f"Signing key not found {kid}")
+        else:
+            pending.append((index, token, keys[kid]))
+
+    items = [(token, key) for _, token, key in pending]
+    if workers <= 1 or len(items) <= 1:
+        decoded = _validate_chunk(items, aud)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # several chunks per worker keep them busy when some finish early
+        size = max(1, min(1000, -(-len(items) // (workers * 4))))
+        chunks = [
+            items[slice(start, start + size)] for start in range(0, len(items), size)
+        ]
+        decoded = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            for chunk_results in executor.map(
+                _validate_chunk, chunks, [aud] * len(chunks)
+            ):
+                decoded.extend(chunk_results)
+
+    for (index, _, _), result in zip(pending, decoded):
+        results[index] = result
+    return results
+
+
 def validate_back_channel_logout_jwt(token: str, aud: str = None):
     """Decode and validate JWT against OIDC back-channel-logout rules
 
+    The cached tokens of the logged out user, or session, are invalidated.
+
     :param token: jwt string (as received from Hubble)
     """
 
-    decoded = validate_jwt(token, aud)
+    decoded = validate_jwt(token, aud, use_cache=False)
 
     try:
         assert ('sub' in decoded) or ('sid' in decoded)
@@ -75,6 +270,7 @@ def validate_back_channel_logout_jwt(token: str, aud: str = None):
         # This is not a valid back_channel_logout token
         raise JWTValidationException('Invalid back channel logout token') from e
 
+    verified_tokens.invalidate_subject(sub=decoded.get('sub'), sid=decoded.get('sid'))
     return decoded
 
 
@@ -0,0 +1,213 @@
+import io
+import os
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from requests.packages.urllib3.fields import RequestField, guess_content_type
+from requests.packages.urllib3.filepost import choose_boundary
+
+__all__ = ['MultipartEncoder', 'iter_multipart_formdata']
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def _get_remaining_size(fp: IO[bytes]) -> int:
+    """Get the number of bytes left to read in a seekable file object."""
+    try:
+        return os.fstat(fp.fileno()).st_size - fp.tell()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        position = fp.tell()
+        fp.seek(0, os.SEEK_END)
+        size = fp.tell() - position
+        fp.seek(position)
+        return size
+
+
+class MultipartEncoder(object):
+    """A file-like ``multipart/form-data`` body which is read lazily.
+
+    Unlike ``urllib3.filepost.encode_multipart_formdata``, file fields are
+    never loaded in memory: they are read in ``chunk_size`` pieces while the
+    request is being sent. The total length is known upfront, so ``requests``
+    sends the body with a ``Content-Length`` header instead of chunked encoding.
+
+    :param fields: A mapping of field names to values. A value is either a
+        plain value (``str``, ``bytes``, ``int``, ...) or a ``(filename, data)``
+        tuple, where ``data`` is ``bytes`` or a seekable binary file object.
+    :param boundary: Optional multipart boundary, random by default.
+    :param chunk_size: Maximum number of bytes read from a file at once.
+    :param callback: Optional callable receiving the number of bytes
+        every time a chunk of the body is read, e.g. to drive a progress bar.
+    """
+
+    def __init__(
+        self,
+        fields: Dict[str, Any],
+        boundary: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        callback: Optional[Callable[[int], Any]] = None,
+    ):
+        self.boundary = boundary or choose_boundary()
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+        self.chunk_size = chunk_size
+        self.callback = callback
+
+        self._segments: List[Union[bytes, IO[bytes]]] = []
+        self._sizes: List[int] = []
+        self._len = 0
+        self._index = 0
+        self._offset = 0
+
+        for name, value in fields.items():
+            self._add_field(name, value)
+        self._add_segment(f'--{self.boundary}--\r\n'.encode('latin-1'))
+
+    def _add_segment(self, segment: Union[bytes, IO[bytes]], size: int = None):
+        if isinstance(segment, bytes):
+            size = len(segment)
+            if self._segments and isinstance(self._segments[-1], bytes):
+                self._segments[-1] += segment
+                self._sizes[-1] += size
+                self._len += size
+                return
+        self._segments.append(segment)
+        self._sizes.append(size)
+        self._len += size
+
+    def _add_field(self, name: str, value: Any):
+        if isinstance(value, tuple):
+            filename, data = value
+            field = RequestField(name=name, data=b'', filename=filename)
+            field.make_multipart(content_type=guess_content_type(filename))
+        else:
+            data = value
+            field = RequestField(name=name, data=b'')
+            field.make_multipart()
+
+        header = f'--{self.boundary}\r\n'.encode('latin-1')
+        header += field.render_headers().encode('latin-1')
+        self._add_segment(header)
+
+        if hasattr(data, 'read'):
+            self._add_segment(data, size=_get_remaining_size(data))
+        else:
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+            elif isinstance(data, (bytearray, memoryview)):
+                data = bytes(data)
+            elif not isinstance(data, bytes):
+                data = str(data).encode('utf-8')
+            self._add_segment(data)
+
+        self._add_segment(b'\r\n')
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _read_segment(self, size: int) -> bytes:
+        segment = self._segments[self._index]
+        segment_size = self._sizes[self._index]
+        size = min(size, segment_size - self._offset)
+        if isinstance(segment, bytes):
+            start, end = self._offset, self._offset + size
+            chunk = segment[start:end]
+        else:
+            chunk = segment.read(min(size, self.chunk_size))
+            if not chunk and size > 0:
+                raise IOError(
+                    f'File ended after {self._offset} of {segment_size} bytes '
+                    'while streaming the multipart body.'
+                )
+        self._offset += len(chunk)
+
+        if self._offset >= segment_size:
+            self._index += 1
+            self._offset = 0
+        return chunk
+
+    def read(self, size: int = -1) -> bytes:
+        """Read at most ``size`` bytes of the encoded body.
+
+        :param size: Number of bytes to read, read everything if negative.
+        :returns: The next chunk of the body, ``b''`` once it is exhausted.
+        """
+        if size is None or size < 0:
+            size = self._len
+
+        chunks = []
+        remaining = size
+        while remaining > 0 and self._index < len(self._segments):
+            chunk = self._read_segment(remaining)
+            chunks.append(chunk)
+            remaining -= len(chunk)
+
+        data = b''.join(chunks)
+        if data and self.callback:
+            self.callback(len(data))
+        return data
+
+
+def _encode_value(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    elif isinstance(value, str):
+        return value.encode('utf-8')
+    elif isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    return str(value).encode('utf-8')
+
+
+def iter_multipart_formdata(
+    fields: Dict[str, Any],
+    boundary: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Tuple[Iterator[bytes], str]:
+    """Encode a ``multipart/form-data`` body as a stream of chunks.
+
+    Unlike :class:`MultipartEncoder`, the length of the body does not need to
+    be known, so files can be produced while the body is sent, which
+    ``requests`` does with chunked transfer encoding.
+
+    :param fields: A mapping of field names to values. A value is either a
+        plain value, a ``(filename, data)`` tuple, where ``data`` is ``bytes``,
+        a binary file object or an iterable of ``bytes``, or a callable
+        returning a plain value. Callables are only called once all the
+        other fields are sent, so they can depend on the files, e.g. to send
+        their checksum.
+    :param boundary: Optional multipart boundary, random by default.
+    :param chunk_size: Maximum number of bytes read from a file at once.
+    :returns: The chunks of the body, and its content type.
+    """
+    boundary = boundary or choose_boundary()
+
+    def _part(name: str, filename: Optional[str] = None) -> bytes:
+        field = RequestField(name=name, data=b'', filename=filename)
+        field.make_multipart(
+            content_type=guess_content_type(filename) if filename else None
+        )
+        return f'--{boundary}\r\n'.encode('latin-1') + field.render_headers().encode(
+            'latin-1'
+        )
+
+    def _iter():
+        lazy_fields = {k: v for k, v in fields.items() if callable(v)}
+        for name, value in fields.items():
+            if name in lazy_fields:
+                continue
+            if isinstance(value, tuple):
+                filename, data = value
+                yield _part(name, filename)
+                if isinstance(data, (bytes, bytearray, memoryview)):
+                    yield bytes(data)
+                elif hasattr(data, 'read'):
+                    yield from iter(lambda: data.read(chunk_size), b'')
+                else:
+                    yield from data
+            else:
+                yield _part(name) + _encode_value(value)
+            yield b'\r\n'
+
+        for name, value in lazy_fields.items():
+            yield _part(name) + _encode_value(value()) + b'\r\n'
+        yield f'--{boundary}--\r\n'.encode('latin-1')
+
+    return _iter(), f'multipart/form-data; boundary={boundary}'
@@ -0,0 +1,150 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Collection, Optional
+
+import requests
+
+__all__ = ['RetryPolicy', 'HTTPStatusError', 'RETRYABLE_STATUS_CODES']
+
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class HTTPStatusError(requests.exceptions.HTTPError):
+    """An ``HTTPError`` which keeps the status code of the failed response."""
+
+    def __init__(self, *args, status_code: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.status_code = status_code
+
+
+class RetryPolicy(object):
+    """When and how long to wait before calling Hubble again.
+
+    Only connection errors, timeouts and responses with a retryable status
+    code are retried. The delay grows exponentially with full jitter, unless
+    the response has a ``Retry-After`` header, and no attempt is started past
+    the total ``deadline`` of the call.
+
+    :param max_attempts: Maximum number of attempts, including the first one.
+    :param backoff_factor: Base delay in seconds, doubled at every attempt.
+    :param max_backoff: Maximum delay in seconds between two attempts.
+    :param retry_statuses: The HTTP status codes which are retried.
+    :param deadline: Optional total time in seconds for all the attempts.
+    :param jitter: If set, the delay is drawn uniformly up to its value.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30,
+        retry_statuses: Collection[int] = RETRYABLE_STATUS_CODES,
+        deadline: Optional[float] = None,
+        jitter: bool = True,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+        self.deadline = deadline
+        self.jitter = jitter
+
+    @staticmethod
+    def _get_status_code(result: Any) -> Optional[int]:
+        status_code = getattr(result, 'status_code', None)
+        if status_code is None:
+            response = getattr(result, 'response', None)
+            status_code = getattr(response, 'status_code', None)
+        return status_code if isinstance(status_code, int) else None
+
+    def is_retryable(self, result: Any) -> bool:
+        """Whether an error, or a response, is worth another attempt.
+
+        :param result: The raised exception or the returned response.
+        :returns: True if the call should be retried.
+        """
+        if isinstance(
+            result,
+            (requests.exceptions.ConnectionError, requests.exceptions.Timeout),
+        ):
+            return True
+        return self._get_status_code(result) in self.retry_statuses
+
+    def get_delay(self, attempt: int, result: Any = None) -> float:
+        """Get the delay before the next attempt.
+
+        :param attempt: The number of the failed attempt, starting from 1.
+        :param result: Optional failed response or exception,
+            its ``Retry-After`` header is honored.
+        :returns: The delay in seconds.
+        """
+        response = result if isinstance(result, requests.Response) else None
+        if response is None and isinstance(
+            getattr(result, 'response', None), requests.Response
+        ):
+            response = result.response
+
+        retry_after = (
+            response.headers.get('Retry-After') if response is not None else None
+        )
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    delay = None
+            if delay is not None:
+                return min(max(delay, 0), self.max_backoff)
+
+        delay = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def call(
+        self,
+        func: Callable,
+        *args,
+        deadline: Optional[float] = None,
+        on_retry: Optional[Callable[[int, Any], Any]] = None,
+        **kwargs,
+    ) -> Any:
+        """Call ``func`` until it succeeds or may not be retried anymore.
+
+        A returned response with a retryable status code is retried as well.
+        Once the attempts are exhausted, the last response is returned, or the
+        last exception is raised.
+
+        :param func: The function to call.
+        :param args: The positional arguments of ``func``.
+        :param deadline: Optional total time in seconds, overrides the
+            ``deadline`` of the policy.
+        :param on_retry: Optional callable receiving the number of the failed
+            attempt and its response or exception, before waiting.
+        :param kwargs: The keyword arguments of ``func``.
+        :returns: The result of ``func``.
+        """
+        deadline = deadline if deadline is not None else self.deadline
+        start = time.monotonic()
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                result = func(*args, **kwargs)
+                error = None
+            except Exception as e:
+                result = error = e
+
+            if attempt == self.max_attempts or not self.is_retryable(result):
+                break
+            delay = self.get_delay(attempt, result)
+            if deadline is not None and time.monotonic() - start + delay > deadline:
+                break
+
+            if on_retry:
+                on_retry(attempt, result)
+            time.sleep(delay)
+
+        if error is not None:
+            raise error
+        return result
@@ -0,0 +1,108 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional, Tuple, Union
+
+import requests
+
+from ..excepts import RequestTimeoutError
+
+__all__ = ['Deadline', 'get_timeout', 'raise_timeout', 'TimeoutType']
+
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 60.0
+# the push and build logs are streamed, with long pauses between the events
+DEFAULT_STREAM_READ_TIMEOUT = 600.0
+
+TimeoutType = Optional[Union[float, Tuple[float, float]]]
+
+
+def _get_setting(name: str) -> Optional[float]:
+    """Get a timeout setting from the environment, or else from the config.
+
+    ``connect_timeout`` is read from ``JINA_HUBBLE_CONNECT_TIMEOUT`` or the
+    ``connect_timeout`` key of the config file, and so on.
+    """
+    value = os.environ.get(f'JINA_HUBBLE_{name.upper()}')
+    if value is None:
+        from .config import config
+
+        value = config.get(name)
+    return float(value) if value not in (None, '') else None
+
+
+class Deadline(object):
+    """A total time budget shared by all the requests of one call.
+
+    :param seconds: The budget in seconds, defaults to the
+        ``JINA_HUBBLE_DEADLINE`` environment variable or the ``deadline`` key
+        of the config. Without any, the call has no deadline.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        if seconds is None:
+            seconds = _get_setting('deadline')
+        self.seconds = seconds
+        self._expires_at = time.monotonic() + seconds if seconds is not None else None
+
+    def remaining(self) -> Optional[float]:
+        """Get the remaining time.
+
+        :returns: The remaining seconds, ``None`` if there is no deadline.
+        """
+        if self._expires_at is None:
+            return None
+
+        remaining = self._expires_at - time.monotonic()
+        if remaining <= 0:
+            raise RequestTimeoutError(
+                response={}, message=f'Deadline of {self.seconds}s exceeded.'
+            )
+        return remaining
+
+
+def get_timeout(
+    timeout: TimeoutType = None,
+    deadline: Optional[Deadline] = None,
+    stream: bool = False,
+) -> Tuple[float, float]:
+    """Get the ``(connect, read)`` timeouts of a request.
+
+    Unless given, the timeouts are read from the ``JINA_HUBBLE_CONNECT_TIMEOUT``
+    and ``JINA_HUBBLE_READ_TIMEOUT`` environment variables, then from the
+    ``connect_timeout`` and ``read_timeout`` keys of the config.
+
+    :param timeout: Optional timeout in seconds, or ``(connect, read)`` tuple.
+    :param deadline: Optional deadline, the timeouts never go past it.
+    :param stream: If set, use the longer default read timeout of streamed logs.
+    :returns: The ``(connect, read)`` timeouts in seconds.
+    """
+    if timeout is None:
+        connect = _get_setting('connect_timeout') or DEFAULT_CONNECT_TIMEOUT
+        read = _get_setting('read_timeout') or (
+            DEFAULT_STREAM_READ_TIMEOUT if stream else DEFAULT_READ_TIMEOUT
+        )
+    elif isinstance(timeout, (int, float)):
+        connect = read = float(timeout)
+    else:
+        connect, read = timeout
+
+    remaining = deadline.remaining() if deadline is not None else None
+    if remaining is not None:
+        connect, read = min(connect, remaining), min(read, remaining)
+    return connect, read
+
+
+@contextmanager
+def raise_timeout(description: str):
+    """Turn the timeouts of ``requests`` into :class:`RequestTimeoutError`.
+
+    :param description: What timed out, used in the error message.
+    :yields: nothing
+    """
+    try:
+        yield
+    except requests.exceptions.Timeout as e:
+        raise RequestTimeoutError(
+            response={}, message=f'{description} timed out: {e}'
+        ) from e
@@ -50,6 +50,9 @@ try:
 except FileNotFoundError:
     _extra_deps = {}
 
+# optional Zstandard compression of the executor archives
+_extra_deps['zstd'] = ['zstandard']
+
 # package long description
 try:
     with open('README.md', encoding='utf8') as fp:
@@ -41,3 +41,95 @@ def generate_jwt(mocker):
         return jwt.encode(payload, private_key, algorithm='ES256', headers=headers)
 
     return encode
+
+
+class StandInServer:
+    """A local HTTP server standing in for Hubble in tests.
+
+    Handlers are registered per path in ``routes`` and receive the
+    ``BaseHTTPRequestHandler`` with the request ``body`` attached. They return
+    a ``(status, headers, body)`` tuple, ``body`` being ``bytes`` or a dict
+    which is sent as JSON.
+    """
+
+    def __init__(self):
+        import http.server
+        import threading
+
+        self.routes = {}
+        self.requests = []
+        server = self
+
+        class _Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _handle(self):
+                import json
+
+                length = int(self.headers.get('Content-Length') or 0)
+                self.body = self.rfile.read(length) if length else b''
+                path = self.path.split('?')[0]
+                server.requests.append((self.command, path))
+
+                handler = server.routes.get(path)
+                if handler is None:
+                    status, headers, body = 404, {}, {'status': -1, 'code': 404}
+                else:
+                    status, headers, body = handler(self)
+                if isinstance(body, dict):
+                    body = json.dumps(body).encode('utf-8')
+                    headers = {'Content-Type': 'application/json', **headers}
+
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, str(value))
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    try:
+                        self.wfile.write(body)
+                    except (BrokenPipeError, ConnectionResetError):
+                        # the client gave up, e.g. on a timeout
+                        pass
+
+            do_GET = do_POST = do_HEAD = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._httpd.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self._httpd.server_port}'
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def rpc(self, method: str) -> str:
+        return f'/v2/rpc/{method}'
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def stand_in_server(monkeypatch):
+    server = StandInServer()
+    monkeypatch.setenv('JINA_HUBBLE_REGISTRY', server.url)
+    yield server
+    server.close()
+
+
+def parse_multipart(handler) -> dict:
+    """Parse the ``multipart/form-data`` body received by a stand-in handler."""
+    from email.parser import BytesParser
+
+    message = BytesParser().parsebytes(
+        f'Content-Type: {handler.headers["Content-Type"]}\r\n\r\n'.encode('latin-1')
+        + handler.body
+    )
+    return {
+        part.get_param('name', header='content-disposition'): part.get_payload(
+            decode=True
+        )
+        for part in message.get_payload()
+    }
@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+from urllib.parse import parse_qs
+
+import pytest
+from hubble.aio import AsyncClient
+from hubble.client.endpoints import EndpointsV2
+from hubble.excepts import AuthenticationRequiredError, RequestTimeoutError
+
+from ...conftest import parse_multipart
+
+CONTENT = os.urandom(3 * 1024 * 1024 + 7)
+
+
+@pytest.fixture
+def hubble_server(stand_in_server):
+    state = {'uploaded': None, 'ranges': [], 'delay': 0}
+
+    def _whoami(handler):
+        if handler.headers.get('Authorization') != 'token fake-token':
+            return 401, {}, {'code': 401, 'status': 40103, 'message': 'login'}
+        return 200, {}, {'code': 200, 'data': {'name': 'hubble'}}
+
+    def _delete_multiple(handler):
+        return 200, {}, {'code': 200, 'data': parse_qs(handler.body.decode())}
+
+    def _upload(handler):
+        assert 'chunked' not in handler.headers.get('Transfer-Encoding', '')
+        state['uploaded'] = parse_multipart(handler)
+        return 200, {}, {'code': 200, 'data': {'_id': 'artifact-id'}}
+
+    def _info(handler):
+        data = {'_id': 'artifact-id', 'md5': hashlib.md5(CONTENT).hexdigest()}
+        return 200, {}, {'code': 200, 'data': data}
+
+    def _download(handler):
+        url = stand_in_server.url + '/blob'
+        return 200, {}, {'code': 200, 'data': {'download': url}}
+
+    def _blob(handler):
+        assert 'Authorization' not in handler.headers
+        time.sleep(state['delay'])
+        header = handler.headers.get('Range')
+        if not header:
+            return 200, {}, CONTENT
+        start = int(re.match(r'bytes=(\d+)-', header).group(1))
+        state['ranges'].append(start)
+        if start >= len(CONTENT):
+            return 416, {'Content-Range': f'bytes */{len(CONTENT)}'}, b''
+        headers = {'Content-Range': f'bytes {start}-{len(CONTENT) - 1}/{len(CONTENT)}'}
+        return 206, headers, CONTENT[start:]
+
+    stand_in_server.routes.update(
+        {
+            stand_in_server.rpc(EndpointsV2.get_user_info): _whoami,
+            stand_in_server.rpc(EndpointsV2.delete_multiple_artifacts): (
+                _delete_multiple
+            ),
+            stand_in_server.rpc(EndpointsV2.upload_artifact): _upload,
+            stand_in_server.rpc(EndpointsV2.get_artifact_info): _info,
+            stand_in_server.rpc(EndpointsV2.download_artifact): _download,
+            '/blob': _blob,
+        }
+    )
+    return state
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests(hubble_server):
+    async with AsyncClient(token='fake-token', jsonify=True, limit=10) as client:
+        responses = await asyncio.gather(
+            *(client.get_user_info(variant='data') for _ in range(100))
+        )
+        assert await client.username == 'hubble'
+        assert await client.token == 'fake-token'
+
+    assert all(resp == {'name': 'hubble'} for resp in responses)
+
+
+@pytest.mark.asyncio
+async def test_error_response(hubble_server):
+    async with AsyncClient(token='wrong-token', jsonify=True) as client:
+        with pytest.raises(AuthenticationRequiredError):
+            await client.get_user_info()
+        assert await client.token is None
+
+
+@pytest.mark.asyncio
+async def test_form_data(hubble_server):
+    async with AsyncClient(token='fake-token') as client:
+        resp = await client.delete_multiple_artifacts(ids=['a', 'b'])
+        assert (await resp.json())['data'] == {'ids': ['a', 'b']}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('from_path', [True, False])
+async def test_upload_artifact(hubble_server, tmpdir, from_path):
+    if from_path:
+        f = str(tmpdir / 'model')
+        with open(f, 'wb') as fp:
+            fp.write(CONTENT)
+    else:
+        f = io.BytesIO(CONTENT)
+
+    async with AsyncClient(token='fake-token', jsonify=True) as client:
+        resp = await client.upload_artifact(f, name='my-artifact', is_public=True)
+
+    assert resp['data']['_id'] == 'artifact-id'
+    assert hubble_server['uploaded']['file'] == CONTENT
+    assert hubble_server['uploaded']['name'] == b'my-artifact'
+    assert hubble_server['uploaded']['public'] == b'True'
+
+
+@pytest.mark.asyncio
+async def test_download_artifact(hubble_server, tmpdir):
+    path = str(tmpdir / 'model')
+    with open(f'{path}.part', 'wb') as fp:
+        fp.write(CONTENT[:1000])
+
+    async with AsyncClient(token='fake-token', jsonify=True) as client:
+        assert await client.download_artifact('artifact-id', path) == path
+        f = await client.download_artifact('artifact-id', io.BytesIO())
+
+    with open(path, 'rb') as fp:
+        assert fp.read() == CONTENT
+    assert not os.path.exists(f'{path}.part')
+    assert f.getvalue() == CONTENT
+    assert hubble_server['ranges'] == [1000]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('extra', [b'', b'garbage'])
+async def test_download_artifact_unsatisfiable_range(hubble_server, tmpdir, extra):
+    part = CONTENT + extra
+    path = str(tmpdir / 'model')
+    with open(f'{path}.part', 'wb') as fp:
+        fp.write(part)
+
+    async with AsyncClient(token='fake-token', jsonify=True) as client:
+        assert await client.download_artifact('artifact-id', path) == path
+
+    # a complete part file is kept, a larger one is downloaded again
+    with open(path, 'rb') as fp:
+        assert fp.read() == CONTENT
+    assert hubble_server['ranges'] == [len(part)]
+
+
+@pytest.mark.asyncio
+async def test_download_artifact_timeout(hubble_server, tmpdir):
+    hubble_server['delay'] = 1
+
+    async with AsyncClient(
+        token='fake-token', jsonify=True, timeout=(1, 0.2)
+    ) as client:
+        with pytest.raises(RequestTimeoutError):
+            await client.download_artifact('artifact-id', io.BytesIO())
+
+
+@pytest.mark.asyncio
+async def test_get_user_info_validates_token_off_the_loop(hubble_server, mocker):
+    threads = []
+
+    def _validate(token):
+        threads.append(threading.get_ident())
+        return {'user': {'status': 'active', 'name': 'cached'}}
+
+    mocker.patch('hubble.aio.client.validate_jwt', side_effect=_validate)
+
+    async with AsyncClient(token='fake-token', jsonify=True) as client:
+        assert await client.get_user_info(variant='data') == {
+            'status': 'active',
+            'name': 'cached',
+        }
+
+    assert threads and threads[0] != threading.get_ident()
@@ -0,0 +1,78 @@
+import io
+import os
+import time
+
+import pytest
+from hubble.client.cache import ArtifactCache
+
+
+@pytest.fixture
+def cache(tmpdir):
+    return ArtifactCache(root=str(tmpdir / 'cache'), max_bytes=250)
+
+
+def _info(**data):
+    return {'code': 200, 'data': data}
+
+
+def test_get_key():
+    key = ArtifactCache.get_key('id', _info(md5='abc', updatedAt='2022'))
+    assert key == ArtifactCache.get_key('id', _info(md5='abc', updatedAt='2023'))
+    assert key != ArtifactCache.get_key('id', _info(md5='abd'))
+    assert key != ArtifactCache.get_key('other-id', _info(md5='abc'))
+    assert ArtifactCache.get_key('id', _info(updatedAt='2022')) is not None
+    assert ArtifactCache.get_key('id', _info()) is None
+
+
+def test_get_put(cache, tmpdir):
+    path = str(tmpdir / 'model')
+    with open(path, 'wb') as fp:
+        fp.write(b'a' * 100)
+
+    assert not cache.get('a' * 64, str(tmpdir / 'restored'))
+    cache.put('a' * 64, path)
+    os.remove(path)
+
+    assert cache.get('a' * 64, str(tmpdir / 'restored'))
+    with open(tmpdir / 'restored', 'rb') as fp:
+        assert fp.read() == b'a' * 100
+
+    f = io.BytesIO()
+    assert cache.get('a' * 64, f)
+    assert f.getvalue() == b'a' * 100
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_lru_eviction(cache):
+    for key in ('a', 'b'):
+        cache.put(key * 64, io.BytesIO(key.encode() * 100))
+        time.sleep(0.01)
+
+    # `a` becomes the most recently used entry
+    assert cache.get('a' * 64, io.BytesIO())
+    time.sleep(0.01)
+    cache.put('c' * 64, io.BytesIO(b'c' * 100))
+
+    assert cache.get('a' * 64, io.BytesIO())
+    assert not cache.get('b' * 64, io.BytesIO())
+    assert cache.get('c' * 64, io.BytesIO())
+
+
+def test_entries_are_not_shared(cache, tmpdir):
+    path = str(tmpdir / 'model')
+    with open(path, 'wb') as fp:
+        fp.write(b'a' * 100)
+
+    cache.put('a' * 64, path)
+    with open(path, 'r+b') as fp:
+        fp.write(b'b')
+    assert cache.get('a' * 64, str(tmpdir / 'restored'))
+    mtime = os.stat(path).st_mtime_ns
+    with open(tmpdir / 'restored', 'r+b') as fp:
+        fp.write(b'c')
+
+    # in place edits of the downloaded or restored files do not reach the cache
+    f = io.BytesIO()
+    assert cache.get('a' * 64, f)
+    assert f.getvalue() == b'a' * 100
+    assert os.stat(path).st_mtime_ns == mtime
@@ -61,3 +61,60 @@ def test_get_user_info_via_jwt(generate_jwt):
         '_id': 'random_user_id',
         'status': 'active',
     }
+
+
+def test_upload_artifact_streams_file(mocker, tmpdir):
+    from hubble.utils.multipart import MultipartEncoder
+
+    content = b'some initial binary data: \x00\x01' * 1024
+    path = str(tmpdir / 'model')
+    with open(path, 'wb') as fp:
+        fp.write(content)
+
+    client = Client(token='fake-token', jsonify=True)
+    mocker.patch.object(client, 'get_user_info')
+    sent = {}
+
+    def _mock_request(method, url, data, headers, **kwargs):
+        assert isinstance(data, MultipartEncoder)
+        sent['length'] = len(data)
+        sent['body'] = data.read()
+        sent['content_type'] = headers['Content-Type']
+        return mocker.Mock(status_code=200, json=lambda: {'code': 200})
+
+    mocker.patch.object(client._session, 'request', side_effect=_mock_request)
+
+    assert client.upload_artifact(f=path, name='my-artifact') == {'code': 200}
+    assert sent['length'] == len(sent['body'])
+    assert sent['content_type'].startswith('multipart/form-data; boundary=')
+    assert content in sent['body']
+    assert b'name="name"\r\n\r\nmy-artifact\r\n' in sent['body']
+
+
+@pytest.mark.parametrize(
+    'max_items, expected_pages', [(None, [1, 2, 3]), (15, [1, 2]), (20, [1, 2])]
+)
+def test_iter_artifacts(mocker, max_items, expected_pages):
+    import threading
+
+    artifacts = [{'_id': str(i)} for i in range(25)]
+    fetched = []
+    prefetched = threading.Event()
+
+    def _list_artifacts(filter, sort, pageIndex, pageSize):
+        fetched.append(pageIndex)
+        if pageIndex == 2:
+            prefetched.set()
+        start = (pageIndex - 1) * pageSize
+        return {'code': 200, 'data': artifacts[start : start + pageSize]}  # noqa
+
+    client = Client(token='fake-token', jsonify=True)
+    mocker.patch.object(client, 'list_artifacts', side_effect=_list_artifacts)
+
+    items = client.iter_artifacts(page_size=10, max_items=max_items)
+    assert next(items) == {'_id': '0'}
+    # the second page is requested while the first one is consumed
+    assert prefetched.wait(timeout=5)
+
+    assert [next(items)] + list(items) == artifacts[1:max_items]
+    assert fetched == expected_pages
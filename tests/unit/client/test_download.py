@@ -0,0 +1,248 @@
+import errno
+import hashlib
+import io
+import os
+import re
+import time
+
+import pytest
+import requests
+from hubble.client.client import Client
+from hubble.client.download import RangedDownloader
+from hubble.client.endpoints import EndpointsV2
+
+CONTENT = os.urandom(100 * 1024 + 7)
+
+
+@pytest.fixture
+def download_server(stand_in_server):
+    state = {
+        'ranges': [],
+        'accept_ranges': True,
+        'failures': {},
+        'failure': (500, {}),
+        'info': {'_id': 'artifact-id', 'md5': hashlib.md5(CONTENT).hexdigest()},
+    }
+
+    def _info(handler):
+        return 200, {}, {'code': 200, 'data': state['info']}
+
+    def _download(handler):
+        return (
+            200,
+            {},
+            {'code': 200, 'data': {'download': stand_in_server.url + '/blob'}},
+        )
+
+    def _blob(handler):
+        header = handler.headers.get('Range')
+        if not state['accept_ranges'] or not header:
+            return 200, {}, CONTENT
+
+        start, end = re.match(r'bytes=(\d+)-(\d*)', header).groups()
+        start, end = int(start), min(int(end or len(CONTENT)), len(CONTENT) - 1)
+        state['ranges'].append((start, end))
+        if state['failures'].get(start, 0) > 0:
+            state['failures'][start] -= 1
+            return (*state['failure'], b'')
+        return (
+            206,
+            {
+                'Accept-Ranges': 'bytes',
+                'Content-Range': f'bytes {start}-{end}/{len(CONTENT)}',
+            },
+            CONTENT[start : end + 1],  # noqa: E203
+        )
+
+    stand_in_server.routes.update(
+        {
+            stand_in_server.rpc(EndpointsV2.get_artifact_info): _info,
+            stand_in_server.rpc(EndpointsV2.download_artifact): _download,
+            '/blob': _blob,
+        }
+    )
+    state['url'] = stand_in_server.url + '/blob'
+    return state
+
+
+def test_ranged_download(download_server, tmpdir):
+    path = str(tmpdir / 'model')
+    downloader = RangedDownloader(max_workers=4, min_part_size=10 * 1024)
+    received = []
+
+    downloader.download(download_server['url'], path, callback=received.append)
+
+    with open(path, 'rb') as fp:
+        assert fp.read() == CONTENT
+    assert sum(received) == len(CONTENT)
+    # the probe, then one request per range
+    assert download_server['ranges'][0] == (0, 0)
+    assert sorted(download_server['ranges'][1:]) == downloader.split(len(CONTENT))
+    assert len(download_server['ranges'][1:]) == 4
+    assert downloader.probe(download_server['url']) == (len(CONTENT), True)
+
+
+def test_download_falls_back_to_single_stream(download_server, tmpdir):
+    download_server['accept_ranges'] = False
+    path = str(tmpdir / 'model')
+    downloader = RangedDownloader(max_workers=4, min_part_size=10 * 1024)
+
+    assert downloader.probe(download_server['url']) == (len(CONTENT), False)
+    downloader.download(download_server['url'], path)
+
+    with open(path, 'rb') as fp:
+        assert fp.read() == CONTENT
+    assert download_server['ranges'] == []
+
+
+def test_split():
+    downloader = RangedDownloader(max_workers=3, min_part_size=10)
+    assert downloader.split(5) == [(0, 4)]
+    assert downloader.split(25) == [(0, 12), (13, 24)]
+    assert downloader.split(100) == [(0, 33), (34, 67), (68, 99)]
+
+
+@pytest.mark.parametrize('to_bytes', [False, True])
+def test_download_artifact(mocker, download_server, tmpdir, to_bytes):
+    client = Client(token='fake-token', jsonify=True)
+    mocker.patch.object(client, 'get_user_info')
+
+    f = io.BytesIO() if to_bytes else str(tmpdir / 'model')
+    assert client.download_artifact(id='artifact-id', f=f, show_progress=True) is f
+
+    if to_bytes:
+        assert f.getvalue() == CONTENT
+    else:
+        with open(f, 'rb') as fp:
+            assert fp.read() == CONTENT
+
+
+def test_download_artifact_resumes_part_file(mocker, download_server, tmpdir):
+    path = str(tmpdir / 'model')
+    with open(f'{path}.part', 'wb') as fp:
+        fp.write(CONTENT[:1000])
+    client = Client(token='fake-token', jsonify=True)
+    mocker.patch.object(client, 'get_user_info')
+
+    client.download_artifact(id='artifact-id', f=path)
+
+    with open(path, 'rb') as fp:
+        assert fp.read() == CONTENT
+    assert download_server['ranges'] == [(0, 0), (1000, len(CONTENT) - 1)]
+    assert not os.path.exists(f'{path}.part')
+
+
+def test_ranged_download_resumes_failed_ranges(download_server, tmpdir):
+    path = str(tmpdir / 'model')
+    downloader = RangedDownloader(max_workers=4, min_part_size=10 * 1024, max_retries=1)
+    ranges = downloader.split(len(CONTENT))
+    download_server['failures'] = {ranges[2][0]: 1}
+
+    with pytest.raises(Exception):
+        downloader.download(download_server['url'], path, resume=True)
+    assert os.path.exists(f'{path}.json')
+
+    download_server['ranges'] = []
+    hasher = hashlib.md5()
+    downloader.download(download_server['url'], path, hasher=hasher, resume=True)
+
+    with open(path, 'rb') as fp:
+        assert fp.read() == CONTENT
+    assert hasher.hexdigest() == hashlib.md5(CONTENT).hexdigest()
+    # the probe, then only the failed range
+    assert download_server['ranges'] == [(0, 0), ranges[2]]
+    assert not os.path.exists(f'{path}.json')
+
+
+def test_ranged_download_throttles_state_saves(mocker, download_server, tmpdir):
+    path = str(tmpdir / 'model')
+    mocker.patch('hubble.client.download.STATE_SAVE_INTERVAL', 60)
+    save_state = mocker.spy(RangedDownloader, '_save_state')
+    downloader = RangedDownloader(
+        max_workers=4, chunk_size=1024, min_part_size=10 * 1024
+    )
+
+    downloader.download(download_server['url'], path, resume=True)
+
+    with open(path, 'rb') as fp:
+        assert fp.read() == CONTENT
+    # once when the download starts, not once per chunk
+    assert save_state.call_count == 1
+    assert not os.path.exists(f'{path}.json')
+
+
+def test_ranged_download_retries_after(mocker, download_server, tmpdir):
+    sleep = mocker.spy(time, 'sleep')
+    downloader = RangedDownloader(max_workers=4, min_part_size=10 * 1024)
+    ranges = downloader.split(len(CONTENT))
+    download_server['failures'] = {ranges[1][0]: 1}
+    download_server['failure'] = (503, {'Retry-After': '0.2'})
+
+    downloader.download(download_server['url'], str(tmpdir / 'model'))
+
+    sleep.assert_called_once_with(0.2)
+
+
+@pytest.mark.parametrize('max_retries', [0, 3])
+def test_ranged_download_raises_last_error(download_server, tmpdir, max_retries):
+    downloader = RangedDownloader(
+        max_workers=4, min_part_size=10 * 1024, max_retries=max_retries
+    )
+    ranges = downloader.split(len(CONTENT))
+    download_server['failures'] = {ranges[1][0]: 5}
+    download_server['failure'] = (404, {})
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        downloader.download(download_server['url'], str(tmpdir / 'model'))
+    # a 404 is not retried
+    assert download_server['ranges'].count(ranges[1]) == 1
+
+
+def test_ranged_download_does_not_retry_local_errors(mocker, download_server, tmpdir):
+    sleep = mocker.spy(time, 'sleep')
+    mocker.patch.object(
+        RangedDownloader, '_pwrite', side_effect=OSError(errno.ENOSPC, 'No space')
+    )
+    downloader = RangedDownloader(max_workers=4, min_part_size=10 * 1024)
+
+    with pytest.raises(OSError) as excinfo:
+        downloader.download(download_server['url'], str(tmpdir / 'model'))
+
+    assert excinfo.value.errno == errno.ENOSPC
+    # a single attempt of each range
+    ranges = download_server['ranges']
+    assert len(ranges) > 2 and len(ranges) == len(set(ranges))
+    sleep.assert_not_called()
+
+
+def test_download_artifact_checksum_mismatch(mocker, download_server, tmpdir):
+    path = str(tmpdir / 'model')
+    download_server['info']['md5'] = hashlib.md5(b'other content').hexdigest()
+    client = Client(token='fake-token', jsonify=True)
+    mocker.patch.object(client, 'get_user_info')
+
+    with pytest.raises(RuntimeError, match='MD5 checksum'):
+        client.download_artifact(id='artifact-id', f=path)
+    assert not os.path.exists(path)
+    assert not os.path.exists(f'{path}.part')
+
+
+def test_download_artifact_cache(mocker, download_server, tmpdir):
+    from hubble.client.cache import ArtifactCache
+
+    cache = ArtifactCache(root=str(tmpdir / 'cache'))
+    client = Client(token='fake-token', jsonify=True)
+    mocker.patch.object(client, 'get_user_info')
+
+    for name in ('model', 'model-copy'):
+        path = str(tmpdir / name)
+        client.download_artifact(id='artifact-id', f=path, cache=cache)
+        with open(path, 'rb') as fp:
+            assert fp.read() == CONTENT
+
+    f = client.download_artifact(id='artifact-id', f=io.BytesIO(), cache=cache)
+    assert f.getvalue() == CONTENT
+
+    assert (cache.hits, cache.misses) == (2, 1)
+    # only the first download reaches the storage
+    assert download_server['ranges'] == [(0, 0)]
@@ -19,3 +19,78 @@ def init_jwt_auth_url():
 def test_init_jwt_auth_fail_given_invalid_token(test_session):
     test_session.init_jwt_auth(token='fake-token')
     assert test_session.headers['Authorization'] == 'token fake-token'
+
+
+@pytest.fixture
+def clean_sessions():
+    from hubble.client.session import clear_sessions
+
+    clear_sessions()
+    yield
+    clear_sessions()
+
+
+def test_clients_share_sessions(clean_sessions):
+    from hubble import Client
+
+    client = Client(token='fake-token')
+    assert Client(token='fake-token', jsonify=True)._session is client._session
+    assert Client(token='other-token')._session is client._session
+    assert Client(token='fake-token', max_retries=3)._session is client._session
+    assert 'Authorization' not in client._session.headers
+
+
+def test_clients_send_their_token(clean_sessions, stand_in_server):
+    from hubble import Client
+
+    tokens = []
+
+    def _whoami(handler):
+        tokens.append(handler.headers.get('Authorization'))
+        headers = {'Set-Cookie': f'session={len(tokens)}; Path=/'}
+        return 200, headers, {'code': 200, 'data': {'name': 'hubble'}}
+
+    cookies = []
+
+    def _raw_session(handler):
+        cookies.append(handler.headers.get('Cookie'))
+        return 200, {}, {'code': 200, 'data': {}}
+
+    stand_in_server.routes.update(
+        {
+            stand_in_server.rpc(EndpointsV2.get_user_info): _whoami,
+            stand_in_server.rpc(EndpointsV2.get_raw_session): _raw_session,
+        }
+    )
+
+    for token in ('token-a', 'token-b', 'token-a'):
+        Client(token=token).get_user_info()
+    Client(token='token-b').get_raw_session()
+
+    assert tokens == ['token token-a', 'token token-b', 'token token-a']
+    assert cookies == [None]
+
+
+def test_get_session_pool_options(clean_sessions, monkeypatch):
+    from hubble.client.session import get_session
+
+    monkeypatch.setenv('JINA_HUBBLE_POOL_MAXSIZE', '32')
+    session = get_session('https://hubble.test/', pool_connections=2)
+
+    adapter = session.get_adapter('https://hubble.test/')
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 32
+
+
+def test_get_session_prewarm(clean_sessions, stand_in_server):
+    import time
+
+    from hubble.client.session import get_session
+
+    get_session(stand_in_server.url + '/', prewarm=True)
+
+    for _ in range(50):
+        if stand_in_server.requests:
+            break
+        time.sleep(0.1)
+    assert stand_in_server.requests == [('HEAD', '/')]
@@ -0,0 +1,125 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import pytest
+from hubble.client.client import Client
+from hubble.client.endpoints import EndpointsV2
+from hubble.client.upload import ChunkedUploader
+
+from ...conftest import parse_multipart
+
+
+@pytest.fixture
+def artifact(tmpdir):
+    content = os.urandom(10 * 1024 + 123)
+    path = str(tmpdir / 'model')
+    with open(path, 'wb') as fp:
+        fp.write(content)
+    return path, content
+
+
+@pytest.fixture
+def upload_server(stand_in_server):
+    state = {'parts': {}, 'failures': {}, 'created': 0, 'committed': None}
+    lock = threading.Lock()
+
+    def _create(handler):
+        state['created'] += 1
+        return 200, {}, {'code': 200, 'data': {'uploadId': f'up{state["created"]}'}}
+
+    def _upload_part(handler):
+        form = parse_multipart(handler)
+        part_number = int(form['partNumber'])
+        chunk = form['file']
+        assert hashlib.md5(chunk).hexdigest() == form['md5'].decode()
+
+        with lock:
+            if state['failures'].get(part_number, 0) > 0:
+                state['failures'][part_number] -= 1
+                return 500, {}, {'code': 500, 'status': 50001}
+            state['parts'].setdefault(part_number, []).append(chunk)
+        return 200, {}, {'code': 200, 'data': {'etag': f'etag-{part_number}'}}
+
+    def _complete(handler):
+        import json
+
+        state['committed'] = json.loads(handler.body)
+        return 200, {}, {'code': 200, 'data': {'_id': 'artifact-id'}}
+
+    stand_in_server.routes.update(
+        {
+            stand_in_server.rpc(EndpointsV2.create_artifact_upload): _create,
+            stand_in_server.rpc(EndpointsV2.upload_artifact_part): _upload_part,
+            stand_in_server.rpc(EndpointsV2.complete_artifact_upload): _complete,
+        }
+    )
+    return state
+
+
+def _assembled(state):
+    parts = state['committed']['parts']
+    return b''.join(state['parts'][p['partNumber']][-1] for p in parts)
+
+
+def test_chunked_upload_retries_failed_parts(mocker, upload_server, artifact, tmpdir):
+    path, content = artifact
+    upload_server['failures'] = {2: 1, 5: 2}
+
+    client = Client(token='fake-token', jsonify=True)
+    mocker.patch.object(client, 'get_user_info')
+    mocker.patch(
+        'hubble.client.upload.get_upload_journal_dir',
+        return_value=Path(tmpdir / 'journal'),
+    )
+
+    resp = client.upload_artifact(f=path, chunked=True, part_size=1024, max_workers=3)
+
+    assert resp['data']['_id'] == 'artifact-id'
+    assert upload_server['created'] == 1
+    assert _assembled(upload_server) == content
+    assert [p['partNumber'] for p in upload_server['committed']['parts']] == list(
+        range(1, 12)
+    )
+    # only the failed parts are sent again
+    assert all(len(chunks) == 1 for chunks in upload_server['parts'].values())
+    assert not os.listdir(tmpdir / 'journal')
+
+
+def test_chunked_upload_resumes_from_journal(mocker, upload_server, artifact, tmpdir):
+    path, content = artifact
+    upload_server['failures'] = {4: 3}
+
+    client = Client(token='fake-token', jsonify=True)
+    uploader = ChunkedUploader(
+        client, part_size=1024, max_workers=2, journal_dir=tmpdir / 'journal'
+    )
+
+    with pytest.raises(Exception):
+        uploader.upload(path, {'name': 'my-artifact'})
+    assert upload_server['committed'] is None
+    assert len(os.listdir(tmpdir / 'journal')) == 1
+    assert 4 not in upload_server['parts']
+
+    resp = uploader.upload(path, {'name': 'my-artifact'})
+
+    assert resp['data']['_id'] == 'artifact-id'
+    assert upload_server['created'] == 1
+    assert upload_server['committed']['uploadId'] == 'up1'
+    assert _assembled(upload_server) == content
+    assert all(len(chunks) == 1 for chunks in upload_server['parts'].values())
+    assert not os.listdir(tmpdir / 'journal')
+
+
+def test_chunked_upload_bytesio(upload_server):
+    import io
+
+    content = b'some initial binary data: \x00\x01' * 100
+    client = Client(token='fake-token', jsonify=False)
+    uploader = ChunkedUploader(client, part_size=1000, max_inflight_bytes=1000)
+
+    resp = uploader.upload(io.BytesIO(content), {'public': True})
+
+    assert resp.json()['data']['_id'] == 'artifact-id'
+    assert _assembled(upload_server) == content
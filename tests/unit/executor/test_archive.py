@@ -0,0 +1,208 @@
+import io
+import os
+import random
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+from hubble.executor.archive import extract_zip, walk_package, write_zip
+
+
+def _make_files(root: Path, count: int, size: int):
+    rng = random.Random(0)
+    words = [bytes(rng.choices(b'abcdefghij', k=8)) for _ in range(512)]
+    files = []
+    for index in range(count):
+        path = root / f'{index:04d}.txt'
+        data = b' '.join(rng.choices(words, k=size // 9))
+        path.write_bytes(data)
+        files.append((path.name, path))
+    return files
+
+
+def _write(files, **kwargs) -> bytes:
+    out = io.BytesIO()
+    write_zip(files, out.write, **kwargs)
+    return out.getvalue()
+
+
+def test_write_zip_is_independent_of_workers(tmpdir):
+    files = _make_files(Path(tmpdir), count=20, size=10000)
+
+    content = _write(files, workers=1)
+
+    assert _write(files, workers=4) == content
+    with zipfile.ZipFile(io.BytesIO(content)) as zfile:
+        assert zfile.testzip() is None
+        assert zfile.namelist() == [name for name, _ in files]
+        for name, path in files:
+            assert zfile.read(name) == path.read_bytes()
+
+
+def test_write_zip_modes_and_stored_files(tmpdir):
+    script = Path(tmpdir / 'run.sh')
+    script.write_text('echo 1')
+    script.chmod(0o700)
+    image = Path(tmpdir / 'logo.PNG')
+    image.write_bytes(b'\x89PNG' * 100)
+
+    content = _write([('run.sh', script), ('logo.PNG', image), ('ü.sh', script)])
+
+    with zipfile.ZipFile(io.BytesIO(content)) as zfile:
+        infos = {info.filename: info for info in zfile.infolist()}
+        assert infos['run.sh'].external_attr >> 16 == 0o100755
+        assert infos['run.sh'].compress_type == zipfile.ZIP_DEFLATED
+        assert infos['logo.PNG'].external_attr >> 16 == 0o100644
+        assert infos['logo.PNG'].compress_type == zipfile.ZIP_STORED
+        assert zfile.read('ü.sh') == b'echo 1'
+
+
+def test_write_zip_unknown_codec(tmpdir):
+    with pytest.raises(ValueError):
+        _write([], codec='lzma')
+
+
+def test_extract_zip_bad_zstd_member(tmpdir):
+    pytest.importorskip('zstandard')
+
+    files = _make_files(Path(tmpdir), count=1, size=1000)
+    content = bytearray(_write(files, codec='zstd'))
+    # corrupt the CRC-32 of the central directory
+    index = content.rindex(b'PK\x01\x02') + 16
+    content[index : index + 4] = b'\0\0\0\0'  # noqa: E203
+    (tmpdir / 'package.zip').write_binary(bytes(content))
+
+    with pytest.raises(zipfile.BadZipFile):
+        extract_zip(Path(tmpdir / 'package.zip'), Path(tmpdir / 'dst'))
+
+
+@pytest.mark.parametrize('codec', ['deflate', 'zstd'])
+def test_extract_zip(tmpdir, codec):
+    if codec == 'zstd':
+        pytest.importorskip('zstandard')
+
+    root = Path(tmpdir / 'src')
+    (root / 'sub').mkdir(parents=True)
+    files = _make_files(root, count=3, size=1000)
+    (root / 'sub' / 'a.py').write_text('a = 1')
+    files.append(('sub/a.py', root / 'sub' / 'a.py'))
+
+    with open(tmpdir / 'package.zip', 'wb') as fp:
+        write_zip(files, fp.write, codec=codec)
+    extract_zip(Path(tmpdir / 'package.zip'), Path(tmpdir / 'dst'))
+
+    for name, path in files:
+        assert (Path(tmpdir / 'dst') / name).read_bytes() == path.read_bytes()
+
+
+def _touch(root: Path, *names: str):
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+
+
+def test_walk_package(tmpdir, mocker):
+    root = Path(tmpdir)
+    _touch(
+        root,
+        'a.py',
+        'a.pyc',
+        'keep.pyc',
+        'node_modules/lib/index.js',
+        '.git/HEAD',
+        'sub/b.py',
+        'sub/b.log',
+        'sub/.git',
+        'sub/deep/c.py',
+        'sub/deep/c.log',
+        'sub/deep/data/x.bin',
+        'build',
+    )
+    (root / '.gitignore').write_text('*.pyc\n!keep.pyc\nnode_modules/\nbuild/\n')
+    (root / '.jinaignore').write_text('/sub/deep/data\n')
+    (root / 'sub' / '.gitignore').write_text('*.log\n/.git\n')
+    (root / 'sub' / 'deep' / '.gitignore').write_text('!c.log\n')
+
+    scandir = mocker.spy(os, 'scandir')
+    files = list(walk_package(root, always_ignore=['.git']))
+
+    assert [name for name, _, _ in files] == [
+        '.gitignore',
+        '.jinaignore',
+        'a.py',
+        'build',
+        'keep.pyc',
+        'sub/.gitignore',
+        'sub/b.py',
+        'sub/deep/.gitignore',
+        'sub/deep/c.log',
+        'sub/deep/c.py',
+    ]
+    for name, path, stat in files:
+        assert path == root / name
+        assert stat.st_size == path.stat().st_size
+    # the ignored folders are not walked
+    assert sorted(Path(call.args[0]) for call in scandir.call_args_list) == [
+        root,
+        root / 'sub',
+        root / 'sub' / 'deep',
+    ]
+
+
+def test_walk_package_default_ignore(tmpdir):
+    root = Path(tmpdir)
+    _touch(root, 'a.py', 'a.pyc', 'sub/b.pyc', 'sub/.jinaignore')
+
+    files = walk_package(root, default_ignore=['# bytecode', '*.pyc'])
+    assert [name for name, _, _ in files] == ['a.py', 'sub/.jinaignore']
+
+    (root / '.gitignore').write_text('sub/\n')
+    files = walk_package(root, default_ignore=['*.pyc'])
+    assert [name for name, _, _ in files] == ['.gitignore', 'a.py', 'a.pyc']
+
+
+@pytest.mark.parametrize('codec', ['deflate', 'zstd'])
+def test_write_zip_compresses_in_parallel(tmpdir, codec):
+    if codec == 'zstd':
+        pytest.importorskip('zstandard')
+
+    files = _make_files(Path(tmpdir), count=16, size=64 * 1024)
+    total = sum(os.path.getsize(path) for _, path in files)
+
+    content = _write(files, codec=codec, workers=4)
+
+    assert _write(files, codec=codec, workers=1) == content
+    # the members are compressed, not stored
+    assert total / len(content) > 2
+
+
+@pytest.mark.skipif(
+    not os.environ.get('JINA_HUBBLE_BENCHMARK'),
+    reason='set JINA_HUBBLE_BENCHMARK=1 to run the benchmarks',
+)
+def test_write_zip_benchmark(tmpdir):
+    pytest.importorskip('zstandard')
+
+    files = _make_files(Path(tmpdir), count=32, size=1024 * 1024)
+    total = sum(os.path.getsize(path) for _, path in files)
+
+    results = {}
+    for codec, workers in [('deflate', 1), ('deflate', None), ('zstd', None)]:
+        start = time.perf_counter()
+        content = _write(files, codec=codec, workers=workers)
+        elapsed = time.perf_counter() - start
+        results[codec, workers] = (elapsed, total / len(content), content)
+        print(
+            f'\n{codec} with {workers or "default"} workers: '
+            f'{elapsed * 1000:.0f}ms, ratio {total / len(content):.2f}'
+        )
+
+    serial, parallel, zstd = results.values()
+    assert parallel[2] == serial[2]
+    assert min(serial[1], zstd[1]) > 2
+    if (os.cpu_count() or 1) > 1:
+        assert parallel[0] < serial[0]
+    # zstd compresses at least as fast as deflate, to the same order of ratio
+    assert zstd[0] < parallel[0] and zstd[1] > serial[1] * 0.8
@@ -0,0 +1,129 @@
+import threading
+import time
+import urllib
+
+import pytest
+from hubble.executor import cache as cache_module
+from hubble.executor.cache import MetaCache
+from hubble.executor.helper import disk_cache_offline
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'time', lambda: now[0])
+    return now
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_meta_cache_entries(tmpfile, clock):
+    cache = MetaCache(tmpfile, ttl=10, stale_ttl=100)
+    assert cache.get('key') is None
+
+    cache.put('key', {'id': 'w7qckiqy'})
+    cache.put('other', 1, ttl=1000)
+    entry = cache.get('key')
+    assert entry.value == {'id': 'w7qckiqy'}
+    assert entry.is_fresh and not entry.is_stale
+
+    clock[0] += 10
+    assert not cache.get('key').is_fresh and cache.get('key').is_stale
+    assert cache.get('other').is_fresh
+
+    clock[0] += 100
+    entry = cache.get('key')
+    assert not entry.is_fresh and not entry.is_stale
+    assert entry.value == {'id': 'w7qckiqy'}
+
+    # entries are shared by the instances of the same file
+    assert MetaCache(tmpfile).get('other').value == 1
+
+    cache.delete('key')
+    assert cache.get('key') is None
+    cache.clear()
+    assert cache.get('other') is None
+
+
+def test_meta_cache_replaces_other_formats(tmpfile):
+    with open(tmpfile, 'w') as f:
+        f.write('Oops: db type could not be determined')
+
+    cache = MetaCache(tmpfile)
+    cache.put('key', 1)
+
+    assert cache.get('key').value == 1
+
+
+def test_meta_cache_threads(tmpfile):
+    cache = MetaCache(tmpfile)
+    errors = []
+
+    def _work(index):
+        try:
+            for i in range(20):
+                cache.put(f'{index}-{i}', i)
+                assert cache.get(f'{index}-{i}').value == i
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=_work, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+
+
+def test_disk_cache_keys(tmpfile):
+    calls = []
+
+    @disk_cache_offline(cache_file=str(tmpfile))
+    def _fetch(name, tag=None, *, secret=None, force=False, timeout=None):
+        calls.append((name, tag, secret))
+        return len(calls)
+
+    assert _fetch('a') == (1, False)
+    # the defaults, keyword arguments, `force` and `timeout` give the same key
+    assert _fetch('a', None, timeout=3) == (1, True)
+    assert _fetch(name='a', tag=None) == (1, True)
+    assert _fetch('a', 'v1') == (2, False)
+    assert _fetch('a', secret='s') == (3, False)
+    assert _fetch('a', secret='s') == (3, True)
+
+
+def test_disk_cache_stale_while_revalidate(tmpfile, clock):
+    calls = []
+    fail = False
+
+    @disk_cache_offline(cache_file=str(tmpfile), ttl=10, stale_ttl=100)
+    def _fetch(name):
+        if fail:
+            raise urllib.error.URLError('Failing')
+        calls.append(name)
+        return len(calls)
+
+    assert _fetch('a') == (1, False)
+    clock[0] += 5
+    assert _fetch('a') == (1, True)
+
+    # a stale result is returned, and refreshed in the background
+    clock[0] += 10
+    assert _fetch('a') == (1, True)
+    _wait_for(lambda: _fetch('a') == (2, True))
+    assert calls == ['a', 'a']
+
+    # an expired result is refreshed before it is returned
+    clock[0] += 200
+    assert _fetch('a') == (3, False)
+
+    # and still used if Hubble can not be reached
+    clock[0] += 200
+    fail = True
+    assert _fetch('a') == (3, True)
@@ -1,3 +1,5 @@
+import hashlib
+import os
 import urllib
 import warnings
 from pathlib import Path
@@ -107,6 +109,65 @@ def test_archive_package(tmpdir):
         temp_zip_file.write(stream_data.getvalue())
 
 
+def test_archive_package_is_reproducible(tmpdir):
+    import shutil
+
+    first = Path(tmpdir / 'first')
+    second = Path(tmpdir / 'second')
+    shutil.copytree(_resource_dir / 'dummy_executor', first)
+    # the same files, created in the reverse order with other times and modes
+    for path in sorted(first.rglob('*'), reverse=True):
+        target = second / path.relative_to(first)
+        if path.is_dir():
+            target.mkdir(parents=True, exist_ok=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(path.read_bytes())
+            target.chmod(0o600)
+            os.utime(target, (1e9, 1e9))
+
+    content = helper.archive_package(first).getvalue()
+
+    assert helper.archive_package(second).getvalue() == content
+    assert b''.join(helper.PackageStream(second)) == content
+    assert helper.package_md5(second) == hashlib.md5(content).hexdigest()
+
+
+def test_package_stream(tmpdir):
+    import hashlib
+    import zipfile
+
+    pkg_path = _resource_dir / 'dummy_executor'
+
+    package = helper.PackageStream(pkg_path, chunk_size=128, max_chunks=2)
+    with pytest.raises(RuntimeError):
+        package.hexdigest()
+
+    content = b''.join(package)
+
+    assert package.hexdigest() == hashlib.md5(content).hexdigest()
+    assert package.size == len(content)
+    with open(tmpdir / 'dummy_test.zip', 'wb') as temp_zip_file:
+        temp_zip_file.write(content)
+    with zipfile.ZipFile(tmpdir / 'dummy_test.zip') as zfile:
+        assert zfile.testzip() is None
+        assert sorted(zfile.namelist()) == sorted(
+            zipfile.ZipFile(helper.archive_package(pkg_path)).namelist()
+        )
+
+
+def test_package_stream_stops_with_its_reader():
+    package = helper.PackageStream(
+        _resource_dir / 'dummy_executor', chunk_size=16, max_chunks=1
+    )
+    chunks = iter(package)
+    next(chunks)
+    chunks.close()
+
+    with pytest.raises(RuntimeError):
+        package.hexdigest()
+
+
 @pytest.mark.parametrize(
     'package_file',
     [
@@ -258,3 +319,32 @@ def test_load_config(mocker, tag):
     )
 
     assert info_tag == tag
+
+
+def test_request_header_is_built_once(mocker):
+    import platform
+
+    static_header = helper._get_static_request_header
+    static_header.cache_clear()
+    helper._get_environment_info.cache_clear()
+    mocker.patch.object(helper, 'get_token', return_value='my-token')
+    processor = mocker.spy(platform, 'processor')
+    environment_info = mocker.spy(helper, '_get_environment_info')
+
+    first = helper.get_request_header()
+    n = 10
+    for _ in range(n):
+        header = helper.get_request_header()
+
+    assert processor.call_count == 1
+    assert environment_info.call_count == 1
+    assert static_header.cache_info().misses == 1
+    assert static_header.cache_info().hits == n
+    assert header['Authorization'] == 'token my-token'
+    assert header['jinameta-session-id'] != first['jinameta-session-id']
+    assert {k: v for k, v in header.items() if k != 'jinameta-session-id'} == {
+        k: v for k, v in first.items() if k != 'jinameta-session-id'
+    }
+
+    version, _ = helper.get_full_version()
+    assert version['session-id'] != helper.get_full_version()[0]['session-id']
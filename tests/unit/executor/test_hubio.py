@@ -222,7 +222,9 @@ def test_push(
 ):
     mock = mocker.Mock()
 
-    def _mock_post(url, data, headers=None, stream=True):
+    def _mock_post(url, data, headers=None, stream=True, timeout=None):
+        # the package is streamed, the body is read as requests would send it
+        data = data if isinstance(data, bytes) else b''.join(data)
         mock(url=url, data=data, headers=headers)
         return PostMockResponse(response_code=requests.codes.created)
 
@@ -305,6 +307,51 @@ def test_push(
         assert form_data.get('buildWithNoCache') is None
 
 
+@pytest.mark.parametrize('pushed_md5sum', [None, 'outdated', 'current'])
+@pytest.mark.parametrize('tag', [None, 'v0'])
+def test_push_skip_unchanged(mocker, monkeypatch, pushed_md5sum, tag):
+    from hubble.executor.helper import package_md5
+    from hubble.utils.identity import identity_cache
+
+    exec_path = _resource_dir / 'dummy_executor'
+    if pushed_md5sum == 'current':
+        pushed_md5sum = package_md5(exec_path)
+
+    mock = mocker.Mock()
+
+    def _mock_post(url, data, headers=None, stream=True, timeout=None):
+        mock(url=url, data=b''.join(data), headers=headers)
+        return PostMockResponse(response_code=requests.codes.created)
+
+    fetched = []
+
+    def _mock_fetch(name, tag, *args, **kwargs):
+        fetched.append((name, tag))
+        if pushed_md5sum is None:
+            raise hubio.HTTPStatusError('not found', status_code=404)
+        return HubExecutor(uuid='w7qckiqy', tag=tag, md5sum=pushed_md5sum), False
+
+    monkeypatch.setattr(requests, 'post', _mock_post)
+    monkeypatch.setattr(HubIO, 'fetch_meta', _mock_fetch)
+    monkeypatch.setattr(identity_cache, 'is_logged_in', lambda token: True)
+
+    _args_list = [str(exec_path), '--skip-unchanged']
+    for env in ['DOMAIN=github.com', 'DOWNLOAD=download']:
+        _args_list.extend(['--build-env', env])
+    if tag:
+        _args_list.extend(['-t', tag])
+    args = set_hub_push_parser().parse_args(_args_list)
+    image = HubIO(args).push()
+
+    assert fetched == [('dummy_executor', tag)]
+    if pushed_md5sum == package_md5(exec_path):
+        assert image is None
+        assert not mock.called
+    else:
+        assert image['id'] == 'w7qckiqy'
+        assert mock.called
+
+
 @pytest.mark.parametrize(
     'env_variable_consist_error',
     [
@@ -340,7 +387,7 @@ def test_push_wrong_build_env(
 ):
     mock = mocker.Mock()
 
-    def _mock_post(url, data, headers=None, stream=True):
+    def _mock_post(url, data, headers=None, stream=True, timeout=None):
         mock(url=url, data=data, headers=headers)
         return PostMockResponse(response_code=requests.codes.created)
 
@@ -386,7 +433,7 @@ def test_push_requirements_file_require_set_env_variables(
 ):
     mock = mocker.Mock()
 
-    def _mock_post(url, data, headers=None, stream=True):
+    def _mock_post(url, data, headers=None, stream=True, timeout=None):
         mock(url=url, data=data, headers=headers)
         return PostMockResponse(response_code=requests.codes.created)
 
@@ -435,7 +482,7 @@ def test_push_diff_env_variables(
 ):
     mock = mocker.Mock()
 
-    def _mock_post(url, data, headers=None, stream=True):
+    def _mock_post(url, data, headers=None, stream=True, timeout=None):
         mock(url=url, data=data, headers=headers)
         return PostMockResponse(response_code=requests.codes.created)
 
@@ -486,7 +533,7 @@ def test_push_wrong_dockerfile(
     dockerfile = str(_resource_dir / path / dockerfile)
     mock = mocker.Mock()
 
-    def _mock_post(url, data, headers=None, stream=True):
+    def _mock_post(url, data, headers=None, stream=True, timeout=None):
         mock(url=url, data=data)
         return PostMockResponse(response_code=requests.codes.created)
 
@@ -539,7 +586,7 @@ def test_push_with_error(
 ):
     mock = mocker.Mock()
 
-    def _mock_post(url, data, headers=None, stream=True):
+    def _mock_post(url, data, headers=None, stream=True, timeout=None):
         mock(url=url, data=data, headers=headers)
         return PostMockResponse(
             response_code=requests.codes.created, response_error=response_error_status
@@ -578,7 +625,7 @@ def test_status(mocker, monkeypatch, path, verbose, replay, task_id, is_login):
 
     mock = mocker.Mock()
 
-    def _mock_post(url, data, headers=None, stream=True):
+    def _mock_post(url, data, headers=None, stream=True, timeout=None):
         mock(url=url, data=data, headers=headers, stream=stream)
         return StatusPostMockResponse(response_code=requests.codes.created)
 
@@ -662,7 +709,7 @@ def test_status_with_error(
 
     mock = mocker.Mock()
 
-    def _mock_post(url, data, headers=None, stream=True):
+    def _mock_post(url, data, headers=None, stream=True, timeout=None):
         mock(url=url, data=data, headers=headers, stream=stream)
         return StatusPostMockResponse(response_code=code, response_error=True)
 
@@ -704,7 +751,7 @@ def test_status_with_error(
 def test_fetch(mocker, monkeypatch, rebuild_image, prefer_platform):
     mock = mocker.Mock()
 
-    def _mock_post(url, json, headers=None):
+    def _mock_post(url, json, headers=None, timeout=None):
         mock(url=url, json=json, headers=headers)
         return FetchMetaMockResponse(response_code=200)
 
@@ -743,7 +790,7 @@ def test_fetch(mocker, monkeypatch, rebuild_image, prefer_platform):
 def test_fetch_with_build_env(mocker, monkeypatch, rebuild_image):
     mock = mocker.Mock()
 
-    def _mock_post(url, json, headers=None):
+    def _mock_post(url, json, headers=None, timeout=None):
         mock(url=url, json=json)
         return FetchMetaMockResponse(response_code=200, add_build_env=True)
 
@@ -777,7 +824,7 @@ def test_fetch_with_build_env(mocker, monkeypatch, rebuild_image):
 def test_fetch_with_no_image(mocker, monkeypatch):
     mock = mocker.Mock()
 
-    def _mock_post(url, json, headers=None):
+    def _mock_post(url, json, headers=None, timeout=None):
         mock(url=url, json=json)
         return FetchMetaMockResponse(response_code=200, no_image=True)
 
@@ -800,7 +847,7 @@ def test_fetch_with_retry(mocker, monkeypatch):
     mock = mocker.Mock()
     mock_response = FetchMetaMockResponse(response_code=200, fail_count=3)
 
-    def _mock_post(url, json, headers=None):
+    def _mock_post(url, json, headers=None, timeout=None):
         mock(url=url, json=json)
         return mock_response
 
@@ -824,7 +871,7 @@ def test_fetch_with_retry(mocker, monkeypatch):
 def test_fetch_with_authorization(mocker, monkeypatch):
     mock = mocker.Mock()
 
-    def _mock_post(url, json, headers):
+    def _mock_post(url, json, headers, timeout=None):
         mock(url=url, json=json, headers=headers)
         return FetchMetaMockResponse(response_code=200)
 
@@ -880,11 +927,11 @@ def test_pull(mocker, monkeypatch, executor_name, build_env, executor_uri):
 
     monkeypatch.setattr(HubIO, 'fetch_meta', _mock_fetch)
 
-    def _mock_download(url, stream=True, headers=None):
+    def _mock_download(url, stream=True, headers=None, timeout=None):
         mock(url=url)
         return DownloadMockResponse(response_code=200)
 
-    def _mock_head(url):
+    def _mock_head(url, timeout=None):
         from collections import namedtuple
 
         HeadInfo = namedtuple('HeadInfo', ['headers'])
@@ -1236,7 +1283,7 @@ class SandboxCreateMockResponse:
 def test_deploy_public_sandbox_existing(mocker, monkeypatch):
     mock = mocker.Mock()
 
-    def _mock_post(url, json, headers=None):
+    def _mock_post(url, json, headers=None, timeout=None):
         mock(url=url, json=json)
         return SandboxGetMockResponse(response_code=200)
 
@@ -1264,7 +1311,7 @@ def test_deploy_public_sandbox_existing(mocker, monkeypatch):
 def test_deploy_public_sandbox_create_new(mocker, monkeypatch):
     mock = mocker.Mock()
 
-    def _mock_post(url, json, headers=None):
+    def _mock_post(url, json, headers=None, timeout=None):
         mock(url=url, json=json, headers=headers)
         if url.endswith('/sandbox.get'):
             return SandboxGetMockResponse(response_code=404)
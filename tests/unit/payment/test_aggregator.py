@@ -0,0 +1,120 @@
+import logging
+import time
+
+import requests
+from hubble.excepts import AuthenticationRequiredError
+from hubble.payment.aggregator import UsageAggregator, merge_meta_first
+from hubble.payment.reporter import UsageReporter
+
+
+def _reports(client):
+    return [
+        (c.kwargs['token'], c.kwargs['unit'], c.kwargs['units'], c.kwargs['meta'])
+        for c in client.report_app_usage.call_args_list
+    ]
+
+
+def test_aggregate_per_key(mocker):
+    client = mocker.Mock()
+    with UsageAggregator(client, window=60) as aggregator:
+        for i in range(1000):
+            aggregator.add('token-a', app_id='app', unit='requests', units=1)
+            aggregator.add('token-b', app_id='app', unit='requests', units=2)
+        aggregator.add('token-a', app_id='app', unit='tokens', units=7, meta={'x': 1})
+        assert client.report_app_usage.call_count == 0
+
+    assert sorted(_reports(client)) == [
+        ('token-a', 'requests', 1000, {}),
+        ('token-a', 'tokens', 7, {'x': 1}),
+        ('token-b', 'requests', 2000, {}),
+    ]
+
+
+def test_aggregate_count_and_time_window(mocker):
+    client = mocker.Mock()
+    with UsageAggregator(client, window=0.1, max_count=3) as aggregator:
+        for i in range(4):
+            aggregator.add('token', app_id='app', unit='requests', units=1)
+        assert _reports(client) == [('token', 'requests', 3, {})]
+
+        time.sleep(0.3)
+        assert _reports(client)[1:] == [('token', 'requests', 1, {})]
+
+
+def test_merge_meta_and_retry_failed_reports(mocker):
+    client = mocker.Mock()
+    client.report_app_usage.side_effect = [
+        requests.exceptions.ConnectionError(),
+        None,
+        None,
+    ]
+    aggregator = UsageAggregator(client, window=60, merge_meta=merge_meta_first)
+    aggregator.add('token', app_id='app', unit='requests', units=1, meta={'v': 1})
+    aggregator.add('token', app_id='app', unit='requests', units=1, meta={'v': 2})
+    aggregator.flush()
+    aggregator.add('token', app_id='app', unit='requests', units=1, meta={'v': 3})
+    aggregator.close()
+
+    # the failed report is sent again as is, the new event in a new report
+    assert _reports(client) == [
+        ('token', 'requests', 2, {'v': 1}),
+        ('token', 'requests', 2, {'v': 1}),
+        ('token', 'requests', 1, {'v': 3}),
+    ]
+    ids = [c.kwargs['id'] for c in client.report_app_usage.call_args_list]
+    assert ids[0] == ids[1] != ids[2]
+
+
+def test_close_logs_lost_reports(mocker, caplog):
+    client = mocker.Mock()
+    client.report_app_usage.side_effect = requests.exceptions.ConnectionError()
+    aggregator = UsageAggregator(client, window=60)
+    aggregator.add('token', app_id='app', unit='requests', units=5)
+
+    with caplog.at_level(logging.ERROR):
+        aggregator.close()
+
+    assert '5 requests of app is lost' in caplog.text
+
+
+def test_aggregate_into_reporter(mocker):
+    client = mocker.Mock()
+    with UsageReporter(client, flush_interval=0.01) as reporter:
+        with UsageAggregator(reporter, window=60) as aggregator:
+            for i in range(10):
+                aggregator.add('token', app_id='app', unit='requests', units=1)
+        assert reporter.flush(timeout=5)
+
+    assert _reports(client) == [('token', 'requests', 10, {})]
+
+
+def test_drop_rejected_reports(mocker):
+    error = AuthenticationRequiredError(response={})
+    error.status_code = 401
+    client = mocker.Mock()
+    client.report_app_usage.side_effect = error
+    aggregator = UsageAggregator(client, window=60)
+    aggregator.add('token', app_id='app', unit='requests', units=1)
+
+    aggregator.flush()
+    aggregator.flush()
+
+    assert client.report_app_usage.call_count == 1
+    assert aggregator.dropped == 1
+    aggregator.close()
+    assert aggregator.dropped == 1
+
+
+def test_max_unsent(mocker):
+    client = mocker.Mock()
+    client.report_app_usage.side_effect = requests.exceptions.ConnectionError()
+    aggregator = UsageAggregator(client, window=60, max_unsent=2)
+    for app_id in ('a', 'b', 'c'):
+        aggregator.add('token', app_id=app_id, unit='requests', units=1)
+
+    aggregator.flush()
+
+    assert [key[1] for key, _ in aggregator._unsent] == ['b', 'c']
+    assert aggregator.dropped == 1
+    aggregator.close()
+    assert aggregator.dropped == 3
@@ -0,0 +1,161 @@
+import threading
+import time
+
+import pytest
+import requests
+from hubble.excepts import OperationNotAllowedError
+from hubble.payment.cache import AccessCache
+from hubble.payment.client import PaymentClient
+
+
+@pytest.fixture
+def monotonic(mocker):
+    return mocker.patch('hubble.payment.cache.time.monotonic', return_value=1000)
+
+
+def _not_allowed():
+    error = OperationNotAllowedError(response={})
+    error.status_code = 403
+    return error
+
+
+def test_access_cache_ttl_and_stale(mocker, monotonic):
+    loader = mocker.Mock(side_effect=[{'v': 1}, {'v': 2}])
+    cache = AccessCache(ttl=10, stale_ttl=10)
+
+    assert cache.get('verify', 'token', 'app', loader) == {'v': 1}
+    monotonic.return_value = 1005
+    assert cache.get('verify', 'token', 'app', loader) == {'v': 1}
+    assert loader.call_count == 1
+
+    # stale, served while it is refreshed in the background
+    monotonic.return_value = 1015
+    assert cache.get('verify', 'token', 'app', loader) == {'v': 1}
+    for _ in range(100):
+        if loader.call_count == 2 and not cache._loading:
+            break
+        time.sleep(0.01)
+    assert cache.get('verify', 'token', 'app', loader) == {'v': 2}
+
+    monotonic.return_value = 1100
+    loader.side_effect = [{'v': 3}]
+    assert cache.get('verify', 'token', 'app', loader) == {'v': 3}
+
+
+def test_access_cache_negative_and_transient_errors(mocker, monotonic):
+    loader = mocker.Mock(side_effect=_not_allowed())
+    cache = AccessCache(negative_ttl=5)
+
+    for _ in range(2):
+        with pytest.raises(OperationNotAllowedError):
+            cache.get('verify', 'token', 'app', loader)
+    assert loader.call_count == 1
+
+    monotonic.return_value = 1006
+    loader.side_effect = requests.exceptions.ConnectionError()
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            cache.get('verify', 'token', 'app', loader)
+    assert loader.call_count == 3
+
+
+def test_access_cache_single_flight(mocker):
+    def _load():
+        time.sleep(0.2)
+        return {'v': 1}
+
+    loader = mocker.Mock(side_effect=_load)
+    cache = AccessCache()
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get('verify', 'token', 'app', loader))
+        )
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [{'v': 1}] * 5
+    assert loader.call_count == 1
+
+
+def test_access_cache_single_refresh(mocker, monotonic):
+    release = threading.Event()
+
+    def _load():
+        if loader.call_count > 1:
+            release.wait(timeout=5)
+        return {'v': loader.call_count}
+
+    loader = mocker.Mock(side_effect=_load)
+    cache = AccessCache(ttl=10, stale_ttl=10)
+    cache.get('verify', 'token', 'app', loader)
+
+    monotonic.return_value = 1015
+    threads = [
+        threading.Thread(target=cache.get, args=('verify', 'token', 'app', loader))
+        for _ in range(20)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    release.set()
+    for _ in range(100):
+        if not cache._loading:
+            break
+        time.sleep(0.01)
+
+    assert loader.call_count == 2
+
+
+def test_access_cache_bounds(mocker, monotonic):
+    loader = mocker.Mock(return_value={'v': 1})
+    cache = AccessCache(ttl=10, stale_ttl=10, maxsize=2)
+
+    cache.get('verify', 'token', 'a', loader)
+    cache.get('verify', 'token', 'b', loader)
+    cache.get('verify', 'token', 'a', loader)
+    cache.get('verify', 'token', 'c', loader)
+    # the least recently used is evicted
+    assert [key[2] for key in cache._entries] == ['a', 'c']
+
+    # the expired entries are dropped when a result is added
+    monotonic.return_value = 1015
+    cache.get('verify', 'token', 'c', loader)
+    for _ in range(100):
+        if not cache._loading:
+            break
+        time.sleep(0.01)
+    monotonic.return_value = 1025
+    cache.get('verify', 'token', 'd', loader)
+    assert [key[2] for key in cache._entries] == ['c', 'd']
+
+    # or when they are read, then they are loaded again
+    monotonic.return_value = 1040
+    calls = loader.call_count
+    cache.get('verify', 'token', 'c', loader)
+    assert loader.call_count == calls + 1
+
+
+def test_payment_client_cache(mocker):
+    handle_request = mocker.patch.object(
+        PaymentClient, 'handle_request', return_value={'data': {'access': True}}
+    )
+    client = PaymentClient(m2m_token='m2m', cache=True)
+
+    for _ in range(3):
+        assert client.verify_app_access('token', 'app') == {'data': {'access': True}}
+        client.get_summary('token', 'app')
+    assert handle_request.call_count == 2
+
+    client.invalidate_cache(token='token')
+    client.verify_app_access('token', 'app')
+    client.verify_app_access('other-token', 'app')
+    assert handle_request.call_count == 4
+
+    PaymentClient(m2m_token='m2m').verify_app_access('token', 'app')
+    assert handle_request.call_count == 5
@@ -1,9 +1,24 @@
+import time
+
 import pytest
-from hubble.excepts import AuthenticationRequiredError
+from hubble.excepts import AuthenticationRequiredError, RequestTimeoutError
 from hubble.payment.client import PaymentClient
+from hubble.payment.endpoints import PaymentEndpoints
 
 
 def test_handle_error_request():
     payment_client = PaymentClient(m2m_token='random_m2m_token')
     with pytest.raises(AuthenticationRequiredError):
         payment_client.get_summary(token='random_user_token', app_id='random_app_id')
+
+
+def test_request_timeout(stand_in_server):
+    def _slow(handler):
+        time.sleep(1)
+        return 200, {}, {'code': 200, 'data': {}}
+
+    stand_in_server.routes[stand_in_server.rpc(PaymentEndpoints.get_summary)] = _slow
+    payment_client = PaymentClient(m2m_token='random_m2m_token', timeout=(1, 0.2))
+
+    with pytest.raises(RequestTimeoutError):
+        payment_client.get_summary(token='random_user_token', app_id='random_app_id')
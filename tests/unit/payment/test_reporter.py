@@ -0,0 +1,129 @@
+import queue
+import threading
+import time
+
+import pytest
+import requests
+from hubble.payment.reporter import UsageReporter
+from hubble.utils.retry import RetryPolicy
+
+
+@pytest.fixture
+def client(mocker):
+    return mocker.Mock()
+
+
+def _policy(max_attempts=3):
+    return RetryPolicy(max_attempts=max_attempts, backoff_factor=0, jitter=False)
+
+
+def test_report_is_sent_in_background(client):
+    with UsageReporter(client, batch_size=10, flush_interval=0.05) as reporter:
+        ids = [
+            reporter.report('token', app_id='app', unit='requests', units=1)
+            for _ in range(25)
+        ]
+        assert reporter.flush(timeout=5)
+        metrics = reporter.metrics
+
+    assert [c.kwargs['id'] for c in client.report_app_usage.call_args_list] == ids
+    assert client.report_app_usage.call_args.kwargs == {
+        'token': 'token',
+        'id': ids[-1],
+        'app_id': 'app',
+        'unit': 'requests',
+        'units': 1,
+        'meta': {},
+    }
+    assert metrics['reported'] == 25 and metrics['queue_depth'] == 0
+    assert metrics['flushes'] >= 3 and metrics['max_flush_latency'] >= 0
+
+
+def test_report_keeps_its_id_across_retries(client):
+    client.report_app_usage.side_effect = [
+        requests.exceptions.ConnectionError(),
+        requests.exceptions.ConnectionError(),
+        {'code': 200},
+    ]
+    with UsageReporter(
+        client, flush_interval=0.01, retry_policy=_policy(max_attempts=2)
+    ) as reporter:
+        id = reporter.report('token', app_id='app', unit='requests', units=1)
+        assert reporter.flush(timeout=5)
+        assert reporter.metrics['requeued'] == 1
+
+    assert [c.kwargs['id'] for c in client.report_app_usage.call_args_list] == [id] * 3
+
+
+def test_spool_survives_restart(client, tmpdir):
+    spool_path = tmpdir / 'usage.jsonl'
+    client.report_app_usage.side_effect = requests.exceptions.ConnectionError()
+    reporter = UsageReporter(
+        client, spool_path=spool_path, flush_interval=0.01, retry_policy=_policy(1)
+    )
+    id = reporter.report('token', app_id='app', unit='requests', units=3)
+    reporter.close(timeout=0.1)
+
+    client.report_app_usage.side_effect = None
+    with UsageReporter(client, spool_path=spool_path, flush_interval=0.01) as reporter:
+        assert reporter.flush(timeout=5)
+
+    assert client.report_app_usage.call_args.kwargs['id'] == id
+    assert client.report_app_usage.call_args.kwargs['units'] == 3
+    with UsageReporter(client, spool_path=spool_path) as reporter:
+        assert reporter.metrics['queue_depth'] == 0
+
+
+def test_bounded_queue(client):
+    sending = threading.Event()
+    release = threading.Event()
+
+    def _report_app_usage(**kwargs):
+        sending.set()
+        release.wait(timeout=5)
+
+    client.report_app_usage.side_effect = _report_app_usage
+    with UsageReporter(client, max_queue_size=1, flush_interval=0.01) as reporter:
+        reporter.report('token', app_id='app', unit='requests')
+        assert sending.wait(timeout=5)
+        with pytest.raises(queue.Full):
+            reporter.report('token', app_id='app', unit='requests', block=False)
+        release.set()
+
+
+@pytest.mark.parametrize('spooled', [False, True])
+def test_close_while_hubble_is_down(client, tmpdir, spooled):
+    spool_path = tmpdir / 'usage.jsonl' if spooled else None
+    client.report_app_usage.side_effect = requests.exceptions.ConnectionError()
+    reporter = UsageReporter(
+        client, spool_path=spool_path, flush_interval=0.01, retry_policy=_policy(1)
+    )
+    for _ in range(3):
+        reporter.report('token', app_id='app', unit='requests', units=1)
+
+    start = time.monotonic()
+    reporter.close(timeout=0.2)
+
+    assert time.monotonic() - start < 2
+    assert not reporter._worker.is_alive()
+    assert reporter.metrics['queue_depth'] == 0
+    # the reports are kept in the spool, or lost without one
+    assert reporter.metrics['failed'] == (0 if spooled else 3)
+    if spooled:
+        client.report_app_usage.side_effect = None
+        with UsageReporter(client, spool_path=spool_path) as reporter:
+            assert reporter.flush(timeout=5)
+            assert reporter.metrics['reported'] == 3
+
+
+def test_max_requeues(client):
+    client.report_app_usage.side_effect = requests.exceptions.ConnectionError()
+    with UsageReporter(
+        client, flush_interval=0.001, retry_policy=_policy(1), max_requeues=2
+    ) as reporter:
+        reporter.report('token', app_id='app', unit='requests', units=1)
+        assert reporter.flush(timeout=5)
+        metrics = reporter.metrics
+
+    assert client.report_app_usage.call_count == 3
+    assert metrics['requeued'] == 2 and metrics['failed'] == 1
@@ -0,0 +1,72 @@
+import subprocess
+import sys
+
+import pytest
+
+# `import hubble` runs on every start of jina, the budget leaves a lot of room
+# for slow machines while catching a heavy dependency imported eagerly
+IMPORT_TIME_BUDGET_US = 100_000
+HEAVY_MODULES = ['aiohttp', 'requests', 'rich', 'jose', 'importlib_metadata']
+
+
+def _import_hubble(*args):
+    return subprocess.run(
+        [
+            sys.executable,
+            *args,
+            '-c',
+            'import hubble; import sys; print(sorted(sys.modules))',
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_import_time_budget():
+    # compile the bytecode first, it is not part of the budget
+    _import_hubble()
+    result = _import_hubble('-X', 'importtime')
+
+    cumulative = [
+        int(line.split('|')[1])
+        for line in result.stderr.splitlines()
+        if line.startswith('import time:') and line.split('|')[2].strip() == 'hubble'
+    ]
+    assert cumulative and cumulative[0] < IMPORT_TIME_BUDGET_US
+
+
+@pytest.mark.parametrize('module', HEAVY_MODULES)
+def test_import_is_lazy(module):
+    modules = _import_hubble().stdout
+    assert f"'{module}'" not in modules
+
+
+def test_import_all():
+    result = subprocess.run(
+        [
+            sys.executable,
+            '-c',
+            'from hubble import *; print(Client.__name__, Auth.__name__, '
+            'is_notebook.__name__, login_required.__name__)',
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.split() == ['Client', 'Auth', 'is_notebook', 'login_required']
+
+
+def test_import_subpackage_attribute():
+    result = subprocess.run(
+        [
+            sys.executable,
+            '-c',
+            'import hubble; print(hubble.utils.get_base_url.__name__, '
+            'hubble.payment.__name__, hasattr(hubble, "missing"))',
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.split() == ['get_base_url', 'hubble.payment', 'False']
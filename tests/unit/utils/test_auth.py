@@ -6,6 +6,7 @@ import pytest
 import requests
 from hubble.utils.auth import Auth
 from hubble.utils.config import config
+from hubble.utils.timeout import get_timeout
 
 
 class AuthorizeResponse:
@@ -196,11 +197,13 @@ async def test_login_logout__sync(
     mocker, monkeypatch, existing_token, expected_token, validate_status_code, force
 ):
     def _mock_get(*args, **kwargs):
+        assert kwargs['timeout'] == get_timeout(stream=True)
         mock_response = AuthorizeResponseSync(status_code=200)
         return mock_response
 
     def _mock_post_requests(url, *args, **kwargs):
         if 'user.identity.grant.auto' in url:
+            assert kwargs['timeout'] == get_timeout()
             mock_response = GrantResponseSync(status_code=200)
             return mock_response
         if 'user.identity.whoami' in url:
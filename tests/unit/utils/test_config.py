@@ -1,4 +1,6 @@
+import json
 import os
+import threading
 from pathlib import Path
 from unittest.mock import patch
 
@@ -53,3 +55,52 @@ def test_get_auth_token_from_config(config):
     os.environ['JINA_AUTH_TOKEN'] = 'my-token-from-env'
     assert config.get('auth_token') == 'my-token'
     assert auth.Auth.get_auth_token_from_config() == 'my-token'
+
+
+@pytest.fixture
+def tmp_config(tmp_path, monkeypatch):
+    monkeypatch.setenv('JINA_TEST_CONFIG_ROOT', str(tmp_path))
+    return lambda: Config(root_env_name='JINA_TEST_CONFIG_ROOT')
+
+
+def test_config_read_is_cached(tmp_config, mocker):
+    config, other = tmp_config(), tmp_config()
+    config.set('test', 'test')
+    load = mocker.spy(json, 'load')
+    assert config.get('test') == 'test'
+    assert config.get('test') == 'test'
+    assert load.call_count == 0
+
+    # another process replaced the file
+    other.set('test', 'other')
+    load.reset_mock()
+    assert config.get('test') == 'other'
+    assert load.call_count == 1
+
+
+def test_config_transaction(tmp_config):
+    config = tmp_config()
+    with config.transaction() as c:
+        c['a'] = 1
+        c['b'] = 2
+    assert config.get('a') == 1 and config.get('b') == 2
+
+    with pytest.raises(ValueError):
+        with config.transaction() as c:
+            c['a'] = 3
+            raise ValueError
+    assert config.get('a') == 1
+
+
+def test_config_concurrent_writes(tmp_config):
+    threads = [
+        threading.Thread(target=lambda i=i: tmp_config().set(f'key-{i}', i))
+        for i in range(10)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    config = tmp_config()
+    assert all(config.get(f'key-{i}') == i for i in range(10))
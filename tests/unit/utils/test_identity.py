@@ -0,0 +1,54 @@
+import time
+
+import pytest
+from hubble import login_required
+from hubble.excepts import AuthenticationRequiredError
+from hubble.utils.identity import IdentityCache, identity_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_identity_cache():
+    identity_cache.clear()
+    yield
+    identity_cache.clear()
+
+
+def test_identity_cache_ttl(mocker):
+    cache = IdentityCache(ttl=60)
+    assert not cache.is_logged_in(None)
+    assert not cache.is_logged_in('not-a-jwt')
+
+    cache.remember('not-a-jwt')
+    assert cache.is_logged_in('not-a-jwt')
+
+    mocker.patch('hubble.utils.identity.time.time', return_value=time.time() + 61)
+    assert not cache.is_logged_in('not-a-jwt')
+
+
+def test_identity_cache_local_jwt(generate_jwt):
+    cache = IdentityCache()
+    assert cache.is_logged_in(generate_jwt({'exp': int(time.time()) + 60}))
+    assert not cache.is_logged_in(generate_jwt({'exp': int(time.time()) - 60}))
+    assert not cache.is_logged_in(
+        generate_jwt(
+            {'exp': int(time.time()) + 60, 'user': {'status': 'deleted'}},
+        )
+    )
+
+
+def test_login_required_checks_once(mocker, monkeypatch):
+    monkeypatch.setenv('JINA_AUTH_TOKEN', 'not-a-jwt')
+    get_user_info = mocker.patch('hubble.client.client.Client.get_user_info')
+
+    @login_required
+    def _push():
+        return 'pushed'
+
+    assert [_push() for _ in range(3)] == ['pushed'] * 3
+    assert get_user_info.call_count == 1
+
+    identity_cache.clear()
+    get_user_info.side_effect = AuthenticationRequiredError(response={})
+    mocker.patch('sys.__stdin__.isatty', return_value=False)
+    with pytest.raises(AuthenticationRequiredError):
+        _push()
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+from hubble.utils.jwks import JSONWebKeySet, JSONWebKeyStore
+
+KEY = {'kty': 'EC', 'kid': 'known-kid', 'alg': 'ES256'}
+NEW_KEY = {'kty': 'EC', 'kid': 'new-kid', 'alg': 'ES256'}
+
+
+@pytest.fixture
+def from_config(mocker):
+    return mocker.patch.object(
+        JSONWebKeySet, 'get_keys_from_config', return_value=[KEY]
+    )
+
+
+def test_known_kid_stays_in_memory(mocker, from_config):
+    from_hubble = mocker.patch.object(JSONWebKeySet, 'get_keys_from_hubble')
+    store = JSONWebKeyStore()
+
+    for _ in range(3):
+        assert store.get_keys('known-kid') == [KEY]
+    assert from_config.call_count == 1
+    assert from_hubble.call_count == 0
+
+
+def test_unknown_kid_is_negatively_cached(mocker, from_config):
+    from_hubble = mocker.patch.object(
+        JSONWebKeySet, 'get_keys_from_hubble', return_value=[KEY, NEW_KEY]
+    )
+    store = JSONWebKeyStore(min_refresh_interval=0)
+
+    assert store.get_keys('new-kid') == [NEW_KEY]
+    assert store.get_keys('unknown-kid') == []
+    assert store.get_keys('unknown-kid') == []
+    assert from_hubble.call_count == 2
+
+    store = JSONWebKeyStore(min_refresh_interval=60)
+    from_hubble.reset_mock()
+    for kid in ('new-kid', 'other-kid', 'another-kid'):
+        store.get_keys(kid)
+    assert from_hubble.call_count == 1
+
+
+def test_concurrent_refreshes_share_one_request(mocker, from_config):
+    def _fetch(timeout=None):
+        time.sleep(0.2)
+        return [KEY, NEW_KEY]
+
+    from_hubble = mocker.patch.object(
+        JSONWebKeySet, 'get_keys_from_hubble', side_effect=_fetch
+    )
+    store = JSONWebKeyStore()
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(store.get_keys('new-kid')))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [[NEW_KEY]] * 5
+    assert from_hubble.call_count == 1
+
+
+def test_expired_keys_refresh_in_background(mocker, from_config):
+    refreshed = threading.Event()
+
+    def _fetch(timeout=None):
+        refreshed.set()
+        return [KEY]
+
+    mocker.patch.object(JSONWebKeySet, 'get_keys_from_hubble', side_effect=_fetch)
+    store = JSONWebKeyStore(ttl=0)
+
+    assert store.get_keys('known-kid') == [KEY]
+    assert refreshed.wait(timeout=5)
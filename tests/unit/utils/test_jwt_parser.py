@@ -1,10 +1,15 @@
+import time
+
 import pytest
 from hubble.utils.jwt_parser import (
     JWTValidationException,
+    VerifiedTokenCache,
     decode_jwt_fragment,
     validate_back_channel_delete_account_jwt,
     validate_back_channel_logout_jwt,
     validate_jwt,
+    validate_jwts,
+    verified_tokens,
 )
 from jose import jwt
 
@@ -49,6 +54,13 @@ PAYLOAD = {
 }
 
 
+@pytest.fixture(autouse=True)
+def clear_verified_tokens():
+    verified_tokens.clear()
+    yield
+    verified_tokens.clear()
+
+
 def test_decode_jwt_fragment():
     token = jwt.encode(PAYLOAD, 'secret', algorithm='HS256')
     token_components = token.split('.')
@@ -125,3 +137,90 @@ def test_validate_back_channel_delete_account_failure(mocker):
     token = jwt.encode(PAYLOAD, PRIVATE_KEY, algorithm='ES256', headers=HEADERS)
     with pytest.raises(JWTValidationException):
         validate_back_channel_delete_account_jwt(token)
+
+
+def test_validate_jwt_cache(mocker):
+    mocker.patch('hubble.utils.jwks.JSONWebKeySet.get_keys', return_value=[PUBLIC_KEY])
+    decode = mocker.spy(jwt, 'decode')
+
+    payload = dict(PAYLOAD, exp=int(time.time()) + 60)
+    token = jwt.encode(payload, PRIVATE_KEY, algorithm='ES256', headers=HEADERS)
+    assert validate_jwt(token) == payload
+    assert validate_jwt(token) == payload
+    assert decode.call_count == 1
+
+    validate_jwt(token, aud=PAYLOAD['aud'])
+    assert decode.call_count == 2
+
+    # tokens without exp are verified every time
+    token = jwt.encode(PAYLOAD, PRIVATE_KEY, algorithm='ES256', headers=HEADERS)
+    validate_jwt(token)
+    validate_jwt(token)
+    assert decode.call_count == 4
+
+
+def test_verified_token_cache_expiry_and_size():
+    cache = VerifiedTokenCache(maxsize=2)
+    cache.put('a', None, {'exp': time.time() - 1})
+    assert cache.get('a') is None
+
+    for token in ('a', 'b', 'c'):
+        cache.put(token, None, {'exp': time.time() + 60, 'sub': token})
+    assert cache.get('a') is None
+    assert cache.get('b')['sub'] == 'b'
+    assert cache.get('b', aud='other') is None
+
+
+def test_back_channel_logout_invalidates_cache(mocker):
+    mocker.patch('hubble.utils.jwks.JSONWebKeySet.get_keys', return_value=[PUBLIC_KEY])
+    decode = mocker.spy(jwt, 'decode')
+
+    token = jwt.encode(
+        dict(PAYLOAD, exp=int(time.time()) + 60),
+        PRIVATE_KEY,
+        algorithm='ES256',
+        headers=HEADERS,
+    )
+    validate_jwt(token)
+    logout_token = jwt.encode(
+        dict(
+            PAYLOAD, events={'http://schemas.openid.net/event/backchannel-logout': {}}
+        ),
+        PRIVATE_KEY,
+        algorithm='ES256',
+        headers=HEADERS,
+    )
+    validate_back_channel_logout_jwt(logout_token)
+
+    validate_jwt(token)
+    assert decode.call_count == 3
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_validate_jwts(mocker, workers):
+    get_keys = mocker.patch(
+        'hubble.utils.jwks.JSONWebKeySet.get_keys',
+        side_effect=lambda kid: [PUBLIC_KEY] if kid == PUBLIC_KEY['kid'] else [],
+    )
+    valid = [
+        jwt.encode(dict(PAYLOAD, n=i), PRIVATE_KEY, algorithm='ES256', headers=HEADERS)
+        for i in range(4)
+    ]
+    unknown_kid = jwt.encode(
+        PAYLOAD, PRIVATE_KEY, algorithm='ES256', headers={'kid': 'unknown'}
+    )
+    expired = jwt.encode(
+        dict(PAYLOAD, exp=int(time.time()) - 60),
+        PRIVATE_KEY,
+        algorithm='ES256',
+        headers=HEADERS,
+    )
+    tokens = [valid[0], unknown_kid, valid[1], 'not-a-jwt', expired] + valid[2:]
+
+    results = validate_jwts(tokens, workers=workers)
+
+    assert [r['n'] for r in results if isinstance(r, dict)] == [0, 1, 2, 3]
+    assert [i for i, r in enumerate(results) if isinstance(r, dict)] == [0, 2, 5, 6]
+    for index in (1, 3, 4):
+        assert isinstance(results[index], JWTValidationException)
+    assert get_keys.call_count == 2
@@ -0,0 +1,111 @@
+import io
+
+import pytest
+from hubble.utils.multipart import MultipartEncoder, iter_multipart_formdata
+from requests.packages.urllib3.filepost import encode_multipart_formdata
+
+
+@pytest.mark.parametrize('read_size', [-1, 1, 7, 1024])
+def test_multipart_encoder_matches_urllib3(tmpdir, read_size):
+    content = b'some initial binary data: \x00\x01' * 1000
+    path = tmpdir / 'model'
+    with open(path, 'wb') as fp:
+        fp.write(content)
+
+    expected, content_type = encode_multipart_formdata(
+        {'public': False, 'file': ('file', content), 'name': 'my-artifact'},
+        boundary='test-boundary',
+    )
+
+    with open(path, 'rb') as fp:
+        encoder = MultipartEncoder(
+            {'public': False, 'file': ('file', fp), 'name': 'my-artifact'},
+            boundary='test-boundary',
+        )
+        assert encoder.content_type == content_type
+        assert len(encoder) == len(expected)
+
+        chunks = []
+        while True:
+            chunk = encoder.read(read_size)
+            if not chunk:
+                break
+            if read_size > 0:
+                assert len(chunk) <= read_size
+            chunks.append(chunk)
+
+    assert b''.join(chunks) == expected
+
+
+def test_multipart_encoder_reads_files_in_chunks():
+    class _RecordingReader(io.BytesIO):
+        sizes = []
+
+        def read(self, n=-1):
+            self.sizes.append(n)
+            return super().read(n)
+
+    fp = _RecordingReader(b'x' * 100)
+    encoder = MultipartEncoder({'file': ('file', fp)}, chunk_size=16)
+
+    reported = []
+    encoder.callback = reported.append
+    body = encoder.read()
+
+    assert len(body) == len(encoder)
+    assert sum(reported) == len(encoder)
+    assert max(fp.sizes) <= 16
+
+
+def test_multipart_encoder_truncated_file():
+    fp = io.BytesIO(b'x' * 100)
+    encoder = MultipartEncoder({'file': ('file', fp)})
+    fp.truncate(10)
+
+    with pytest.raises(IOError):
+        encoder.read()
+
+
+@pytest.mark.parametrize(
+    'data',
+    [
+        b'some initial binary data: \x00\x01' * 1000,
+        io.BytesIO(b'some initial binary data: \x00\x01' * 1000),
+        iter([b'some initial binary data: \x00\x01'] * 1000),
+    ],
+)
+def test_iter_multipart_formdata_matches_urllib3(data):
+    content = b'some initial binary data: \x00\x01' * 1000
+    expected, content_type = encode_multipart_formdata(
+        {'public': False, 'file': ('file', content), 'name': 'my-artifact'},
+        boundary='test-boundary',
+    )
+
+    chunks, ctype = iter_multipart_formdata(
+        {'public': False, 'file': ('file', data), 'name': 'my-artifact'},
+        boundary='test-boundary',
+        chunk_size=64,
+    )
+
+    assert ctype == content_type
+    assert b''.join(chunks) == expected
+
+
+def test_iter_multipart_formdata_sends_callables_last():
+    sent = []
+
+    def _data():
+        for chunk in [b'a', b'b', b'c']:
+            sent.append(chunk)
+            yield chunk
+
+    chunks, _ = iter_multipart_formdata(
+        {'md5sum': lambda: b''.join(sent), 'file': ('file', _data()), 'id': 'x'},
+        boundary='test-boundary',
+    )
+    expected, _ = encode_multipart_formdata(
+        {'file': ('file', b'abc'), 'id': 'x', 'md5sum': 'abc'},
+        boundary='test-boundary',
+    )
+
+    assert b''.join(chunks) == expected
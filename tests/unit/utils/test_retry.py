@@ -0,0 +1,102 @@
+import time
+
+import pytest
+import requests
+from hubble.client.endpoints import EndpointsV2
+from hubble.excepts import ParamValidationError, ServerInternalError
+from hubble.executor.helper import retry
+from hubble.utils.retry import HTTPStatusError, RetryPolicy
+
+
+def _response(status_code, headers=None):
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp.headers.update(headers or {})
+    return resp
+
+
+@pytest.mark.parametrize(
+    'result, retryable',
+    [
+        (requests.exceptions.ConnectionError(), True),
+        (requests.exceptions.ReadTimeout(), True),
+        (HTTPStatusError('', status_code=503), True),
+        (HTTPStatusError('', status_code=404), False),
+        (_response(429), True),
+        (_response(200), False),
+        (ValueError(), False),
+    ],
+)
+def test_is_retryable(result, retryable):
+    assert RetryPolicy().is_retryable(result) == retryable
+
+
+def test_get_delay():
+    policy = RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+    assert [policy.get_delay(attempt) for attempt in (1, 2, 3, 4)] == [1, 2, 4, 5]
+    assert policy.get_delay(1, _response(503, {'Retry-After': '3'})) == 3
+    assert policy.get_delay(1, _response(503, {'Retry-After': '100'})) == 5
+    assert 0 <= RetryPolicy(backoff_factor=1).get_delay(3) <= 4
+
+
+def test_call_stops_at_deadline(mocker):
+    sleep = mocker.patch('hubble.utils.retry.time.sleep')
+    func = mocker.Mock(side_effect=requests.exceptions.ConnectionError())
+    policy = RetryPolicy(max_attempts=10, backoff_factor=1, jitter=False)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        policy.call(func, deadline=3.5)
+
+    # waits 1 and 2 seconds, a 4 seconds wait would pass the deadline
+    assert func.call_count == 3
+    assert [c.args[0] for c in sleep.call_args_list] == [1, 2]
+
+
+def test_helper_retry_only_retries_retryable_errors(mocker):
+    mocker.patch('hubble.utils.retry.time.sleep')
+    calls = []
+
+    @retry(num_retry=3)
+    def _call(error):
+        calls.append(error)
+        raise error
+
+    with pytest.raises(ParamValidationError):
+        _call(ParamValidationError(response={}))
+    assert len(calls) == 1
+
+    error = ServerInternalError(response={})
+    error.status_code = 500
+    with pytest.raises(ServerInternalError):
+        _call(error)
+    assert len(calls) == 4
+
+
+def test_client_retries_with_idempotency_key(mocker, stand_in_server):
+    from hubble import Client
+
+    mocker.patch('hubble.utils.retry.time.sleep')
+    received = []
+
+    def _delete(handler):
+        received.append(handler.headers.get('Idempotency-Key'))
+        if len(received) < 3:
+            return 503, {'Retry-After': '1'}, {'code': 503, 'status': 50001}
+        return 200, {}, {'code': 200}
+
+    stand_in_server.routes[stand_in_server.rpc(EndpointsV2.delete_artifact)] = _delete
+    stand_in_server.routes[
+        stand_in_server.rpc(EndpointsV2.get_artifact_info)
+    ] = lambda handler: (400, {}, {'code': 400, 'status': 40001})
+    client = Client(token='fake-token', jsonify=True, max_retries=3)
+
+    assert client.delete_artifact(id='artifact-id') == {'code': 200}
+    assert len(received) == 3 and len(set(received)) == 1 and received[0]
+
+    start = time.monotonic()
+    with pytest.raises(ParamValidationError):
+        client.get_artifact_info(id='artifact-id')
+    assert time.monotonic() - start < 1
+    assert [r for r in stand_in_server.requests if 'getDetail' in r[1]] == [
+        ('POST', stand_in_server.rpc(EndpointsV2.get_artifact_info))
+    ]
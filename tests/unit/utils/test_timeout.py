@@ -0,0 +1,59 @@
+import time
+
+import pytest
+from hubble.client.endpoints import EndpointsV2
+from hubble.excepts import RequestTimeoutError
+from hubble.utils.timeout import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_STREAM_READ_TIMEOUT,
+    Deadline,
+    get_timeout,
+)
+
+
+def test_get_timeout(monkeypatch):
+    monkeypatch.delenv('JINA_HUBBLE_CONNECT_TIMEOUT', raising=False)
+    monkeypatch.delenv('JINA_HUBBLE_READ_TIMEOUT', raising=False)
+    assert get_timeout() == (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+    assert get_timeout(stream=True) == (
+        DEFAULT_CONNECT_TIMEOUT,
+        DEFAULT_STREAM_READ_TIMEOUT,
+    )
+    assert get_timeout(5) == (5, 5)
+    assert get_timeout((1, 2)) == (1, 2)
+
+    monkeypatch.setenv('JINA_HUBBLE_CONNECT_TIMEOUT', '3')
+    monkeypatch.setenv('JINA_HUBBLE_READ_TIMEOUT', '4')
+    assert get_timeout() == (3, 4)
+
+
+def test_deadline(mocker, monkeypatch):
+    monkeypatch.delenv('JINA_HUBBLE_DEADLINE', raising=False)
+    assert Deadline().remaining() is None
+
+    deadline = Deadline(10)
+    assert 0 < get_timeout((5, 30), deadline)[1] <= 10
+
+    monotonic = mocker.patch('hubble.utils.timeout.time.monotonic')
+    monotonic.return_value = 0
+    deadline = Deadline(1)
+    monotonic.return_value = 2
+    with pytest.raises(RequestTimeoutError):
+        deadline.remaining()
+
+
+def test_client_request_timeout(stand_in_server):
+    from hubble import Client
+
+    def _slow(handler):
+        time.sleep(1)
+        return 200, {}, {'code': 200}
+
+    stand_in_server.routes[stand_in_server.rpc(EndpointsV2.get_artifact_info)] = _slow
+    client = Client(token='fake-token', jsonify=True, timeout=0.2)
+
+    start = time.monotonic()
+    with pytest.raises(RequestTimeoutError):
+        client.get_artifact_info(id='artifact-id')
+    assert time.monotonic() - start < 1